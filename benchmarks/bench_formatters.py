@@ -0,0 +1,84 @@
+"""European number formatting: the table's per-row cost and the separator swap alternatives.
+
+Rows compares the formatters as they were before per-symbol precision
+(integer-only, three replace passes through a placeholder) with the
+current ones. Separators times ways of turning a grouped number into
+European style for one value, to compare a single-pass swap with the
+format-and-replace used by monitor.display.formatters._group.
+
+    PYTHONPATH=src python benchmarks/bench_formatters.py
+"""
+import random
+import timeit
+
+from monitor.display import formatters
+
+COUNT = 10_000
+REPEAT = 5
+
+def previous_format_value(value: float) -> str:
+    return f"€{int(value):,}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def previous_format_price(price: float) -> str:
+    return f"€{int(price):,}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def previous_format_quantity(quantity: float) -> str:
+    return f"{int(quantity):,}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+_SPECS = tuple(f"_.{precision}f" for precision in range(13))
+_PLAIN_SPECS = tuple(f".{precision}f" for precision in range(13))
+_EUROPEAN = str.maketrans("._", ",.")
+
+def two_replaces(value: float, precision: int) -> str:
+    """What _group does: "_" grouping, then one replace per separator"""
+    return format(value, _SPECS[precision]).replace(".", ",").replace("_", ".")
+
+def translate(value: float, precision: int) -> str:
+    """Single pass swapping both separators with str.translate"""
+    return format(value, _SPECS[precision]).translate(_EUROPEAN)
+
+def grouping_loop(value: float, precision: int) -> str:
+    """Single pass inserting the thousands separators while copying the digits"""
+    text = format(value, _PLAIN_SPECS[precision])
+    sign = "-" if text.startswith("-") else ""
+    whole, _, fraction = text.lstrip("-").partition(".")
+    out = []
+    for i, digit in enumerate(whole):
+        if i and (len(whole) - i) % 3 == 0:
+            out.append(".")
+        out.append(digit)
+    return sign + "".join(out) + ("," + fraction if fraction else "")
+
+def best(function) -> float:
+    """Best time per value in microseconds"""
+    return min(timeit.repeat(function, number=1, repeat=REPEAT)) / COUNT * 1e6
+
+def main():
+    random.seed(1)
+    # A burst of BTC trades: prices repeat on the tick grid, as they do on the exchange
+    prices = [round(60000 + random.randint(-50, 50) * 0.1, 1) for _ in range(COUNT)]
+    quantities = [round(random.random() * 3, 3) for _ in range(COUNT)]
+    values = [price * quantity for price, quantity in zip(prices, quantities)]
+    rows = list(zip(prices, quantities, values))
+
+    def previous_rows():
+        for price, quantity, value in rows:
+            previous_format_price(price), previous_format_quantity(quantity), previous_format_value(value)
+
+    def current_rows():
+        for price, quantity, value in rows:
+            formatters.format_price(price, "BTC"), formatters.format_quantity(quantity, "BTC")
+            formatters.format_value(value, "BTC")
+
+    print(f"Rows (price, size and value of {COUNT} trades, best of {REPEAT})")
+    print(f"  previous, integers only  {best(previous_rows):5.2f} us/row")
+    print(f"  current, with decimals   {best(current_rows):5.2f} us/row")
+
+    for function in (two_replaces, translate, grouping_loop):
+        assert function(-1234567.891, 2) == "-1.234.567,89", function.__name__
+    print(f"Separators (one value, 2 decimals, best of {REPEAT})")
+    for function in (two_replaces, translate, grouping_loop):
+        print(f"  {function.__name__:14} {best(lambda: [function(p, 2) for p in values]):5.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Cost of the per-message debug logging on the liquidation path with debug off.
+
+Compares the f-string calls the hot path used to make with the
+DebugSampler-guarded lazy calls it makes now (see monitor.log).
+
+    PYTHONPATH=src python benchmarks/bench_logging.py
+"""
+import json
+import logging
+import timeit
+from datetime import datetime
+
+from monitor.log import debug_sampler, setup_logging
+from monitor.models import Liquidation
+
+ITERATIONS = 100_000
+REPEAT = 5
+
+logger = logging.getLogger("bench")
+
+MESSAGE = {"e": "forceOrder", "E": 1568014460893, "o": {
+    "s": "BTCUSDT", "S": "SELL", "o": "LIMIT", "f": "IOC", "q": "0.014", "p": "9910", "ap": "9910",
+    "X": "FILLED", "l": "0.014", "z": "0.014", "T": 1568014460893}}
+LIQUIDATION = Liquidation("BTC", 9910.0, 0.014, datetime.now(), "BUY", 9910.0, 0.014)
+
+def eager():
+    """The six debug calls as f-strings: formatted whether or not they are emitted"""
+    logger.debug(f"Received raw liquidation message: {json.dumps(MESSAGE, indent=2)}")
+    logger.debug(f"Successfully created liquidation object: {LIQUIDATION}")
+    logger.debug(f"Received message: {MESSAGE}")
+    logger.debug(f"Processed liquidation: {LIQUIDATION}")
+    logger.debug(f"Printing liquidation: {LIQUIDATION}")
+    logger.debug(f"Adding trade: {LIQUIDATION}")
+
+def sampled():
+    """The same calls behind the sampler with lazy arguments"""
+    if debug_sampler():
+        logger.debug("Received raw liquidation message: %s", json.dumps(MESSAGE, indent=2))
+    if debug_sampler():
+        logger.debug("Successfully created liquidation object: %s", LIQUIDATION)
+    if debug_sampler():
+        logger.debug("Received message: %s", MESSAGE)
+    if debug_sampler():
+        logger.debug("Processed liquidation: %s", LIQUIDATION)
+    if debug_sampler():
+        logger.debug("Printing liquidation: %s", LIQUIDATION)
+    if debug_sampler():
+        logger.debug("Added trade: %s (trades count: %d)", LIQUIDATION, 1)
+
+def main():
+    setup_logging(debug=False)
+    print(f"Debug logging off, {ITERATIONS} messages, best of {REPEAT}")
+    for function in (eager, sampled):
+        best = min(timeit.repeat(function, number=ITERATIONS, repeat=REPEAT))
+        print(f"  {function.__name__:8} {best / ITERATIONS * 1e6:6.2f} us/message")
+
+if __name__ == "__main__":
+    main()
@@ -14,10 +14,13 @@ setup(
         "rich>=12.6.0",
         "numpy>=1.24.0",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=10.0"],  # crypto-monitor --archive-format parquet
+    },
     entry_points={
         "console_scripts": [
             "crypto-monitor=monitor.cli:main",
         ],
     },
-    python_requires=">=3.6.0",
+    python_requires=">=3.8",
 ) 
\ No newline at end of file
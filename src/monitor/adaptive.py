@@ -0,0 +1,130 @@
+import math
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .config import (
+    CATEGORY_ORDER, CATEGORY_THRESHOLDS, MARKET_CATEGORIES, ADAPTIVE_PERCENTILES, ADAPTIVE_ACCURACY,
+    ADAPTIVE_HALF_LIFE, ADAPTIVE_REFRESH, ADAPTIVE_MIN_TRADES, ADAPTIVE_MAX_SYMBOLS
+)
+from .symbol_rows import SymbolRows
+
+# USD range covered by the sketches; smaller and larger values share the end buckets
+SKETCH_MIN_VALUE = 1.0
+SKETCH_MAX_VALUE = 1e10
+
+# Quantile each category starts at, in CATEGORY_ORDER (categories sorted by size)
+QUANTILES = np.array([ADAPTIVE_PERCENTILES[key] / 100 for key, _ in
+                      sorted(MARKET_CATEGORIES.items(), key=lambda item: item[1].min_size)])
+
+class AdaptiveTiers:
+    """Per-symbol category thresholds taken from quantiles of recent trade sizes.
+
+    Each symbol has a log-bucketed quantile sketch (as in DDSketch): a
+    USD value v is counted in bucket ceil(log(v) / log(gamma)), so any
+    quantile read back is within the configured relative accuracy.
+    Sketches are rows of one preallocated (symbols, buckets) array, so
+    an update is O(1) and memory is fixed. Every ADAPTIVE_REFRESH
+    seconds the counts decay by the configured half-life and the
+    thresholds are recomputed; symbols with too few trades keep the
+    fixed category thresholds.
+    """
+
+    def __init__(self, accuracy: float = ADAPTIVE_ACCURACY, half_life: float = ADAPTIVE_HALF_LIFE,
+                 refresh: float = ADAPTIVE_REFRESH, min_trades: int = ADAPTIVE_MIN_TRADES,
+                 max_symbols: int = ADAPTIVE_MAX_SYMBOLS):
+        self.log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self.offset = math.ceil(math.log(SKETCH_MIN_VALUE) / self.log_gamma)
+        self.buckets = math.ceil(math.log(SKETCH_MAX_VALUE) / self.log_gamma) - self.offset + 1
+        # Representative value of each bucket, within accuracy of everything counted in it
+        upper = np.exp((np.arange(self.buckets) + self.offset) * self.log_gamma)
+        self.values = upper * 2 / (1 + math.exp(self.log_gamma))
+        self.counts = np.zeros((max_symbols, self.buckets), dtype=np.float32)
+        self.fixed = np.array(CATEGORY_THRESHOLDS, dtype=np.float64)
+        self.thresholds = np.tile(self.fixed, (max_symbols, 1))  # Current thresholds per row
+        self.adapted = np.zeros(max_symbols, dtype=bool)  # Rows using their own thresholds
+        self.half_life = half_life
+        self.refresh = refresh
+        self.min_trades = min_trades
+        self.last_refresh: Optional[float] = None
+        self.rows = SymbolRows(max_symbols)
+        self._warned = False
+
+    def take_warning(self) -> Optional[str]:
+        """A message, once, when more symbols traded than there are sketches"""
+        if self._warned or not self.rows.evicted:
+            return None
+        self._warned = True
+        return (f"More than {self.rows.capacity} pairs with --adaptive: the least recently traded lose "
+                f"their sketch and fall back to fixed categories until they have traded enough again")
+
+    def _row(self, symbol: str) -> int:
+        row, new = self.rows.assign(symbol)
+        if new:
+            self.counts[row] = 0
+            self.thresholds[row] = self.fixed
+            self.adapted[row] = False
+        return row
+
+    def add_batch(self, names: Sequence[str], index: np.ndarray, values: np.ndarray,
+                  now: Optional[float] = None) -> np.ndarray:
+        """Count a batch of trades and return their CATEGORY_ORDER indexes.
+
+        names and index are as from batch.group_symbols. Trades are
+        classified against the thresholds in force before the batch.
+        """
+        now = time.time() if now is None else now
+        rows = np.array([self._row(name) for name in names], dtype=np.intp)[index]
+        thresholds = self.thresholds[rows]
+        ranks = (values[:, None] >= thresholds).sum(axis=1) - 1
+        np.maximum(ranks, 0, out=ranks)
+
+        positive = np.maximum(values, SKETCH_MIN_VALUE)
+        buckets = np.ceil(np.log(positive) / self.log_gamma).astype(np.intp) - self.offset
+        np.clip(buckets, 0, self.buckets - 1, out=buckets)
+        np.add.at(self.counts, (rows, buckets), 1)
+
+        if self.last_refresh is None:
+            self.last_refresh = now
+        elif now - self.last_refresh >= self.refresh:
+            self._recompute(now)
+        return ranks
+
+    def _recompute(self, now: float):
+        """Decay the sketches and derive new thresholds from their quantiles"""
+        self.counts *= np.float32(0.5 ** ((now - self.last_refresh) / self.half_life))
+        self.last_refresh = now
+        totals = self.counts.sum(axis=1)
+        self.adapted = totals >= self.min_trades
+        rows = np.flatnonzero(self.adapted)
+        if not rows.size:
+            return
+        cumulative = np.cumsum(self.counts[rows], axis=1)
+        targets = QUANTILES[None, :] * totals[rows, None]
+        # First bucket whose cumulative count reaches each target, row by row
+        found = np.array([np.searchsorted(row_cumulative, row_targets)
+                          for row_cumulative, row_targets in zip(cumulative, targets)])
+        thresholds = self.values[np.minimum(found, self.buckets - 1)]
+        thresholds[:, QUANTILES <= 0] = 0  # The smallest category takes everything
+        self.thresholds[rows] = np.maximum.accumulate(thresholds, axis=1)
+
+    def describe(self, symbol: Optional[str] = None) -> str:
+        """Current thresholds per symbol, for the tiers command"""
+        symbols = [symbol] if symbol else [name for name, _ in self.rows]
+        if not symbols:
+            return "No trades yet"
+        names = " ".join(f"{category.name:>11}" for category in CATEGORY_ORDER[1:])
+        lines = [f"{'':<8} {'trades':>9} {names}"]
+        for name in symbols:
+            row = self.rows.get(name)
+            if row is None:
+                lines.append(f"{name:<8} no trades")
+                continue
+            values = " ".join(f"{value:>11,.0f}".replace(",", ".") for value in self.thresholds[row, 1:])
+            state = "" if self.adapted[row] else "  (fixed until enough trades)"
+            trades = f"{self.counts[row].sum():>9,.0f}".replace(",", ".")
+            lines.append(f"{name:<8} {trades} {values}{state}")
+        if self.rows.evicted:
+            lines.append(f"{self.rows.evicted} sketches reset for new pairs (room for {self.rows.capacity} pairs)")
+        return "\n".join(lines)
@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import ARCHIVE_SEGMENT_ROWS, ARCHIVE_SEGMENT_SECONDS, CATEGORY_THRESHOLDS
+
+logger = logging.getLogger(__name__)
+
+# One .npy file per column in every segment (Parquet segments use the same column names)
+COLUMNS = {
+    "ts": np.int64,       # Exchange time in milliseconds
+    "price": np.float64,
+    "qty": np.float64,
+    "side": np.int8,      # 1 = buy, 0 = sell (taker side)
+    "symbol": np.uint16,  # Index into the segment's symbols.json
+}
+SYMBOLS_FILE = "symbols.json"
+PARQUET_SUFFIX = ".parquet"
+DAY_MS = 86_400_000
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed for the Parquet format"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _day(day_number: int) -> str:
+    return datetime.fromtimestamp(day_number * 86400, timezone.utc).strftime("%Y-%m-%d")
+
+class Segment(NamedTuple):
+    """Sealed rows waiting to be written"""
+    path: str  # Without suffix; a directory of .npy files or path + .parquet
+    columns: Dict[str, np.ndarray]
+    symbols: List[str]
+
+class ArchiveWriter:
+    """Collects every processed trade into columnar segments, one folder per UTC day.
+
+    Batches are kept as column arrays and sealed into a segment once a
+    day holds ARCHIVE_SEGMENT_ROWS rows, its oldest row is
+    ARCHIVE_SEGMENT_SECONDS old, or the day has ended. write() stores a
+    segment as one .npy file per column (or one Parquet file) under a
+    temporary name and renames it into place, so readers never see a
+    partial segment and a crash loses only what was still buffered.
+    """
+
+    def __init__(self, directory: str, fmt: str = "npy", segment_rows: int = ARCHIVE_SEGMENT_ROWS,
+                 segment_seconds: float = ARCHIVE_SEGMENT_SECONDS):
+        self.directory = os.path.expanduser(directory)
+        self.format = fmt
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.symbols: List[str] = []  # Symbol ids are indexes into this list
+        self._ids: Dict[str, int] = {}
+        self._chunks: Dict[int, List[Tuple[np.ndarray, ...]]] = {}  # UTC day number -> column chunks
+        self._rows: Dict[int, int] = {}
+        self._started: Dict[int, float] = {}  # Day -> when its oldest buffered rows arrived
+        self._sealed: List[Segment] = []
+        self._sequence = 0  # Keeps segment names unique within the process
+
+    def _id(self, symbol: str) -> int:
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return symbol_id
+
+    def add_batch(self, names: Sequence[str], index: np.ndarray, times: np.ndarray, prices: np.ndarray,
+                  quantities: np.ndarray, buys: np.ndarray, now: Optional[float] = None):
+        """Buffer a batch; times are exchange timestamps in milliseconds (names and index as from batch.group_symbols)"""
+        if not len(prices):
+            return
+        now = time.time() if now is None else now
+        columns = (times.astype(np.int64), prices, quantities, buys.astype(np.int8),
+                   np.array([self._id(name) for name in names], dtype=np.uint16)[index])
+        days = columns[0] // DAY_MS
+        if days[0] == days[-1] and (days == days[0]).all():
+            self._buffer(int(days[0]), columns, now)
+        else:  # The batch straddles midnight UTC
+            for day in np.unique(days).tolist():
+                mask = days == day
+                self._buffer(day, tuple(column[mask] for column in columns), now)
+        if self._chunks:  # Empty when the batch just sealed the only buffered day
+            latest = max(self._chunks)
+            for day in [day for day in self._chunks if day < latest]:
+                self._seal(day)  # No more trades expected for days that have ended
+
+    def _buffer(self, day: int, columns: Tuple[np.ndarray, ...], now: float):
+        self._chunks.setdefault(day, []).append(columns)
+        self._rows[day] = self._rows.get(day, 0) + len(columns[0])
+        self._started.setdefault(day, now)
+        if self._rows[day] >= self.segment_rows:
+            self._seal(day)
+
+    def _seal(self, day: int):
+        chunks = self._chunks.pop(day)
+        del self._rows[day], self._started[day]
+        columns = {name: np.concatenate([chunk[i] for chunk in chunks]).astype(dtype, copy=False)
+                   for i, (name, dtype) in enumerate(COLUMNS.items())}
+        self._sequence += 1
+        name = f"{int(columns['ts'][0])}-{os.getpid()}-{self._sequence}"
+        path = os.path.join(self.directory, _day(day), name)
+        self._sealed.append(Segment(path, columns, list(self.symbols)))
+
+    def take_segments(self, now: Optional[float] = None) -> List[Segment]:
+        """Seal days buffered for ARCHIVE_SEGMENT_SECONDS and hand over every sealed segment"""
+        now = time.time() if now is None else now
+        for day, started in list(self._started.items()):
+            if now - started >= self.segment_seconds:
+                self._seal(day)
+        sealed, self._sealed = self._sealed, []
+        return sealed
+
+    def seal_all(self):
+        """Seal everything buffered, e.g. before exiting"""
+        for day in list(self._chunks):
+            self._seal(day)
+
+    def write(self, segments: List[Segment]):
+        """Store sealed segments; safe to run off the event loop"""
+        for segment in segments:
+            try:
+                if self.format == "parquet":
+                    _write_parquet(segment)
+                else:
+                    _write_npy(segment)
+            except OSError as e:
+                logger.error(f"Error writing archive segment {segment.path}: {e}")
+
+def _write_npy(segment: Segment):
+    folder, name = os.path.split(segment.path)
+    temporary = os.path.join(folder, f".{name}.tmp")
+    os.makedirs(temporary, exist_ok=True)
+    for column, values in segment.columns.items():
+        np.save(os.path.join(temporary, column + ".npy"), values)
+    with open(os.path.join(temporary, SYMBOLS_FILE), "w") as f:
+        json.dump(segment.symbols, f)
+    os.rename(temporary, segment.path)
+
+def _write_parquet(segment: Segment):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    os.makedirs(os.path.dirname(segment.path), exist_ok=True)
+    columns = dict(segment.columns)
+    # Symbols as a dictionary-encoded string column, readable as names by any Parquet tool
+    columns["symbol"] = pa.DictionaryArray.from_arrays(columns["symbol"].astype(np.int32), pa.array(segment.symbols))
+    temporary = segment.path + PARQUET_SUFFIX + ".tmp"
+    pq.write_table(pa.table(columns), temporary)
+    os.rename(temporary, segment.path + PARQUET_SUFFIX)
+
+def _read_npy(path: str) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    columns = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in COLUMNS}
+    with open(os.path.join(path, SYMBOLS_FILE)) as f:
+        return columns, json.load(f)
+
+def _read_parquet(path: str) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, memory_map=True).unify_dictionaries()
+    symbol = table.column("symbol").combine_chunks()
+    columns = {name: table.column(name).to_numpy() for name in COLUMNS if name != "symbol"}
+    columns["symbol"] = symbol.indices.to_numpy(zero_copy_only=False)
+    return columns, symbol.dictionary.to_pylist()
+
+def scan_segments(directory: str, start_ms: Optional[int] = None,
+                  end_ms: Optional[int] = None) -> Iterator[Tuple[Dict[str, np.ndarray], List[str]]]:
+    """Columns (memory-mapped for .npy) and symbols of each segment in the days of [start_ms, end_ms)"""
+    directory = os.path.expanduser(directory)
+    if not os.path.isdir(directory):
+        return
+    first_day = _day(start_ms // DAY_MS) if start_ms is not None else None
+    last_day = _day(end_ms // DAY_MS) if end_ms is not None else None
+    for day in sorted(os.listdir(directory)):
+        if (first_day and day < first_day) or (last_day and day > last_day):
+            continue
+        folder = os.path.join(directory, day)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.startswith("."):
+                continue  # Still being written
+            path = os.path.join(folder, name)
+            try:
+                if name.endswith(PARQUET_SUFFIX):
+                    if parquet_available():
+                        yield _read_parquet(path)
+                    else:
+                        logger.warning(f"Skipping {path}: pyarrow is not installed")
+                elif os.path.isdir(path):
+                    yield _read_npy(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable segment {path}: {e}")
+
+class ArchiveStats(NamedTuple):
+    """Totals per symbol (rows, in symbols order) and category (columns, in CATEGORY_ORDER)"""
+    symbols: List[str]
+    counts: np.ndarray
+    volume: np.ndarray      # USD
+    buy_volume: np.ndarray  # USD
+    segments: int
+
+def archive_stats(directory: str, symbol: Optional[str] = None, start_ms: Optional[int] = None,
+                  end_ms: Optional[int] = None) -> ArchiveStats:
+    """Trade counts and USD volume by symbol and category over the archived segments.
+
+    Each segment is filtered and aggregated with NumPy on its mapped
+    columns: one comparison per filter, one searchsorted against the
+    category thresholds and one bincount per total over a combined
+    (symbol, category) key, so only the columns needed are read.
+    """
+    thresholds = np.array(CATEGORY_THRESHOLDS)
+    categories = len(thresholds)
+    symbols: List[str] = []
+    ids: Dict[str, int] = {}
+    totals = np.zeros((3, 0, categories))  # counts, volume, buy volume
+    segments = 0
+    for columns, segment_symbols in scan_segments(directory, start_ms, end_ms):
+        rows = None
+        if symbol is not None:
+            if symbol not in segment_symbols:
+                continue
+            rows = columns["symbol"] == segment_symbols.index(symbol)
+        ts = columns["ts"]
+        for keep in ((ts >= start_ms) if start_ms is not None else None,
+                     (ts < end_ms) if end_ms is not None else None):
+            if keep is not None:
+                rows = keep if rows is None else rows & keep
+        if rows is None:
+            prices, quantities, sides, symbol_ids = (columns[name] for name in ("price", "qty", "side", "symbol"))
+        else:
+            prices, quantities, sides, symbol_ids = (columns[name][rows] for name in ("price", "qty", "side", "symbol"))
+        segments += 1
+        if not len(prices):
+            continue
+        for name in segment_symbols:
+            if name not in ids:
+                ids[name] = len(symbols)
+                symbols.append(name)
+        values = np.multiply(prices, quantities)
+        ranks = np.clip(np.searchsorted(thresholds, values, side="right") - 1, 0, categories - 1)
+        remap = np.array([ids[name] for name in segment_symbols], dtype=np.intp)
+        keys = remap[symbol_ids] * categories + ranks
+        size = len(symbols) * categories
+        if totals.shape[1] < len(symbols):
+            totals = np.pad(totals, ((0, 0), (0, len(symbols) - totals.shape[1]), (0, 0)))
+        totals[0] += np.bincount(keys, minlength=size).reshape(-1, categories)
+        totals[1] += np.bincount(keys, weights=values, minlength=size).reshape(-1, categories)
+        totals[2] += np.bincount(keys, weights=np.where(sides == 1, values, 0.0), minlength=size).reshape(-1, categories)
+    return ArchiveStats(symbols, totals[0].astype(np.int64), totals[1], totals[2], segments)
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from .config import CATEGORY_THRESHOLDS
+
+logger = logging.getLogger(__name__)
+
+# Most frames handled as one batch; bounds the delay before the first one is shown
+MAX_BATCH = 512
+
+# Frames buffered between the socket reader and the processing loop
+FRAME_QUEUE_SIZE = 4 * MAX_BATCH
+
+_THRESHOLDS = np.array(CATEGORY_THRESHOLDS, dtype=np.float64)
+
+async def read_frames(ws, queue: asyncio.Queue):
+    """Move frames from the socket into queue; the error that ends the
+    connection is queued last so the consumer can raise it in order"""
+    try:
+        while True:
+            await queue.put(await ws.recv())
+    except Exception as e:
+        await queue.put(e)
+
+async def next_batch(queue: asyncio.Queue) -> List[Union[str, Exception]]:
+    """Wait for one frame, then take every frame already queued without blocking"""
+    batch = [await queue.get()]
+    while len(batch) < MAX_BATCH:
+        try:
+            batch.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return batch
+
+def to_float_array(values: List[str]) -> np.ndarray:
+    """Parse decimal strings from event payloads straight into an array"""
+    return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+
+def classify(prices: np.ndarray, quantities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """USD value and CATEGORY_ORDER index of every trade in a batch"""
+    values = prices * quantities
+    ranks = np.searchsorted(_THRESHOLDS, values, side="right") - 1
+    np.maximum(ranks, 0, out=ranks)
+    return values, ranks
+
+def group_symbols(orders: List[dict]) -> Tuple[List[str], np.ndarray]:
+    """Distinct symbols of a batch (USDT suffix removed) and each event's index into them"""
+    ids = {}
+    index = np.fromiter((ids.setdefault(order.get('s'), len(ids)) for order in orders),
+                        dtype=np.intp, count=len(orders))
+    return [str(symbol).replace('USDT', '') for symbol in ids], index
@@ -0,0 +1,183 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import CANDLE_INTERVALS, CANDLE_GRACE
+
+logger = logging.getLogger(__name__)
+
+# One candle as stored on disk; files are a plain sequence of these records
+CANDLE_DTYPE = np.dtype([
+    ("open_time", "i8"),     # Unix time in seconds the candle starts at
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),        # Base asset quantity
+    ("buy_volume", "f8"),
+    ("sell_volume", "f8"),
+    ("quote_volume", "f8"),  # USD value
+    ("trades", "u4"),
+])
+
+CANDLE_SUFFIX = ".ohlcv"
+
+def candle_path(directory: str, interval: str, symbol: str, day: str) -> str:
+    """File holding one symbol's candles of one interval for one UTC day (YYYY-MM-DD)"""
+    return os.path.join(directory, interval, symbol, day + CANDLE_SUFFIX)
+
+def _day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+class CandleBuilder:
+    """Builds OHLCV candles per symbol for each interval from every processed trade.
+
+    A batch is grouped by symbol and candle with one np.unique over a
+    combined (symbol, bucket) key; open, close, high, low and the volume
+    sums of each group come from array operations, and only one merge per
+    group touches the open candles. Candles are closed once their
+    interval (plus a short grace period for late trades) has passed and
+    are appended by write() to fixed-width record files, one per symbol
+    per UTC day. Files are only ever appended to, so a crash loses at
+    most the candles still open.
+    """
+
+    def __init__(self, directory: str, intervals: Optional[Dict[str, int]] = None):
+        self.directory = os.path.expanduser(directory)
+        self.intervals = dict(CANDLE_INTERVALS if intervals is None else intervals)
+        # (interval name, symbol) -> open candle as a list in CANDLE_DTYPE field order
+        self._open: Dict[Tuple[str, str], list] = {}
+        self._closed: Dict[str, List[tuple]] = {}  # File path -> candles waiting to be written
+
+    def add_batch(self, names: Sequence[str], index: np.ndarray, times: np.ndarray, prices: np.ndarray,
+                  quantities: np.ndarray, buys: np.ndarray):
+        """Count a batch of trades; times are exchange timestamps in milliseconds.
+
+        names and index are as from batch.group_symbols, and the arrays
+        are in arrival order.
+        """
+        if not len(prices):
+            return
+        values = prices * quantities
+        buy_quantities = np.where(buys, quantities, 0.0)
+        for interval, seconds in self.intervals.items():
+            buckets = times.astype(np.int64) // (seconds * 1000)
+            keys = (index.astype(np.int64) << 40) | buckets
+            groups, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            # Last trade of each group: first index of the reversed array
+            _, last_reversed = np.unique(keys[::-1], return_index=True)
+            last = len(keys) - 1 - last_reversed
+            highs = np.full(len(groups), -np.inf)
+            lows = np.full(len(groups), np.inf)
+            np.maximum.at(highs, inverse, prices)
+            np.minimum.at(lows, inverse, prices)
+            volume = np.bincount(inverse, weights=quantities, minlength=len(groups))
+            buy_volume = np.bincount(inverse, weights=buy_quantities, minlength=len(groups))
+            quote_volume = np.bincount(inverse, weights=values, minlength=len(groups))
+            counts = np.bincount(inverse, minlength=len(groups))
+            # Groups are sorted by symbol, then by candle, so candles close in order
+            for g in range(len(groups)):
+                self._merge(interval, names[index[first[g]]], int(groups[g] & ((1 << 40) - 1)) * seconds,
+                            float(prices[first[g]]), float(highs[g]), float(lows[g]), float(prices[last[g]]),
+                            float(volume[g]), float(buy_volume[g]), float(quote_volume[g]), int(counts[g]))
+
+    def _merge(self, interval: str, symbol: str, open_time: int, open_: float, high: float, low: float,
+               close: float, volume: float, buy_volume: float, quote_volume: float, trades: int):
+        key = (interval, symbol)
+        candle = self._open.get(key)
+        if candle is not None and open_time > candle[0]:
+            self._close(interval, symbol, candle)
+            candle = None
+        if candle is None:
+            self._open[key] = [open_time, open_, high, low, close, volume, buy_volume,
+                               volume - buy_volume, quote_volume, trades]
+            return
+        # Same candle, or a late trade for one already replaced: count it in the open one
+        candle[2] = max(candle[2], high)
+        candle[3] = min(candle[3], low)
+        candle[4] = close
+        candle[5] += volume
+        candle[6] += buy_volume
+        candle[7] += volume - buy_volume
+        candle[8] += quote_volume
+        candle[9] += trades
+
+    def _close(self, interval: str, symbol: str, candle: list):
+        path = candle_path(self.directory, interval, symbol, _day(candle[0]))
+        self._closed.setdefault(path, []).append(tuple(candle))
+
+    def close_expired(self, now: Optional[float] = None):
+        """Close open candles whose interval ended more than CANDLE_GRACE seconds ago"""
+        now = time.time() if now is None else now
+        for key, candle in list(self._open.items()):
+            interval, symbol = key
+            if candle[0] + self.intervals[interval] + CANDLE_GRACE <= now:
+                del self._open[key]
+                self._close(interval, symbol, candle)
+
+    def close_all(self):
+        """Close every open candle, e.g. before exiting"""
+        for (interval, symbol), candle in self._open.items():
+            self._close(interval, symbol, candle)
+        self._open.clear()
+
+    def take_closed(self) -> Dict[str, List[tuple]]:
+        """Hand over the closed candles not yet written, by file"""
+        closed, self._closed = self._closed, {}
+        return closed
+
+    @staticmethod
+    def write(closed: Dict[str, List[tuple]]):
+        """Append closed candles to their files; safe to run off the event loop"""
+        for path, candles in closed.items():
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "ab") as f:
+                    # Drop a record cut short by a crash so new ones stay aligned
+                    partial = os.path.getsize(path) % CANDLE_DTYPE.itemsize
+                    if partial:
+                        f.truncate(os.path.getsize(path) - partial)
+                    f.write(np.array(candles, dtype=CANDLE_DTYPE).tobytes())
+            except OSError as e:
+                logger.error(f"Error writing candles to {path}: {e}")
+
+def _open_candles(path: str) -> np.ndarray:
+    """Memory-map a candle file; a record cut short by a crash is ignored"""
+    count = os.path.getsize(path) // CANDLE_DTYPE.itemsize
+    if not count:
+        return np.zeros(0, dtype=CANDLE_DTYPE)
+    return np.memmap(path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))
+
+def read_candles(directory: str, symbol: str, interval: str = "1m", start: Optional[float] = None,
+                 end: Optional[float] = None) -> np.ndarray:
+    """Candles of a symbol opening in [start, end) (Unix seconds), as a CANDLE_DTYPE array.
+
+    Only the files of the days in range are opened, each is memory-mapped
+    and the range is found by binary search on open_time, so just the
+    selected records are read from disk. Without start or end the range
+    is open on that side.
+    """
+    folder = os.path.join(os.path.expanduser(directory), interval, symbol.upper())
+    if not os.path.isdir(folder):
+        return np.zeros(0, dtype=CANDLE_DTYPE)
+    first_day = _day(start) if start is not None else None
+    last_day = _day(end) if end is not None else None
+    parts = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(CANDLE_SUFFIX):
+            continue
+        day = name[:-len(CANDLE_SUFFIX)]
+        if (first_day and day < first_day) or (last_day and day > last_day):
+            continue
+        candles = _open_candles(os.path.join(folder, name))
+        lo = 0 if start is None else np.searchsorted(candles["open_time"], start, side="left")
+        hi = len(candles) if end is None else np.searchsorted(candles["open_time"], end, side="left")
+        if hi > lo:
+            parts.append(np.array(candles[lo:hi]))
+    if not parts:
+        return np.zeros(0, dtype=CANDLE_DTYPE)
+    return np.concatenate(parts)
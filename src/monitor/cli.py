@@ -1,7 +1,7 @@
 import asyncio
 import json
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, FrozenSet, List, Optional, Sequence, Tuple
 import logging
 import signal
 import argparse
@@ -11,27 +11,119 @@ import threading
 import os
 
 import click
+import numpy as np
+from click.core import ParameterSource
 import websockets
 from websockets.exceptions import ConnectionClosed
 
 from .config import (
     DEFAULT_PAIRS, WS_ENDPOINT, TRADE_STREAM, 
-    LIQUIDATION_STREAM, WS_STREAM, DEFAULT_MIN_TRADE_SIZE, MARKET_CATEGORIES
+    LIQUIDATION_STREAM, WS_STREAM, DEFAULT_MIN_TRADE_SIZE, MARKET_CATEGORIES,
+    DEFAULT_HISTORY_MB, DEFAULT_CONTROL_SOCKET, SPARKLINE_MINUTES, ALL_LIQUIDATIONS_STREAM, MOCK_HOST, MOCK_PORT,
+    MINI_TICKER_STREAM, ALL_MINI_TICKER_STREAM, DEFAULT_CANDLE_DIR, CANDLE_FLUSH_INTERVAL, DEFAULT_STORE_PATH,
+    DEFAULT_STORE_CATEGORY, DEFAULT_ARCHIVE_DIR, ARCHIVE_FLUSH_INTERVAL, INGEST_WAKEUP_TIMEOUT, DEFAULT_FEED_SOCKETS,
+    ADAPTIVE_MAX_SYMBOLS, ADAPTIVE_ALL_SYMBOLS, CATEGORY_ORDER, category_index, FEED_SOCKET_MODE
 )
-from .models import Trade, Liquidation
+from .models import BaseTrade, Trade, Liquidation
 from .display import display
+from .display.panel import format_size_stats
+from .display.formatters import format_price, format_quantity, format_value
 from .sound import sound_player
+from .trace import tracer
+from .log import debug_sampler, setup_logging, stop_logging
+from .keyboard import keyboard
+from .summary import FlowAggregator
+from .control import control, send_command
+from .subscriptions import SubscriptionManager, normalize_pair, exchange_symbol
+from .mock_server import run_mock_server
+from .ticker import TickerTable
+from .adaptive import AdaptiveTiers
+from .candles import CandleBuilder
+from .store import TradeStore, query_trades
+from .archive import ArchiveWriter, archive_stats, parquet_available
+from .ingest import RECORD_DTYPE, IngestPool
+from .daemon import FILTER, RECORDS, STATUS, FeedDaemon, attach_feed, encode_frame, read_frame
+from .plugins import EventBatch, PluginHost, load_plugin
+from .batch import FRAME_QUEUE_SIZE, read_frames, next_batch, to_float_array, classify, group_symbols
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a burst of SIGWINCH signals to settle before relayout
+RESIZE_DEBOUNCE = 0.05
+
+# Category filters the +/- keys step through, smallest first
+CATEGORY_STEPS = sorted(MARKET_CATEGORIES.items(), key=lambda item: item[1].min_size)
+
+# Fields an event (a liquidation's "o" object) needs to be shown; events missing any are dropped before counting
+REQUIRED_FIELDS = {"trades": frozenset(("T", "s", "m", "p", "q", "t")),
+                   "liquidations": frozenset(("T", "s", "S", "p", "q"))}
+
 class MarketFeed:
-    def __init__(self, mode: str):
+    def __init__(self, mode: str, min_value: float = 0):
         self.running = True
         self.mode = mode
+        self.min_value = min_value  # Smallest USD value shown
+        self.focus: Optional[str] = None  # Only this symbol is processed when set
+        self.adaptive: Optional[AdaptiveTiers] = None  # Per-symbol categories when set
+        self.candles: Optional[CandleBuilder] = None  # OHLCV candles of every trade when set
+        self.store: Optional[TradeStore] = None  # SQLite store of large trades when set
+        self.archive: Optional[ArchiveWriter] = None  # Columnar archive of every trade when set
+        self.ingest: Optional[IngestPool] = None  # Worker processes receiving the streams when set
+        self.plugins: Optional[PluginHost] = None  # Plugins given every normalized event when set
     
     def stop(self):
         self.running = False
+
+    def close(self):
+        """Stop the ingest workers and plugins and write out the data the feed keeps on disk before exiting"""
+        if self.ingest is not None:
+            self.ingest.stop()
+        if self.plugins is not None:
+            self.plugins.close()
+        if self.candles is not None:
+            try:
+                self.candles.close_all()
+                self.candles.write(self.candles.take_closed())
+            except Exception as e:
+                logger.error(f"Error saving candles: {e}")
+        if self.store is not None:
+            self.store.stop()
+        if self.archive is not None:
+            try:
+                self.archive.seal_all()
+                self.archive.write(self.archive.take_segments())
+            except Exception as e:
+                logger.error(f"Error saving the archive: {e}")
+
+    def set_filter(self, min_value: float, min_category: Optional[str] = None):
+        """Change the size filter; applies from the next message, no reconnect needed"""
+        self.min_value = min_value
+        display.update_settings(min_category=min_category, min_size=min_value)
+
+    def step_min_category(self, step: int):
+        """Move the size filter one category up (step=1) or down (step=-1)"""
+        if step > 0:
+            candidates = [item for item in CATEGORY_STEPS if item[1].min_size > self.min_value][:1]
+        else:
+            candidates = [item for item in CATEGORY_STEPS if item[1].min_size < self.min_value][-1:]
+        if not candidates:
+            return
+        name, category = candidates[0]
+        if category.min_size > 0:
+            self.set_filter(category.min_size, name)
+        else:
+            self.set_filter(0)
+
+    def cycle_focus(self):
+        """Narrow the feed to the next symbol seen so far, then back to all"""
+        symbols = sorted(display.last_price)
+        if self.focus in symbols:
+            index = symbols.index(self.focus) + 1
+            self.focus = symbols[index] if index < len(symbols) else None
+        else:
+            self.focus = symbols[0] if symbols and self.focus is None else None
+        display.set_focus(self.focus)
     
     def process_trade_message(self, msg: dict) -> Optional[Trade]:
         """Process a trade message and return a Trade object if valid"""
@@ -71,7 +163,8 @@ class MarketFeed:
     def process_liquidation_message(self, msg: dict) -> Optional[Liquidation]:
         """Process a liquidation message and return a Liquidation object if valid"""
         try:
-            logger.debug(f"Received raw liquidation message: {json.dumps(msg, indent=2)}")
+            if debug_sampler():
+                logger.debug("Received raw liquidation message: %s", json.dumps(msg, indent=2))
             
             if not isinstance(msg, dict):
                 logger.error(f"Invalid message format (not a dict): {type(msg)}")
@@ -80,7 +173,7 @@ class MarketFeed:
             # Check event type
             event_type = msg.get('e')
             if event_type != 'forceOrder':
-                logger.debug(f"Skipping non-liquidation event: {event_type}")
+                logger.debug("Skipping non-liquidation event: %s", event_type)
                 return None
             
             # Extract order data
@@ -108,7 +201,8 @@ class MarketFeed:
                     position_size=float(order_data.get('z', 0))
                 )
                 
-                logger.debug(f"Successfully created liquidation object: {liquidation}")
+                if debug_sampler():
+                    logger.debug("Successfully created liquidation object: %s", liquidation)
                 return liquidation
                 
             except (KeyError, ValueError) as e:
@@ -126,7 +220,8 @@ class MarketFeed:
             if trade is None:
                 logger.warning("Attempted to print None trade")
                 return
-            logger.debug(f"Printing trade: {trade}")
+            if debug_sampler():
+                logger.debug("Printing trade: %s", trade)
             display.add_trade(trade)
             
             # Play sound only if the category has trade sound configuration
@@ -149,7 +244,8 @@ class MarketFeed:
             if liquidation is None:
                 logger.warning("Attempted to print None liquidation")
                 return
-            logger.debug(f"Printing liquidation: {liquidation}")
+            if debug_sampler():
+                logger.debug("Printing liquidation: %s", liquidation)
             display.add_trade(liquidation)
             
             # Play sound only if the category has liquidation sound configuration
@@ -166,6 +262,424 @@ class MarketFeed:
         except Exception as e:
             logger.error(f"Error printing liquidation: {e}")
 
+    def _parse_orders(self, orders: List[dict]) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Prices, quantities and, when something records them, exchange times in milliseconds"""
+        prices = to_float_array([order['p'] for order in orders])
+        quantities = to_float_array([order['q'] for order in orders])
+        times = None
+        if (self.candles is not None or self.store is not None or self.archive is not None
+                or self.plugins is not None):
+            now = time.time() * 1000
+            times = np.fromiter((order.get('T') or now for order in orders), dtype=np.float64, count=len(orders))
+        return prices, quantities, times
+
+    def _well_formed(self, order: dict) -> bool:
+        """Whether an event has the required fields and they parse; logs the ones that don't"""
+        missing = REQUIRED_FIELDS[self.mode] - order.keys()
+        if missing:
+            logger.error(f"Skipping malformed {self.mode[:-1]} event {order}: missing {', '.join(sorted(missing))}")
+            return False
+        try:
+            float(order['p']), float(order['q']), float(order.get('T') or 0)
+            return True
+        except (KeyError, ValueError, TypeError) as e:
+            logger.error(f"Skipping malformed {self.mode[:-1]} event {order}: {e!r}")
+            return False
+
+    def _buy_mask(self, orders: List[dict]) -> np.ndarray:
+        """Which events of a batch are buys, as print_trade and print_liquidation report them"""
+        if self.mode == "trades":
+            buys = (not order.get('m') for order in orders)
+        else:
+            buys = (order.get('S') == "SELL" for order in orders)  # Sides are reversed, see process_liquidation_message
+        return np.fromiter(buys, dtype=bool, count=len(orders))
+
+    def _update_profile(self, prices: np.ndarray, values: np.ndarray, buys: np.ndarray, focused: np.ndarray):
+        """Add every trade of the focused symbol, shown or not, to its volume profile"""
+        profile = display.profile
+        if profile is None or profile.symbol != self.focus:
+            return
+        index = np.flatnonzero(focused)
+        if index.size:
+            profile.add_batch(prices[index], values[index], buys[index])
+
+    def _store_batch(self, trade_ids: Sequence[Optional[int]], names: List[str], index: np.ndarray,
+                     times: np.ndarray, prices: np.ndarray, quantities: np.ndarray, values: np.ndarray,
+                     ranks: np.ndarray, buys: np.ndarray):
+        """Queue the events at or above the store's category for the SQLite writer"""
+        keep = np.flatnonzero(ranks >= self.store.min_category)
+        if not keep.size:
+            return
+        kind = "trade" if self.mode == "trades" else "liquidation"
+        symbols = [names[j] for j in index[keep].tolist()]
+        sides = ["BUY" if buy else "SELL" for buy in buys[keep].tolist()]
+        ids = [trade_ids[i] for i in keep.tolist()]
+        # tolist() gives Python numbers, which sqlite3 binds (NumPy integers it rejects)
+        self.store.add_rows(zip((times[keep] / 1000).tolist(), symbols, [kind] * len(keep), sides,
+                                prices[keep].tolist(), quantities[keep].tolist(), values[keep].tolist(),
+                                ranks[keep].tolist(), ids))
+
+    def process_batch(self, events: List[dict], aggregator: Optional[FlowAggregator] = None,
+                      symbols: Optional[FrozenSet[str]] = None) -> int:
+        """Classify and filter a batch of events with array operations.
+
+        Prices and quantities are parsed into arrays, USD values and
+        categories come from one multiply and one searchsorted, and the
+        size filter is a mask; only events that pass become Trade or
+        Liquidation objects. Returns how many were displayed.
+        """
+        trades_mode = self.mode == "trades"
+        with tracer.span("parse", args={"events": len(events)}):
+            if trades_mode:
+                events = [event for event in events if event.get('e') == 'trade']
+                orders = events
+            else:
+                events = [event for event in events if event.get('e') == 'forceOrder' and isinstance(event.get('o'), dict)
+                          and (symbols is None or event['o'].get('s') in symbols)]
+                orders = [event['o'] for event in events]
+            if not events:
+                return 0
+            required = REQUIRED_FIELDS[self.mode]
+            try:
+                if not all(order.keys() >= required for order in orders):
+                    raise KeyError("missing fields")
+                prices, quantities, times = self._parse_orders(orders)
+            except (KeyError, ValueError, TypeError):
+                # Report and drop only the malformed events; the rest stay on the column path
+                kept = [i for i, order in enumerate(orders) if self._well_formed(order)]
+                events = [events[i] for i in kept]
+                orders = [orders[i] for i in kept]
+                if not events:
+                    return 0
+                prices, quantities, times = self._parse_orders(orders)
+            names, index = group_symbols(orders)
+            buys = self._buy_mask(orders)
+            keep_ids = self.store is not None or self.plugins is not None
+            trade_ids = [order.get('t') for order in orders] if keep_ids else ()
+
+        build = self.process_trade_message if trades_mode else self.process_liquidation_message
+        return self._process_columns(names, index, prices, quantities, buys, times, trade_ids,
+                                     lambda i: build(events[i]), aggregator)
+
+    def process_records(self, records: np.ndarray, aggregator: Optional[FlowAggregator] = None,
+                        symbols: Optional[FrozenSet[str]] = None) -> int:
+        """Classify and filter a batch of records decoded by ingest workers; see process_batch"""
+        with tracer.span("parse", args={"events": len(records)}):
+            if symbols is not None:
+                records = records[np.isin(records["symbol"], [symbol.encode() for symbol in symbols])]
+            if not len(records):
+                return 0
+            raw_names, index = np.unique(records["symbol"], return_inverse=True)
+            names = [name.decode().replace('USDT', '') for name in raw_names.tolist()]
+            index = index.ravel()  # Some NumPy versions keep the input's shape
+            buys = records["buy"]
+            trade_ids = records["trade_id"].tolist() if self.mode == "trades" else [None] * len(records)
+
+        def build(i: int) -> BaseTrade:
+            record = records[i]
+            fields = dict(symbol=names[index[i]], price=float(record["price"]), quantity=float(record["qty"]),
+                          timestamp=datetime.fromtimestamp(int(record["time"]) / 1000),
+                          side="BUY" if record["buy"] else "SELL")
+            if self.mode == "trades":
+                return Trade(trade_id=str(int(record["trade_id"])), **fields)
+            return Liquidation(bankruptcy_price=float(record["avg_price"]), position_size=float(record["filled"]),
+                               **fields)
+
+        return self._process_columns(names, index, records["price"], records["qty"], buys,
+                                     records["time"].astype(np.float64), trade_ids, build, aggregator)
+
+    def _process_columns(self, names: List[str], index: np.ndarray, prices: np.ndarray, quantities: np.ndarray,
+                         buys: np.ndarray, times: Optional[np.ndarray], trade_ids: Sequence[Optional[int]],
+                         build: Callable[[int], Optional[BaseTrade]],
+                         aggregator: Optional[FlowAggregator] = None) -> int:
+        """Count, filter and show a batch given as arrays; build(i) makes the trade object of event i"""
+        trades_mode = self.mode == "trades"
+        with tracer.span("filter"):
+            values, ranks = classify(prices, quantities)
+            # Every trade counts towards the header sparklines, size histograms and leaderboard, shown or not
+            if display.sparklines is not None:
+                display.sparklines.add_batch(names, index, prices)
+            display.sizes.add_batch(names, index, values)
+            display.leaders.add_batch(names, index, values, buys)
+            if self.candles is not None:
+                self.candles.add_batch(names, index, times, prices, quantities, buys)
+            if self.archive is not None:
+                self.archive.add_batch(names, index, times, prices, quantities, buys)
+            if self.adaptive is not None:
+                # Categories come from each symbol's own sizes; the filter applies to the category
+                ranks = self.adaptive.add_batch(names, index, values)
+                warning = self.adaptive.take_warning()
+                if warning:
+                    display.print_error(warning)
+                shown = ranks >= category_index(self.min_value)
+            else:
+                shown = values >= self.min_value
+            if self.store is not None:
+                self._store_batch(trade_ids, names, index, times, prices, quantities, values, ranks, buys)
+            if self.plugins is not None:
+                self.plugins.publish(EventBatch("trade" if trades_mode else "liquidation", names, index, times,
+                                                prices, quantities, values, ranks, buys, trade_ids))
+            focused = None
+            if self.focus is not None:
+                focused = index == (names.index(self.focus) if self.focus in names else -1)
+                shown &= focused
+                self._update_profile(prices, values, buys, focused)
+
+        count = 0
+        for i in np.flatnonzero(shown):
+            trade = build(i)
+            if trade is None:
+                continue
+            trade._category_rank = int(ranks[i])
+            if trades_mode:
+                self.print_trade(trade)
+            else:
+                self.print_liquidation(trade)
+            count += 1
+
+        if aggregator is not None:
+            # Sub-threshold flow is summed straight from the arrays
+            rest = ~shown if focused is None else focused & ~shown
+            for i in np.flatnonzero(rest):
+                side = "BUY" if buys[i] else "SELL"
+                aggregator.add_flow(names[index[i]], side, float(quantities[i]), float(values[i]))
+        return count
+
+def cleanup_before_exit():
+    """Restore the terminal, paint the last frame and write out diagnostics before exiting"""
+    keyboard.stop()
+    control.stop()
+    display.close(timeout=0.5)
+    try:
+        tracer.write()
+    except Exception as e:
+        logger.error(f"Error writing trace: {e}")
+    stop_logging()
+
+async def animate_display(rate: float):
+    """Drive the blink animation at a fixed rate, independent of trade flow"""
+    interval = 1.0 / rate
+    while True:
+        await asyncio.sleep(interval)
+        display.blink()
+
+async def emit_summaries(aggregator: FlowAggregator, interval: float):
+    """Show the flow of sub-threshold trades as summary rows every interval"""
+    while True:
+        await asyncio.sleep(interval)
+        summaries = aggregator.drain(datetime.now())
+        for summary in summaries:
+            display.add_trade(summary)
+        if summaries:
+            display.update_display()
+
+async def refresh_header(rate: float):
+    """Repaint the price line at a low fixed rate instead of on every trade"""
+    interval = 1.0 / rate
+    while True:
+        display.refresh_prices()
+        display.refresh_panel()
+        await asyncio.sleep(interval)
+
+async def finish_write(write: asyncio.Future):
+    """Wait for a write running in the executor; if cancelled, still wait for it before stopping"""
+    try:
+        await asyncio.shield(write)
+    except asyncio.CancelledError:
+        await write  # The thread keeps writing; returning now would let the final flush race it
+        raise
+
+async def write_candles(builder: CandleBuilder, interval: float):
+    """Close finished candles and append them to disk off the event loop"""
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(interval)
+        builder.close_expired()
+        closed = builder.take_closed()
+        if closed:
+            await finish_write(loop.run_in_executor(None, builder.write, closed))
+
+async def consume_records(feed: MarketFeed, aggregator: Optional[FlowAggregator],
+                          subscriptions: SubscriptionManager):
+    """Show the records the ingest workers decode until the feed stops"""
+    pool = feed.ingest
+    reported_drops = 0
+    while feed.running:
+        for kind, message in pool.messages():
+            if kind == "error":
+                display.print_error(message)
+            else:
+                display.print_status(message)
+        with tracer.span("ring.read", "websocket"):
+            records = pool.read()
+        if not len(records):
+            await pool.wait(INGEST_WAKEUP_TIMEOUT)
+            continue
+        try:
+            if feed.process_records(records, aggregator, subscriptions.symbol_filter):
+                display.update_display()  # One display update per batch
+        except Exception as e:
+            display.print_error(f"Error processing message: {e}")
+            logger.exception("Error in record processing loop")
+        dropped = pool.dropped
+        if dropped > reported_drops:
+            display.print_error(f"Display fell behind the workers, {dropped - reported_drops} trades dropped")
+            reported_drops = dropped
+        await asyncio.sleep(0)  # Let the timers and keyboard run between batches
+
+async def consume_feed(path: str, feed: MarketFeed, aggregator: Optional[FlowAggregator],
+                       pairs: Optional[List[str]], subscriptions: SubscriptionManager):
+    """Show the records a feed daemon publishes until the feed stops, reattaching if it restarts"""
+    def send_filter(symbols: Optional[FrozenSet[str]]):
+        # The control subscribe/unsubscribe commands change a market stream's filter
+        payload = None if symbols is None else sorted(symbols)
+        writer.write(encode_frame(FILTER, json.dumps(payload).encode()))
+
+    retry_delay = 1
+    while feed.running:
+        if subscriptions.market_stream:
+            symbols = None if subscriptions.symbol_filter is None else sorted(subscriptions.symbol_filter)
+        else:
+            symbols = None if pairs is None else [exchange_symbol(pair) for pair in pairs]
+        try:
+            reader, writer, hello = await attach_feed(path, feed.mode, symbols)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            display.print_error(f"Cannot attach to feed daemon at {path}: {e}")
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 30)
+            continue
+        display.print_status("Attached to feed daemon", ", ".join(hello.get("streams", [])))
+        retry_delay = 1
+        subscriptions.on_filter_change = send_filter
+        try:
+            while feed.running:
+                kind, payload = await read_frame(reader)
+                if kind == STATUS:
+                    display.print_status(payload.decode(errors="replace"))
+                elif kind == RECORDS:
+                    try:
+                        if feed.process_records(np.frombuffer(payload, dtype=RECORD_DTYPE), aggregator,
+                                                subscriptions.symbol_filter):
+                            display.update_display()  # One display update per batch
+                    except Exception as e:
+                        display.print_error(f"Error processing message: {e}")
+                        logger.exception("Error in record processing loop")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            display.print_error("Feed daemon connection lost")
+        finally:
+            subscriptions.on_filter_change = None
+            writer.close()
+
+async def run_feed_daemon(mode: str, pairs: Optional[List[str]], all_markets: bool, workers: int, path: str,
+                          socket_mode: int, endpoint: str, control_socket: Optional[str]):
+    """Receive the streams once and publish the records to attached terminals until interrupted"""
+    market_stream = ALL_LIQUIDATIONS_STREAM if all_markets and mode == "liquidations" else None
+    stream_type = TRADE_STREAM if mode == "trades" else LIQUIDATION_STREAM
+    # With a market stream every symbol is published; attached terminals filter by their own --pairs
+    subscriptions = SubscriptionManager(pairs, [stream_type], market_stream)
+    pool = IngestPool(subscriptions.streams, workers, endpoint, mode)
+    feed_daemon = FeedDaemon(pool, mode, subscriptions.streams)
+    loop = asyncio.get_event_loop()
+    if hasattr(signal, "SIGTERM"):
+        try:
+            loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)  # Clean up as on Ctrl+C
+        except NotImplementedError:
+            pass
+    pool.start(loop)
+    try:
+        await feed_daemon.start(path, socket_mode)
+        if control_socket:
+            control.register("clients", lambda args: feed_daemon.describe())
+            control.register("pairs", lambda args: pool.describe())
+            await control.start(control_socket)
+        click.echo(f"Publishing {mode} on {path} ({pool.describe()}); attach with "
+                   f"crypto-monitor {mode} --attach {path}")
+        await feed_daemon.run()
+    finally:
+        control.stop()
+        feed_daemon.stop()
+
+async def write_archive(writer: ArchiveWriter, interval: float):
+    """Write sealed archive segments off the event loop"""
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(interval)
+        segments = writer.take_segments()
+        if segments:
+            await finish_write(loop.run_in_executor(None, writer.write, segments))
+
+async def poll_terminal_size(interval: float = 1.0):
+    """Resize detection for platforms without SIGWINCH"""
+    while True:
+        await asyncio.sleep(interval)
+        display.handle_resize()
+
+def install_resize_handler(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Future]:
+    """Recompute the display layout on terminal resize.
+
+    Uses SIGWINCH through the event loop where available; the signals sent
+    while a window is being dragged are coalesced into one layout update.
+    Elsewhere falls back to a slow poll, returning the polling task.
+    """
+    if not hasattr(signal, 'SIGWINCH'):
+        return asyncio.ensure_future(poll_terminal_size())
+
+    pending = None
+
+    def apply_resize():
+        nonlocal pending
+        pending = None
+        display.handle_resize()
+
+    def on_sigwinch():
+        nonlocal pending
+        if pending is None:
+            pending = loop.call_later(RESIZE_DEBOUNCE, apply_resize)
+
+    loop.add_signal_handler(signal.SIGWINCH, on_sigwinch)
+    return None
+
+def bind_display_keys():
+    """Keyboard shortcuts for browsing the trade history"""
+    keyboard.bind("PAGE_UP", display.page_up)
+    keyboard.bind("PAGE_DOWN", display.page_down)
+    keyboard.bind("HOME", display.scroll_to_oldest)
+    keyboard.bind("END", display.follow_live)
+    keyboard.bind("w", display.jump_to_last_whale)
+    keyboard.bind("p", display.toggle_pause)
+
+def bind_feed_keys(feed: MarketFeed):
+    """Keyboard shortcuts that change the feed filters while it keeps running"""
+    keyboard.bind("+", lambda: feed.step_min_category(1))
+    keyboard.bind("=", lambda: feed.step_min_category(1))
+    keyboard.bind("-", lambda: feed.step_min_category(-1))
+    keyboard.bind("0", lambda: feed.set_filter(0))
+    keyboard.bind("f", feed.cycle_focus)
+    keyboard.bind("v", display.cycle_panel)
+
+def register_subscription_commands(subscriptions: SubscriptionManager):
+    """Control socket commands for managing pairs while connected"""
+    control.register("subscribe", subscriptions.subscribe)
+    control.register("unsubscribe", subscriptions.unsubscribe)
+    control.register("pairs", lambda args: subscriptions.describe())
+
+def register_fixed_pair_commands(subscriptions: SubscriptionManager, source: str):
+    """With --workers or --attach the streams are fixed; only a market stream's filter can change"""
+    async def fixed(args: List[str]) -> str:
+        return "error: pairs are fixed with --workers and --attach; restart with other --pairs"
+    if subscriptions.market_stream is None:
+        control.register("subscribe", fixed)
+        control.register("unsubscribe", fixed)
+    control.register("pairs", lambda args: f"{subscriptions.describe()} ({source})")
+
+def _symbol_arg(args: List[str]) -> Optional[str]:
+    """Symbol named by a command's first argument ("btcusdt" -> "BTC"), if any"""
+    return normalize_pair(args[0]).upper().replace('USDT', '') if args else None
+
+def show_size_stats(args: List[str]) -> str:
+    """Reply to the stats command: trade sizes of every symbol, or the histogram of one"""
+    return format_size_stats(display.sizes, _symbol_arg(args))
+
 def get_platform_quit_key():
     """Get platform-specific quit key combination"""
     import platform
@@ -177,23 +691,57 @@ def get_platform_quit_key():
     else:  # Linux and others
         return "Ctrl+C"
 
-async def monitor_market(pairs: List[str], mode: str, min_value: float = 0):
+async def monitor_market(pairs: Optional[List[str]], mode: str, min_value: float = 0, summary_interval: float = 0,
+                         control_socket: Optional[str] = None, all_markets: bool = False,
+                         endpoint: str = WS_ENDPOINT, ticker: Optional[str] = None, adaptive: bool = False,
+                         candles_dir: Optional[str] = None, store_path: Optional[str] = None,
+                         store_category: str = DEFAULT_STORE_CATEGORY, archive_dir: Optional[str] = None,
+                         archive_format: str = "npy", workers: int = 0, attach: Optional[str] = None,
+                         plugins: Optional[PluginHost] = None):
     stream_type = TRADE_STREAM if mode == "trades" else LIQUIDATION_STREAM
-    streams = [
-        f"{pair.lower()}{stream_type}" if mode == "trades" 
-        else f"{pair.lower()}@forceOrder"
-        for pair in pairs
-    ]
-    
-    subscribe_message = {
-        "method": "SUBSCRIBE",
-        "params": streams,
-        "id": 1
-    }
-    
-    logger.debug(f"Subscribe message: {json.dumps(subscribe_message, indent=2)}")
+    if (workers or attach) and ticker:
+        ticker = None  # Workers and the feed daemon carry trade records only
+        display.print_status(f"--ticker is not available with {'--attach' if attach else '--workers'}")
+    # Pairs can be added and removed at runtime; the set is resubscribed on reconnect.
+    # In all-markets mode one stream carries every pair and pairs (if any) filter it.
+    market_stream = ALL_LIQUIDATIONS_STREAM if all_markets and mode == "liquidations" else None
+    stream_suffixes = [stream_type]
+    extra_streams = []
+    ticker_table = None
+    if ticker == "all" or (ticker and market_stream):
+        extra_streams.append(ALL_MINI_TICKER_STREAM)
+    elif ticker == "pairs":
+        stream_suffixes.append(MINI_TICKER_STREAM)
+    if ticker:
+        ticker_table = TickerTable(sort_by_volume=bool(extra_streams))
+        display.set_ticker(ticker_table)
+    subscriptions = SubscriptionManager(pairs, stream_suffixes, market_stream, extra_streams)
     
-    feed = MarketFeed(mode)
+    feed = MarketFeed(mode, min_value)
+    if mode == "liquidations":
+        display.leaders.volume_label = "liquidations"
+    if adaptive:
+        # One sketch per pair; with every market shown the pairs are not known in advance
+        symbols = ADAPTIVE_ALL_SYMBOLS if pairs is None else max(ADAPTIVE_MAX_SYMBOLS, len(pairs))
+        feed.adaptive = AdaptiveTiers(max_symbols=symbols)
+        display.update_settings(display.min_category, display.min_size, adaptive=True)
+    if candles_dir:
+        feed.candles = CandleBuilder(os.path.join(candles_dir, mode))  # Trade and liquidation bars kept apart
+    if store_path:
+        feed.store = TradeStore(store_path, category_index(MARKET_CATEGORIES[store_category].min_size))
+        feed.store.start()
+    if archive_dir:
+        if archive_format == "parquet" and not parquet_available():
+            display.print_status("pyarrow is not installed, archiving as .npy")
+            archive_format = "npy"
+        feed.archive = ArchiveWriter(os.path.join(archive_dir, mode), archive_format)
+    if workers and not attach:
+        feed.ingest = IngestPool(subscriptions.streams, workers, endpoint, mode)
+    if plugins is not None:
+        feed.plugins = plugins
+        plugins.start()
+    # Trades below the size filter are summarised instead of dropped when enabled
+    aggregator = FlowAggregator() if summary_interval > 0 else None
     retry_delay = 1
     max_retry_delay = 30
     ws = None
@@ -201,82 +749,164 @@ async def monitor_market(pairs: List[str], mode: str, min_value: float = 0):
     # Get platform-specific quit key
     quit_key = get_platform_quit_key()
     
-    def handle_signal(signum, frame):
-        """Handle interrupt signals aggressively"""
+    loop = asyncio.get_event_loop()
+    main_task = asyncio.current_task()
+    
+    def handle_signal():
+        """Stop on an interrupt; the finally below writes out the feed's data and exits"""
+        if not feed.running:
+            return  # Already shutting down
         display.print_status("Shutting down...")
-        logger.info("Force shutdown initiated")
-        os._exit(0)  # Immediate exit without cleanup
+        logger.info("Shutdown initiated")
+        feed.stop()
+        main_task.cancel()
     
-    # Register signal handlers
-    signal.signal(signal.SIGINT, handle_signal)
-    signal.signal(signal.SIGTERM, handle_signal)
-    if hasattr(signal, 'SIGBREAK'):  # Windows Ctrl+Break
-        signal.signal(signal.SIGBREAK, handle_signal)
+    # Register signal handlers; they run on the event loop, never in the middle of a batch
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):  # SIGBREAK is Windows Ctrl+Break
+        if not hasattr(signal, name):
+            continue
+        try:
+            loop.add_signal_handler(getattr(signal, name), handle_signal)
+        except NotImplementedError:  # Windows event loops
+            signal.signal(getattr(signal, name), lambda signum, frame: loop.call_soon_threadsafe(handle_signal))
     
-    display.update_display()  # Initial display
-    display.print_status(f"Monitoring pairs: {', '.join(str(pair).upper() for pair in pairs)}")
-    display.print_status(f"Press {quit_key} to quit")
+    controls = f"Press {quit_key} to quit"
+    if keyboard.start(asyncio.get_event_loop()):
+        bind_display_keys()
+        bind_feed_keys(feed)
+        controls += " | PgUp/PgDn: scroll, w: last whale, End: live, p: pause, +/-: filter, f: focus, v: panels"
     
+    if control_socket:
+        register_subscription_commands(subscriptions)
+        if feed.ingest is not None:
+            register_fixed_pair_commands(subscriptions, feed.ingest.describe())
+        elif attach:
+            register_fixed_pair_commands(subscriptions, f"attached to {attach}")
+        control.register("stats", show_size_stats)
+        if feed.adaptive is not None:
+            control.register("tiers", lambda args: feed.adaptive.describe(_symbol_arg(args)))
+        if feed.plugins is not None:
+            control.register("plugins", lambda args: feed.plugins.describe())
+        try:
+            if await control.start(control_socket):
+                controls += f" | Control: {control_socket}"
+        except OSError as e:
+            display.print_error(f"Cannot open control socket {control_socket}: {e}")
+    
+    display.initialize_display()  # Initial display
+    if pairs is None:
+        display.print_status("Monitoring all pairs")
+    else:
+        display.print_status(f"Monitoring pairs: {', '.join(str(pair).upper() for pair in pairs)}")
+    display.print_status(controls)
+    
+    background_tasks = []
+    resize_task = install_resize_handler(asyncio.get_event_loop())
+    if resize_task is not None:
+        background_tasks.append(resize_task)
+    if display.config.blink_rate > 0:
+        background_tasks.append(asyncio.ensure_future(animate_display(display.config.blink_rate)))
+    if aggregator is not None:
+        background_tasks.append(asyncio.ensure_future(emit_summaries(aggregator, summary_interval)))
+    background_tasks.append(asyncio.ensure_future(refresh_header(display.config.header_rate)))
+    if feed.candles is not None:
+        background_tasks.append(asyncio.ensure_future(write_candles(feed.candles, CANDLE_FLUSH_INTERVAL)))
+    if feed.archive is not None:
+        background_tasks.append(asyncio.ensure_future(write_archive(feed.archive, ARCHIVE_FLUSH_INTERVAL)))
+    
+    reconnecting = False
     try:
-        while feed.running:
+        if feed.ingest is not None:
+            feed.ingest.start(asyncio.get_event_loop())
+            await consume_records(feed, aggregator, subscriptions)
+        elif attach:
+            await consume_feed(attach, feed, aggregator, pairs, subscriptions)
+        # Otherwise this process holds the exchange connection itself
+        while feed.running and feed.ingest is None and not attach:
             try:
-                ws = await websockets.connect(WS_ENDPOINT)
-                display.print_status("Connected to Binance WebSocket")
-                await ws.send(json.dumps(subscribe_message))
-                display.print_status("Subscribed to streams", ", ".join(streams))
-                display.print_status(f"Press {quit_key} to quit")
+                with tracer.span("reconnect" if reconnecting else "connect", "websocket"):
+                    ws = await websockets.connect(endpoint)
+                    display.print_status("Connected to Binance WebSocket")
+                    await subscriptions.attach(ws)
+                display.print_status("Subscribed to streams", ", ".join(subscriptions.streams))
+                display.print_status(controls)
                 
                 retry_delay = 1
                 
-                while feed.running:
-                    try:
-                        msg = await ws.recv()
-                        data = json.loads(msg)
-                        logger.debug(f"Received message: {data}")
-
+                # A reader task queues frames so each pass can take every frame
+                # that has arrived since the last one as a single batch
+                frames = asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)
+                reader = asyncio.ensure_future(read_frames(ws, frames))
+                try:
+                    while feed.running:
+                        with tracer.span("ws.recv", "websocket"):
+                            batch = await next_batch(frames)
+                        error = batch.pop() if isinstance(batch[-1], Exception) else None
                         
-                        if 'result' in data:  # Subscription confirmation
-                            continue
+                        events = []
+                        with tracer.span("parse.json", args={"frames": len(batch)}):
+                            for msg in batch:
+                                try:
+                                    data = json.loads(msg)
+                                except json.JSONDecodeError as e:
+                                    display.print_error(f"Invalid JSON received: {e}")
+                                    continue
+                                if debug_sampler():
+                                    logger.debug("Received message: %s", data)
+                                
+                                if isinstance(data, list):
+                                    # Arrays only come from the all-market ticker stream
+                                    if ticker_table is not None and TickerTable.is_ticker(data):
+                                        ticker_table.update(data)  # Shown by refresh_header
+                                    continue
+                                if not isinstance(data, dict):
+                                    display.print_error(f"Unexpected message received: {msg[:80]}")
+                                    continue
+                                if ticker_table is not None and TickerTable.is_ticker(data):
+                                    ticker_table.update(data)
+                                    continue
+                                if subscriptions.handle_response(data):  # SUBSCRIBE/UNSUBSCRIBE ack
+                                    continue
+                                events.append(data)
                         
-                        if mode == "trades":
-                            trade = feed.process_trade_message(data)
-                            if trade:
-                                logger.debug(f"Processed trade: {trade}")
-                                if trade.usd_value >= min_value:
-                                    feed.print_trade(trade)
-                                    # Force display update after each trade
+                        if events:
+                            try:
+                                if feed.process_batch(events, aggregator, subscriptions.symbol_filter):
+                                    # One display update per batch
                                     display.update_display()
-                        else:
-                            liquidation = feed.process_liquidation_message(data)
-                            if liquidation:
-                                logger.debug(f"Processed liquidation: {liquidation}")
-                                if liquidation.usd_value >= min_value:
-                                    feed.print_liquidation(liquidation)
-                                    # Force display update after each liquidation
-                                    display.update_display()
-                            
-                    except ConnectionClosed:
-                        display.print_error("WebSocket connection closed")
-                        raise
-                    except json.JSONDecodeError as e:
-                        display.print_error(f"Invalid JSON received: {e}")
-                        continue
-                    except Exception as e:
-                        display.print_error(f"Error processing message: {e}")
-                        logger.exception("Error in message processing loop")
-                        continue
+                            except Exception as e:
+                                display.print_error(f"Error processing message: {e}")
+                                logger.exception("Error in message processing loop")
+                        
+                        if error is not None:
+                            if isinstance(error, ConnectionClosed):
+                                display.print_error("WebSocket connection closed")
+                            raise error
+                finally:
+                    reader.cancel()
                         
             except KeyboardInterrupt:
                 display.print_status("Shutting down...")
                 logger.info("Force shutdown initiated")
+                feed.close()
+                cleanup_before_exit()
                 os._exit(0)  # Immediate exit
             except Exception as e:
                 display.print_error(f"Connection error: {e}")
                 logger.exception("Error in connection loop")
+                subscriptions.detach()
                 if feed.running:
-                    await asyncio.sleep(retry_delay)
+                    reconnecting = True
+                    with tracer.span("reconnect.backoff", "websocket", {"delay": retry_delay}):
+                        await asyncio.sleep(retry_delay)
                     retry_delay = min(retry_delay * 2, max_retry_delay)
+    except asyncio.CancelledError:
+        pass  # Interrupted by handle_signal
     finally:
+        for task in background_tasks:
+            task.cancel()
+        # Lets a candle or archive write already in progress finish before feed.close() appends more
+        await asyncio.gather(*background_tasks, return_exceptions=True)
         try:
             if ws:
                 await ws.close()
@@ -284,6 +914,8 @@ async def monitor_market(pairs: List[str], mode: str, min_value: float = 0):
             logger.error(f"Error closing websocket: {e}")
         
         display.print_status("Goodbye!")
+        feed.close()
+        cleanup_before_exit()
         await asyncio.sleep(1)
         os._exit(0)  # Ensure exit
 
@@ -291,17 +923,32 @@ def get_stream_name(pair: str, stream_type: str) -> str:
     """Generate Binance stream name for a trading pair"""
     return f"{pair.lower()}{stream_type}"
 
+def load_plugins(specs: Sequence[str]) -> Optional[PluginHost]:
+    """Plugins of the --plugin options; exits with the error if one cannot be loaded"""
+    if not specs:
+        return None
+    host = PluginHost()
+    for spec in specs:
+        try:
+            host.add(load_plugin(spec))
+        except Exception as e:  # Anything the plugin's own module or constructor raises
+            click.echo(f"Error: cannot load plugin {spec!r}: {e}", err=True)
+            os._exit(2)
+    return host
+
 def run_async_command(coro):
     loop = None
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         return loop.run_until_complete(coro)
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         display.print_status("Shutting down...")
         logger.info("Force shutdown initiated")
+        cleanup_before_exit()
         os._exit(0)  # Immediate exit
     except Exception:
+        cleanup_before_exit()
         os._exit(1)
     finally:
         if loop and not loop.is_closed():
@@ -320,24 +967,68 @@ def main():
 @click.option("--min-category", type=click.Choice(list(MARKET_CATEGORIES.keys())),
               help="Minimum category to monitor (e.g., whale, shark, fish)")
 @click.option("--debug/--no-debug", default=False, help="Enable debug logging")
+@click.option("--debug-sample", type=click.IntRange(min=1), default=1,
+              help="With --debug, log only every Nth per-message debug record")
 @click.option("--log-file", default=None, help="Log file path (if not specified, logging to file is disabled)")
-def trades(pairs: List[str], min_size: float, min_category: str, debug: bool, log_file: Optional[str]):
+@click.option("--trace", "trace_file", default=None,
+              help="Write a Chrome trace-event timeline (Perfetto) to this file on exit")
+@click.option("--blink-rate", type=click.FloatRange(min=0), default=2.0,
+              help="Blink animation rate in Hz for large trades (0 disables blinking)")
+@click.option("--history-mb", type=click.FloatRange(min=0.1), default=DEFAULT_HISTORY_MB,
+              help="Memory budget in MB for the scrollback history")
+@click.option("--summary-interval", type=click.FloatRange(min=0), default=0,
+              help="Every N seconds, show trades below the minimum size as one summary row per pair and side (0 drops them)")
+@click.option("--control-socket", is_flag=False, flag_value=DEFAULT_CONTROL_SOCKET, default=None,
+              help=f"Accept runtime commands (subscribe, unsubscribe, pairs, stats, plugins) on a Unix socket; "
+                   f"without a path uses {DEFAULT_CONTROL_SOCKET}")
+@click.option("--endpoint", default=WS_ENDPOINT,
+              help=f"WebSocket endpoint (ws://{MOCK_HOST}:{MOCK_PORT} for crypto-monitor mock-server)")
+@click.option("--ticker", type=click.Choice(["pairs", "all"]), default=None,
+              help="Show price and 24h change from miniTicker streams, for the monitored pairs or every market")
+@click.option("--profile", "volume_profile", is_flag=True, default=False,
+              help="Show a volume-at-price panel for the focused pair (press f to focus, v to switch panels)")
+@click.option("--sparkline-minutes", type=click.FloatRange(min=0), default=SPARKLINE_MINUTES,
+              help="Minutes of price history in the header sparklines (0 hides them)")
+@click.option("--adaptive", is_flag=True, default=False,
+              help="Categorise by percentile of each pair's recent sizes (e.g. top 0.1% = whale) instead of fixed USD values")
+@click.option("--candles", "candles_dir", is_flag=False, flag_value=DEFAULT_CANDLE_DIR, default=None,
+              help=f"Write 1s and 1m OHLCV candles of every trade to a directory; "
+                   f"without a path uses {DEFAULT_CANDLE_DIR}")
+@click.option("--store", "store_path", is_flag=False, flag_value=DEFAULT_STORE_PATH, default=None,
+              help=f"Save trades of --store-category and up to an SQLite database (see crypto-monitor query); "
+                   f"without a path uses {DEFAULT_STORE_PATH}")
+@click.option("--store-category", type=click.Choice(list(MARKET_CATEGORIES.keys())), default=DEFAULT_STORE_CATEGORY,
+              help="Smallest category saved by --store")
+@click.option("--archive", "archive_dir", is_flag=False, flag_value=DEFAULT_ARCHIVE_DIR, default=None,
+              help=f"Archive every trade as columnar per-day segments (see crypto-monitor stats); "
+                   f"without a path uses {DEFAULT_ARCHIVE_DIR}")
+@click.option("--archive-format", type=click.Choice(["npy", "parquet"]), default="npy",
+              help="Segment format for --archive (parquet needs pyarrow)")
+@click.option("--workers", type=click.IntRange(min=0), default=0,
+              help="Receive and decode the streams in N worker processes, pairs split between them (0 = in-process)")
+@click.option("--attach", is_flag=False, flag_value=DEFAULT_FEED_SOCKETS["trades"], default=None,
+              help=f"Show the feed of a running crypto-monitor daemon instead of connecting to the exchange; "
+                   f"--pairs filters it; without a path uses {DEFAULT_FEED_SOCKETS['trades']}")
+@click.option("--plugin", "plugin_specs", multiple=True,
+              help="Hand every trade to a plugin: csv[=PATH] (built in) or module:attribute[=ARG], "
+                   "e.g. ./alerts.py:BigTrades; repeatable, see the plugins control command")
+def trades(pairs: List[str], min_size: float, min_category: str, debug: bool, debug_sample: int,
+          log_file: Optional[str], trace_file: Optional[str], blink_rate: float, history_mb: float,
+          summary_interval: float, control_socket: Optional[str], endpoint: str, ticker: Optional[str],
+          volume_profile: bool, sparkline_minutes: float, adaptive: bool,
+          candles_dir: Optional[str], store_path: Optional[str], store_category: str, archive_dir: Optional[str],
+          archive_format: str, workers: int, attach: Optional[str], plugin_specs: Sequence[str]):
     """Monitor live trades. Use Ctrl+C (Windows/Linux) or Cmd+C (Mac) to quit."""
-    # Configure logging
-    log_level = logging.DEBUG if debug else logging.WARNING
-    log_handlers = [logging.NullHandler()]
+    # Configure logging (file output goes through a background listener thread)
+    setup_logging(debug, log_file, debug_sample)
     
-    if log_file:
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        ))
-        log_handlers.append(file_handler)
-    
-    logging.basicConfig(
-        level=log_level,
-        handlers=log_handlers
-    )
+    if trace_file:
+        tracer.start(trace_file)
+    display.config.blink_rate = blink_rate
+    display.set_history_budget(history_mb)
+    if volume_profile:
+        display.show_panel("volume")
+    display.set_sparkline_window(sparkline_minutes)
     
     # Update display settings before starting
     if min_category:
@@ -346,7 +1037,16 @@ def trades(pairs: List[str], min_size: float, min_category: str, debug: bool, lo
     else:
         display.update_settings(min_size=min_size)
     
-    run_async_command(monitor_market(pairs, "trades", min_size))
+    if attach and click.get_current_context().get_parameter_source("pairs") == ParameterSource.DEFAULT:
+        pairs = None  # No --pairs given: show everything the daemon publishes
+    
+    plugins = load_plugins(plugin_specs)
+    
+    run_async_command(monitor_market(pairs, "trades", min_size, summary_interval, control_socket,
+                                     endpoint=endpoint, ticker=ticker, adaptive=adaptive, candles_dir=candles_dir,
+                                     store_path=store_path, store_category=store_category,
+                                     archive_dir=archive_dir, archive_format=archive_format, workers=workers,
+                                     attach=attach, plugins=plugins))
 
 @main.command()
 @click.option("--pairs", "-p", multiple=True, default=DEFAULT_PAIRS,
@@ -356,24 +1056,71 @@ def trades(pairs: List[str], min_size: float, min_category: str, debug: bool, lo
 @click.option("--min-category", type=click.Choice(list(MARKET_CATEGORIES.keys())),
               help="Minimum category to monitor (e.g., whale, shark, fish)")
 @click.option("--debug/--no-debug", default=False, help="Enable debug logging")
+@click.option("--debug-sample", type=click.IntRange(min=1), default=1,
+              help="With --debug, log only every Nth per-message debug record")
 @click.option("--log-file", default=None, help="Log file path (if not specified, logging to file is disabled)")
-def liquidations(pairs: List[str], min_size: float, min_category: str, debug: bool, log_file: Optional[str]):
+@click.option("--trace", "trace_file", default=None,
+              help="Write a Chrome trace-event timeline (Perfetto) to this file on exit")
+@click.option("--blink-rate", type=click.FloatRange(min=0), default=2.0,
+              help="Blink animation rate in Hz for large trades (0 disables blinking)")
+@click.option("--history-mb", type=click.FloatRange(min=0.1), default=DEFAULT_HISTORY_MB,
+              help="Memory budget in MB for the scrollback history")
+@click.option("--summary-interval", type=click.FloatRange(min=0), default=0,
+              help="Every N seconds, show liquidations below the minimum size as one summary row per pair and side (0 drops them)")
+@click.option("--control-socket", is_flag=False, flag_value=DEFAULT_CONTROL_SOCKET, default=None,
+              help=f"Accept runtime commands (subscribe, unsubscribe, pairs, stats, plugins) on a Unix socket; "
+                   f"without a path uses {DEFAULT_CONTROL_SOCKET}")
+@click.option("--endpoint", default=WS_ENDPOINT,
+              help=f"WebSocket endpoint (ws://{MOCK_HOST}:{MOCK_PORT} for crypto-monitor mock-server)")
+@click.option("--ticker", type=click.Choice(["pairs", "all"]), default=None,
+              help="Show price and 24h change from miniTicker streams, for the monitored pairs or every market")
+@click.option("--profile", "volume_profile", is_flag=True, default=False,
+              help="Show a volume-at-price panel for the focused pair (press f to focus, v to switch panels)")
+@click.option("--sparkline-minutes", type=click.FloatRange(min=0), default=SPARKLINE_MINUTES,
+              help="Minutes of price history in the header sparklines (0 hides them)")
+@click.option("--adaptive", is_flag=True, default=False,
+              help="Categorise by percentile of each pair's recent sizes (e.g. top 0.1% = whale) instead of fixed USD values")
+@click.option("--candles", "candles_dir", is_flag=False, flag_value=DEFAULT_CANDLE_DIR, default=None,
+              help=f"Write 1s and 1m OHLCV candles of every trade to a directory; "
+                   f"without a path uses {DEFAULT_CANDLE_DIR}")
+@click.option("--store", "store_path", is_flag=False, flag_value=DEFAULT_STORE_PATH, default=None,
+              help=f"Save trades of --store-category and up to an SQLite database (see crypto-monitor query); "
+                   f"without a path uses {DEFAULT_STORE_PATH}")
+@click.option("--store-category", type=click.Choice(list(MARKET_CATEGORIES.keys())), default=DEFAULT_STORE_CATEGORY,
+              help="Smallest category saved by --store")
+@click.option("--archive", "archive_dir", is_flag=False, flag_value=DEFAULT_ARCHIVE_DIR, default=None,
+              help=f"Archive every trade as columnar per-day segments (see crypto-monitor stats); "
+                   f"without a path uses {DEFAULT_ARCHIVE_DIR}")
+@click.option("--archive-format", type=click.Choice(["npy", "parquet"]), default="npy",
+              help="Segment format for --archive (parquet needs pyarrow)")
+@click.option("--workers", type=click.IntRange(min=0), default=0,
+              help="Receive and decode the streams in N worker processes, pairs split between them (0 = in-process)")
+@click.option("--attach", is_flag=False, flag_value=DEFAULT_FEED_SOCKETS["liquidations"], default=None,
+              help=f"Show the feed of a running crypto-monitor daemon instead of connecting to the exchange; "
+                   f"--pairs filters it; without a path uses {DEFAULT_FEED_SOCKETS['liquidations']}")
+@click.option("--plugin", "plugin_specs", multiple=True,
+              help="Hand every liquidation to a plugin: csv[=PATH] (built in) or module:attribute[=ARG], "
+                   "e.g. ./alerts.py:BigTrades; repeatable, see the plugins control command")
+@click.option("--all-markets", is_flag=True, default=False,
+              help="Use the single all-market liquidation stream; --pairs, if given, filters it client-side")
+def liquidations(pairs: List[str], min_size: float, min_category: str, debug: bool, debug_sample: int,
+          log_file: Optional[str], trace_file: Optional[str], blink_rate: float, history_mb: float,
+          summary_interval: float, control_socket: Optional[str], endpoint: str, ticker: Optional[str],
+          volume_profile: bool, sparkline_minutes: float, adaptive: bool,
+          candles_dir: Optional[str], store_path: Optional[str], store_category: str, archive_dir: Optional[str],
+          archive_format: str, workers: int, attach: Optional[str], plugin_specs: Sequence[str],
+          all_markets: bool):
     """Monitor liquidations. Use Ctrl+C (Windows/Linux) or Cmd+C (Mac) to quit."""
-    # Configure logging
-    log_level = logging.DEBUG if debug else logging.WARNING
-    log_handlers = [logging.NullHandler()]
+    # Configure logging (file output goes through a background listener thread)
+    setup_logging(debug, log_file, debug_sample)
     
-    if log_file:
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        ))
-        log_handlers.append(file_handler)
-    
-    logging.basicConfig(
-        level=log_level,
-        handlers=log_handlers
-    )
+    if trace_file:
+        tracer.start(trace_file)
+    display.config.blink_rate = blink_rate
+    display.set_history_budget(history_mb)
+    if volume_profile:
+        display.show_panel("volume")
+    display.set_sparkline_window(sparkline_minutes)
     
     # Update display settings before starting
     if min_category:
@@ -382,7 +1129,171 @@ def liquidations(pairs: List[str], min_size: float, min_category: str, debug: bo
     else:
         display.update_settings(min_size=min_size)
     
-    run_async_command(monitor_market(pairs, "liquidations", min_size))
+    if (all_markets or attach) and click.get_current_context().get_parameter_source("pairs") == ParameterSource.DEFAULT:
+        pairs = None  # No --pairs given: show every market
+    
+    plugins = load_plugins(plugin_specs)
+    
+    run_async_command(monitor_market(pairs, "liquidations", min_size, summary_interval, control_socket,
+                                     all_markets, endpoint, ticker, adaptive, candles_dir, store_path, store_category,
+                                     archive_dir, archive_format, workers, attach, plugins))
+
+def parse_socket_mode(text: str) -> int:
+    """Permission bits of an octal mode such as 600 or 0660"""
+    try:
+        mode = int(text, 8)
+    except ValueError:
+        mode = -1
+    if not 0 <= mode <= 0o777:
+        raise click.BadParameter(f"{text!r} is not an octal file mode like 600 or 660")
+    return mode
+
+@main.command("daemon")
+@click.argument("mode", type=click.Choice(["trades", "liquidations"]))
+@click.option("--pairs", "-p", multiple=True, default=DEFAULT_PAIRS,
+              help="Trading pairs to receive (e.g., btcusdt)")
+@click.option("--all-markets", is_flag=True, default=False,
+              help="Liquidations only: receive the all-market stream and publish every pair")
+@click.option("--workers", type=click.IntRange(min=1), default=1,
+              help="Worker processes receiving and decoding the streams, pairs split between them")
+@click.option("--socket", "socket_path", default=None,
+              help=f"Socket to publish on (default {DEFAULT_FEED_SOCKETS['trades']} or "
+                   f"{DEFAULT_FEED_SOCKETS['liquidations']})")
+@click.option("--socket-mode", default=f"{FEED_SOCKET_MODE:o}",
+              help="Octal permissions of the socket; anyone who can connect sees the feed (660 adds its group)")
+@click.option("--endpoint", default=WS_ENDPOINT,
+              help=f"WebSocket endpoint (ws://{MOCK_HOST}:{MOCK_PORT} for crypto-monitor mock-server)")
+@click.option("--control-socket", is_flag=False, flag_value=DEFAULT_CONTROL_SOCKET, default=None,
+              help=f"Accept commands (clients, pairs) on a Unix socket; without a path uses {DEFAULT_CONTROL_SOCKET}")
+def daemon(mode: str, pairs: List[str], all_markets: bool, workers: int, socket_path: Optional[str],
+           socket_mode: str, endpoint: str, control_socket: Optional[str]):
+    """Share one exchange feed with many terminals (attach with trades/liquidations --attach)."""
+    socket_path = socket_path or DEFAULT_FEED_SOCKETS[mode]
+    try:
+        permissions = parse_socket_mode(socket_mode)
+    except click.BadParameter as e:
+        click.echo(f"Error: {e.message}", err=True)
+        os._exit(2)
+    try:
+        asyncio.run(run_feed_daemon(mode, pairs, all_markets, workers, socket_path, permissions,
+                                    endpoint, control_socket))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass  # Ctrl+C, or SIGTERM cancelling the main task
+    except OSError as e:
+        click.echo(f"Error: {e}", err=True)
+        os._exit(2)
+    os._exit(0)  # Don't wait on the sound worker thread
+
+@main.command("mock-server")
+@click.option("--host", default=MOCK_HOST, help="Interface to listen on")
+@click.option("--port", type=int, default=MOCK_PORT, help="Port to listen on")
+@click.option("--rate", type=click.FloatRange(min=0.1), default=20.0,
+              help="Average events per second sent to each client")
+@click.option("--seed", type=int, default=None, help="Random seed for reproducible data")
+def mock_server(host: str, port: int, rate: float, seed: Optional[int]):
+    """Run a local mock exchange streaming random trades and liquidations."""
+    logging.basicConfig(level=logging.INFO)
+    click.echo(f"Mock exchange on ws://{host}:{port} - use --endpoint ws://{host}:{port}")
+    try:
+        asyncio.run(run_mock_server(host, port, rate, seed))
+    except KeyboardInterrupt:
+        pass
+    os._exit(0)  # Don't wait on the sound worker thread
+
+@main.command("control")
+@click.argument("command", nargs=-1, required=True)
+@click.option("--socket", "socket_path", default=DEFAULT_CONTROL_SOCKET,
+              help="Control socket of the running monitor")
+def control_command(command: List[str], socket_path: str):
+    """Send a command to a running monitor (e.g. control subscribe solusdt)."""
+    try:
+        reply = asyncio.run(send_command(socket_path, " ".join(command)))
+    except (OSError, asyncio.TimeoutError) as e:
+        click.echo(f"Cannot reach monitor at {socket_path}: {e}", err=True)
+        os._exit(1)
+    click.echo(reply)
+    sys.stdout.flush()
+    os._exit(0)  # Don't wait on the sound worker thread
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_duration(text: str) -> float:
+    """Seconds in a duration such as 90s, 15m, 1h or 2d (a bare number is seconds)"""
+    text = text.strip().lower()
+    unit = DURATION_UNITS.get(text[-1:]) if text else None
+    try:
+        return float(text[:-1]) * unit if unit else float(text)
+    except ValueError:
+        raise click.BadParameter(f"{text!r} is not a duration like 30s, 15m, 1h or 2d")
+
+@main.command("query")
+@click.option("--symbol", "-s", default=None, help="Pair to show (e.g. btc or btcusdt); all pairs if omitted")
+@click.option("--since", default=None, help="Only trades from this long ago, e.g. 30m, 1h, 2d")
+@click.option("--min-category", type=click.Choice(list(MARKET_CATEGORIES.keys())), default=None,
+              help="Smallest category shown (e.g. whale)")
+@click.option("--limit", "-n", type=click.IntRange(min=1), default=50, help="Most trades shown, newest first")
+@click.option("--db", "db_path", default=DEFAULT_STORE_PATH, help="Database written by --store")
+def query(symbol: Optional[str], since: Optional[str], min_category: Optional[str], limit: int, db_path: str):
+    """Show trades saved by --store (e.g. query --symbol btc --since 1h --min-category whale)."""
+    if not os.path.exists(os.path.expanduser(db_path)):
+        click.echo(f"No trade store at {db_path}; run trades or liquidations with --store first", err=True)
+        os._exit(1)
+    if symbol:
+        symbol = symbol.upper()
+        symbol = symbol[:-4] if symbol.endswith("USDT") else symbol
+    try:
+        start = time.time() - parse_duration(since) if since else None
+    except click.BadParameter as e:
+        click.echo(f"Error: {e.message}", err=True)
+        os._exit(2)
+    rank = category_index(MARKET_CATEGORIES[min_category].min_size) if min_category else 0
+    began = time.perf_counter()
+    rows = query_trades(db_path, symbol, start, rank, limit)
+    elapsed = (time.perf_counter() - began) * 1000
+    for row in reversed(rows):  # Oldest first, like the live view
+        stamp = datetime.fromtimestamp(row["time"]).strftime("%Y-%m-%d %H:%M:%S")
+        click.echo(f"{stamp}  {row['symbol']:<8} {row['kind']:<11} {row['side']:<4} "
+                   f"{format_price(row['price'], row['symbol']):>14} "
+                   f"{format_quantity(row['quantity'], row['symbol']):>14} "
+                   f"{format_value(row['value']):>16}  {CATEGORY_ORDER[row['category']].name}")
+    click.echo(f"{len(rows)} trades in {elapsed:.1f} ms", err=True)
+    sys.stdout.flush()
+    os._exit(0)  # Don't wait on the sound worker thread
+
+@main.command("stats")
+@click.option("--symbol", "-s", default=None, help="Pair to include (e.g. btc or btcusdt); all pairs if omitted")
+@click.option("--since", default=None, help="Only trades from this long ago, e.g. 12h, 30d")
+@click.option("--mode", type=click.Choice(["trades", "liquidations"]), default="trades",
+              help="Which archive to read")
+@click.option("--dir", "archive_dir", default=DEFAULT_ARCHIVE_DIR, help="Directory written by --archive")
+def stats(symbol: Optional[str], since: Optional[str], mode: str, archive_dir: str):
+    """Volume and counts per pair and category from the --archive segments."""
+    if symbol:
+        symbol = symbol.upper()
+        symbol = symbol[:-4] if symbol.endswith("USDT") else symbol
+    try:
+        start = int((time.time() - parse_duration(since)) * 1000) if since else None
+    except click.BadParameter as e:
+        click.echo(f"Error: {e.message}", err=True)
+        os._exit(2)
+    began = time.perf_counter()
+    totals = archive_stats(os.path.join(archive_dir, mode), symbol, start)
+    elapsed = time.perf_counter() - began
+    click.echo(f"{'Pair':<8} {'Category':<10} {'Trades':>12} {'Volume':>20} {'Buy':>5}")
+    for row in np.argsort(-totals.volume.sum(axis=1)).tolist():
+        counts, volume, buy_volume = totals.counts[row], totals.volume[row], totals.buy_volume[row]
+        if not counts.sum():
+            continue
+        lines = [(CATEGORY_ORDER[c].name, counts[c], volume[c], buy_volume[c])
+                 for c in reversed(range(len(counts))) if counts[c]]
+        lines.append(("Total", counts.sum(), volume.sum(), buy_volume.sum()))
+        for name, count, total, bought in lines:
+            click.echo(f"{totals.symbols[row]:<8} {name:<10} {f'{count:,}'.replace(',', '.'):>12} "
+                       f"{format_value(total):>20} {bought / total if total else 0:>5.0%}")
+    trades = f"{totals.counts.sum():,}".replace(",", ".")
+    click.echo(f"{trades} trades in {totals.segments} segments, scanned in {elapsed:.2f} s", err=True)
+    sys.stdout.flush()
+    os._exit(0)  # Don't wait on the sound worker thread
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
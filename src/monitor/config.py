@@ -1,3 +1,6 @@
+import os
+import tempfile
+from bisect import bisect_right
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 from colorama import Fore, Back, Style
@@ -94,6 +97,14 @@ MARKET_CATEGORIES = {
     ),
 }
 
+# Categories ordered from smallest to largest, with their thresholds for bisection
+CATEGORY_ORDER = sorted(MARKET_CATEGORIES.values(), key=lambda cat: cat.min_size)
+CATEGORY_THRESHOLDS = [cat.min_size for cat in CATEGORY_ORDER]
+
+def category_index(value: float) -> int:
+    """Index into CATEGORY_ORDER of the largest category a USD value reaches"""
+    return max(0, bisect_right(CATEGORY_THRESHOLDS, value) - 1)
+
 # Default trading pairs to monitor
 DEFAULT_PAIRS = [
     "btcusdt",
@@ -104,6 +115,28 @@ DEFAULT_PAIRS = [
     "xrpusdt",
 ]
 
+# Decimal places shown for prices and quantities of known symbols.
+# Unknown symbols fall back to a precision based on the price magnitude.
+PRICE_PRECISION = {
+    "BTC": 1,
+    "ETH": 2,
+    "BNB": 2,
+    "SOL": 2,
+    "AVAX": 3,
+    "DOGE": 5,
+    "XRP": 4,
+}
+
+QUANTITY_PRECISION = {
+    "BTC": 3,
+    "ETH": 3,
+    "BNB": 2,
+    "SOL": 0,
+    "AVAX": 0,
+    "DOGE": 0,
+    "XRP": 1,
+}
+
 # Binance WebSocket endpoints
 WS_ENDPOINT = "wss://fstream.binance.com/ws"
 WS_STREAM = "fstream.binance.com/ws"
@@ -111,3 +144,99 @@ WS_STREAM = "fstream.binance.com/ws"
 # Stream types
 TRADE_STREAM = "@trade"
 LIQUIDATION_STREAM = "@forceOrder"
+ALL_LIQUIDATIONS_STREAM = "!forceOrder@arr"  # Liquidations on every pair in one stream
+MINI_TICKER_STREAM = "@miniTicker"
+ALL_MINI_TICKER_STREAM = "!miniTicker@arr"  # Price and 24h change of every pair, once a second
+
+# Local mock exchange (crypto-monitor mock-server) for offline testing
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 8765
+
+# Maximum number of trace events kept in memory for --trace (oldest are dropped)
+TRACE_BUFFER_SIZE = 200_000
+
+# Default memory budget for the scrollback history store, in megabytes
+DEFAULT_HISTORY_MB = 16
+
+# Suggested path for the --control-socket option
+DEFAULT_CONTROL_SOCKET = os.path.join(tempfile.gettempdir(), "crypto-monitor.sock")
+
+# Volume-at-price side panel for the focused symbol
+PROFILE_BINS = 64  # Price levels tracked around the current price
+PROFILE_BIN_FRACTION = 0.0005  # Level height as a fraction of the price when the profile starts
+PROFILE_WINDOW = 300  # Rolling window in seconds
+PROFILE_SLOTS = 10  # Sub-windows the rolling window expires in
+PROFILE_PANEL_WIDTH = 30
+
+# Price sparklines in the header, fed by every trade
+SPARKLINE_MINUTES = 5  # Default window
+SPARKLINE_BUCKETS = 10  # Characters per sparkline, one low/high bucket each
+SPARKLINE_MAX_SYMBOLS = 64  # Symbols tracked at once; the least recently traded is dropped
+
+# Per-symbol trade size histograms (stats command and panel)
+SIZES_BINS_PER_STEP = 4  # Log-spaced bins between consecutive category thresholds
+SIZES_WINDOW = 3600  # Rolling window in seconds
+SIZES_SLOTS = 12  # Sub-windows the rolling window expires in
+SIZES_MAX_SYMBOLS = 64  # Symbols tracked at once; the least recently traded is dropped
+
+# Adaptive categories (--adaptive): a category is reached by trades in the
+# top percentiles of each symbol's own recent trade sizes instead of fixed USD values
+ADAPTIVE_PERCENTILES = {
+    "aquaman": 99.99,
+    "whale": 99.9,
+    "orca": 99.7,
+    "shark": 99.3,
+    "dolphin": 98.5,
+    "fish": 97.0,
+    "shrimp": 90.0,
+    "plankton": 0.0,
+}
+ADAPTIVE_ACCURACY = 0.01  # Relative error of the per-symbol quantile sketches
+ADAPTIVE_HALF_LIFE = 3600  # Seconds after which a trade counts half in the sketch
+ADAPTIVE_REFRESH = 10  # Seconds between threshold recomputations
+ADAPTIVE_MIN_TRADES = 1000  # Trades a symbol needs before leaving the fixed thresholds
+ADAPTIVE_MAX_SYMBOLS = 64  # Symbols tracked at once, or the number of --pairs if more; the least recently traded is dropped
+ADAPTIVE_ALL_SYMBOLS = 512  # Symbols tracked when every market is shown (--all-markets, --attach without --pairs)
+
+# Leaderboard side panel
+LEADERBOARD_TOP = 5  # Symbols listed per ranking
+LEADERBOARD_WINDOW = 300  # Rolling window in seconds
+LEADERBOARD_SLOTS = 10  # Sub-windows the rolling window expires in
+
+# Local data written while monitoring (candles and, when enabled, trade stores)
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".crypto-monitor")
+
+# OHLCV candles built from every processed trade (--candles)
+DEFAULT_CANDLE_DIR = os.path.join(DEFAULT_DATA_DIR, "candles")
+CANDLE_INTERVALS = {"1s": 1, "1m": 60}  # Name -> seconds
+CANDLE_GRACE = 2.0  # Seconds a candle stays open after its interval for late trades
+CANDLE_FLUSH_INTERVAL = 1.0  # Seconds between writes of closed candles
+
+# SQLite store of large trades (--store)
+DEFAULT_STORE_PATH = os.path.join(DEFAULT_DATA_DIR, "trades.db")
+DEFAULT_STORE_CATEGORY = "fish"  # Smallest category stored
+STORE_BATCH_SIZE = 1000  # Rows inserted per transaction at most
+STORE_FLUSH_INTERVAL = 1.0  # Seconds a row may wait before its transaction commits
+STORE_QUEUE_SIZE = 100_000  # Rows waiting for the writer; more are dropped rather than block the feed
+
+# Columnar per-day archive of every processed trade (--archive), read by crypto-monitor stats
+DEFAULT_ARCHIVE_DIR = os.path.join(DEFAULT_DATA_DIR, "archive")
+ARCHIVE_SEGMENT_ROWS = 1_000_000  # Rows per segment at most
+ARCHIVE_SEGMENT_SECONDS = 300  # Seconds a row may stay buffered, bounding what a crash loses
+ARCHIVE_FLUSH_INTERVAL = 5.0  # Seconds between checks for segments to write
+
+# Multi-process ingest (--workers)
+INGEST_RING_RECORDS = 65_536  # Records each worker's ring holds; more are dropped until the display catches up
+INGEST_READ_MAX = 4096  # Records taken from a ring per pass, bounding the time between display updates
+INGEST_WAKEUP_TIMEOUT = 0.05  # Seconds the event loop sleeps on the worker pipes before checking the rings anyway
+
+# Feed daemon (crypto-monitor daemon) that terminals attach to with --attach
+DEFAULT_FEED_SOCKETS = {mode: os.path.join(tempfile.gettempdir(), f"crypto-monitor-{mode}.feed")
+                        for mode in ("trades", "liquidations")}
+FEED_CLIENT_QUEUE = 256  # Batches queued per client; a client further behind loses batches
+FEED_SOCKET_MODE = 0o600  # Owner only; --socket-mode 660 lets the socket's group attach too
+
+# Event plugins (--plugin)
+PLUGIN_QUEUE_SIZE = 256  # Batches queued per plugin unless it sets its own; a plugin further behind loses batches
+PLUGIN_CLOSE_TIMEOUT = 2.0  # Seconds a threaded plugin may take to finish its batch at exit
+DEFAULT_PLUGIN_CSV = os.path.join(DEFAULT_DATA_DIR, "events.csv")  # Written by --plugin csv
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import os
+import shlex
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# A command handler gets the words after the command name and returns the reply
+CommandHandler = Callable[[List[str]], Union[str, Awaitable[str]]]
+
+class ControlServer:
+    """Line-based command channel on a local Unix domain socket.
+
+    Each line received is one command ("subscribe solusdt"); the reply is
+    written back followed by a blank line. Handlers run on the event loop,
+    so they must not block.
+    """
+
+    def __init__(self):
+        self.commands: Dict[str, CommandHandler] = {}
+        self.path: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.register("help", lambda args: "Commands: " + ", ".join(sorted(self.commands)))
+
+    def register(self, name: str, handler: CommandHandler):
+        """Add a command; handlers may be plain functions or coroutines"""
+        self.commands[name] = handler
+
+    async def start(self, path: str) -> bool:
+        """Listen on path; returns False if Unix sockets are unavailable.
+
+        Raises FileExistsError if another process already answers on path.
+        """
+        if not hasattr(asyncio, "start_unix_server"):
+            logger.warning("Control socket is not supported on this platform")
+            return False
+        if os.path.exists(path):
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(path)  # Left behind by a previous run
+            else:
+                writer.close()
+                raise FileExistsError(f"another process is listening on {path}")
+        self._server = await asyncio.start_unix_server(self._handle_client, path)
+        self.path = path
+        logger.info(f"Control socket listening on {path}")
+        return True
+
+    def stop(self):
+        """Close the socket and remove its file"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    async def execute(self, line: str) -> str:
+        """Run one command line and return its reply"""
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            return f"error: {e}"
+        if not words:
+            return ""
+        handler = self.commands.get(words[0].lower())
+        if handler is None:
+            return f"error: unknown command {words[0]!r} (try help)"
+        try:
+            reply = handler(words[1:])
+            if asyncio.iscoroutine(reply):
+                reply = await reply
+            return reply
+        except Exception as e:
+            logger.error(f"Error running control command {line!r}: {e}")
+            return f"error: {e}"
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.execute(line.decode(errors="ignore").strip())
+                writer.write(f"{reply}\n\n".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def send_command(path: str, line: str, timeout: float = 10.0) -> str:
+    """Send one command to a running monitor and return its reply"""
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        writer.write(f"{line}\n".encode())
+        await writer.drain()
+        lines = []
+        while True:
+            reply = await asyncio.wait_for(reader.readline(), timeout)
+            if not reply or reply == b"\n":
+                break
+            lines.append(reply.decode().rstrip("\n"))
+        return "\n".join(lines)
+    finally:
+        writer.close()
+
+# Global control server instance
+control = ControlServer()
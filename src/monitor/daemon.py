@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import FEED_CLIENT_QUEUE, FEED_SOCKET_MODE, INGEST_WAKEUP_TIMEOUT
+from .ingest import RECORD_DTYPE, IngestPool
+
+logger = logging.getLogger(__name__)
+
+# Every frame is a little-endian payload length and a kind byte, then the payload
+FRAME_HEADER = struct.Struct("<IB")
+HELLO = 1    # Daemon -> client, JSON: mode, streams and record size
+RECORDS = 2  # Daemon -> client, packed RECORD_DTYPE records
+STATUS = 3   # Daemon -> client, UTF-8 text
+FILTER = 4   # Client -> daemon, JSON list of exchange symbols to receive, or null for all
+
+# Largest frame a client accepts; a batch is a few hundred KB at most
+MAX_FRAME = 64 * 1024 * 1024
+
+def encode_frame(kind: int, payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload), kind) + payload
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Next (kind, payload); raises IncompleteReadError when the peer goes away"""
+    length, kind = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if length > MAX_FRAME:
+        raise ConnectionError(f"frame of {length} bytes is too large")
+    return kind, await reader.readexactly(length)
+
+class FeedClient:
+    """One attached terminal: its symbol filter and a bounded queue of frames to send"""
+
+    def __init__(self, writer: asyncio.StreamWriter, name: str):
+        self.writer = writer
+        self.name = name
+        self.symbols: Optional[np.ndarray] = None  # Exchange symbols (bytes) wanted; None for all
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=FEED_CLIENT_QUEUE)
+        self.sent = 0
+        self.dropped = 0  # Records lost because the queue was full
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, frame: bytes, records: int):
+        """Queue a frame unless the client is that far behind"""
+        try:
+            self.queue.put_nowait(frame)
+            self.sent += records
+        except asyncio.QueueFull:
+            self.dropped += records
+
+    async def send_frames(self):
+        reported = 0
+        while True:
+            frame = await self.queue.get()
+            if self.dropped > reported:
+                text = f"Feed daemon dropped {self.dropped - reported} records: this terminal fell behind"
+                self.writer.write(encode_frame(STATUS, text.encode()))
+                reported = self.dropped
+            self.writer.write(frame)
+            await self.writer.drain()  # Waits on this client only
+
+class FeedDaemon:
+    """Publishes decoded records to any number of local clients over a Unix socket.
+
+    The exchange streams are received and decoded once, by an
+    IngestPool, and every batch is packed once into a RECORDS frame.
+    Each client gets the frame (or, with a symbol filter, its own subset)
+    on a bounded queue that a per-client task writes out, so a slow
+    client drops frames and is told so instead of stalling the others.
+    """
+
+    def __init__(self, pool: IngestPool, mode: str, streams: List[str]):
+        self.pool = pool
+        self.mode = mode
+        self.streams = streams
+        self.clients: Dict[int, FeedClient] = {}
+        self.path: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._next_client = 1
+        self.reported_drops = 0  # Records lost to full worker rings that clients have been told about
+
+    async def start(self, path: str, mode: int = FEED_SOCKET_MODE):
+        """Listen on path with permissions mode; raises FileExistsError if a daemon already answers there"""
+        if os.path.exists(path):
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(path)  # Left behind by a previous run
+            else:
+                writer.close()
+                raise FileExistsError(f"another process is listening on {path}")
+        umask = os.umask(0o177)  # No one else may connect before the chmod
+        try:
+            self._server = await asyncio.start_unix_server(self._serve, path)
+        finally:
+            os.umask(umask)
+        self.path = path
+        os.chmod(path, mode)
+        logger.info(f"Feed daemon listening on {path} (mode {mode:o})")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self.pool.stop()
+
+    def publish(self, records: np.ndarray):
+        """Send a batch to every client, each filtered to its symbols"""
+        frame = None
+        for client in list(self.clients.values()):
+            if client.symbols is None:
+                if frame is None:
+                    frame = encode_frame(RECORDS, records.tobytes())
+                client.offer(frame, len(records))
+                continue
+            wanted = records[np.isin(records["symbol"], client.symbols)]
+            if len(wanted):
+                client.offer(encode_frame(RECORDS, wanted.tobytes()), len(wanted))
+
+    def broadcast(self, text: str):
+        """Send a status line to every client"""
+        frame = encode_frame(STATUS, text.encode())
+        for client in list(self.clients.values()):
+            client.offer(frame, 0)
+
+    def describe(self) -> str:
+        """Clients with the records sent to and dropped for each, and records the daemon itself dropped"""
+        lines = [f"{client.name}: {client.sent} sent, {client.dropped} dropped"
+                 f"{'' if client.symbols is None else ' (' + ' '.join(s.decode() for s in client.symbols) + ')'}"
+                 for client in self.clients.values()] or ["no clients"]
+        if self.reported_drops:
+            lines.append(f"daemon: {self.reported_drops} records dropped behind the workers")
+        return "\n".join(lines)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client_id = self._next_client
+        self._next_client += 1
+        client = FeedClient(writer, f"client {client_id}")
+        hello = {"mode": self.mode, "streams": self.streams, "record_size": RECORD_DTYPE.itemsize}
+        writer.write(encode_frame(HELLO, json.dumps(hello).encode()))
+        try:
+            # Nothing is sent before the client's first FILTER, so it never sees symbols it did not ask for
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind != FILTER:
+                    continue
+                symbols = json.loads(payload)
+                client.symbols = None if symbols is None else np.array([s.encode() for s in symbols],
+                                                                       dtype=RECORD_DTYPE["symbol"])
+                if client.task is None:
+                    self.clients[client_id] = client
+                    client.task = asyncio.ensure_future(client.send_frames())
+                    logger.info(f"{client.name} attached ({len(self.clients)} attached)")
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+            if client.task is not None:
+                del self.clients[client_id]
+                client.task.cancel()
+                logger.info(f"{client.name} detached: {client.sent} records sent, {client.dropped} dropped")
+
+    async def run(self):
+        """Move records from the workers to the clients until cancelled"""
+        while True:
+            for kind, message in self.pool.messages():
+                (logger.error if kind == "error" else logger.info)(message)
+                self.broadcast(message)
+            records = self.pool.read()
+            if not len(records):
+                await self.pool.wait(INGEST_WAKEUP_TIMEOUT)
+                continue
+            self.publish(records)
+            dropped = self.pool.dropped
+            if dropped > self.reported_drops:
+                text = f"Feed daemon fell behind the workers, {dropped - self.reported_drops} records dropped"
+                logger.error(text)
+                self.broadcast(text)
+                self.reported_drops = dropped
+            await asyncio.sleep(0)
+
+async def attach_feed(path: str, mode: str, symbols: Optional[List[str]]) -> Tuple[asyncio.StreamReader,
+                                                                               asyncio.StreamWriter, dict]:
+    """Connect to a feed daemon, check its mode and ask for symbols (None for all)"""
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        kind, payload = await read_frame(reader)
+        hello = json.loads(payload) if kind == HELLO else {}
+        if hello.get("record_size") != RECORD_DTYPE.itemsize:
+            raise ConnectionError("not a compatible feed daemon")
+        if hello.get("mode") != mode:
+            raise ConnectionError(f"the daemon at {path} publishes {hello.get('mode')}, not {mode}")
+        writer.write(encode_frame(FILTER, json.dumps(symbols).encode()))
+        await writer.drain()
+    except BaseException:
+        writer.close()
+        raise
+    return reader, writer, hello
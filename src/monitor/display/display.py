@@ -1,441 +1,402 @@
-import os
 import logging
-import time
-from collections import deque
 from threading import Lock
-from typing import Any, Dict, Optional, Tuple
-from colorama import Fore, Back, Style
+from typing import Dict, List, Optional, Tuple
 
-from ..models import BaseTrade, Column, TABLE_CONFIG, DisplayConfig, ColumnConfig
-from .terminal import (
-    stream, clear_screen, clear_line, move_cursor,
-    hide_cursor, show_cursor
+from ..config import (
+    MARKET_CATEGORIES, DEFAULT_HISTORY_MB, PROFILE_PANEL_WIDTH, ADAPTIVE_PERCENTILES, category_index
 )
+from ..history import HistoryStore
+from ..models import BaseTrade, DisplayConfig, TradeSummary
 from .styles import setup_styles
-from .formatters import format_value, format_price, format_quantity
+from .rows import RenderedRow
+from .layout import compute_layout, get_terminal_size
+from .renderer import RenderThread, Snapshot
+from ..trace import tracer
+from ..log import debug_sampler
+from ..ticker import TickerTable
+from ..profile import VolumeProfile
+from ..sparkline import SparklineStore
+from ..sizes import SizeHistograms
+from ..leaderboard import Leaderboard
+from .panel import render_profile, render_sizes, render_leaders
 
 logger = logging.getLogger(__name__)
 
+# Category index the "jump to last whale" key searches for
+WHALE_INDEX = category_index(MARKET_CATEGORIES["whale"].min_size)
+
+# Side panels, in the order the panel key cycles through them
+PANELS = ("volume", "sizes", "leaders")
+
 class FixedHeightDisplay:
+    """Holds the display state and publishes snapshots to the render thread.
+
+    Nothing here writes to the terminal: every change builds an immutable
+    Snapshot that the RenderThread paints, so callers on the event loop
+    never block on stdout.
+    """
+
     def __init__(self, config: DisplayConfig):
         self.config = config
         self.lock = Lock()
         self.last_update = 0
-        self._get_terminal_size()
-        self.trades = deque(maxlen=self.max_visible_rows)
+        self.panel: Optional[str] = None  # Side panel shown, one of PANELS
+        self.profile: Optional[VolumeProfile] = None  # Profile of the focused symbol
+        self.sizes = SizeHistograms()  # Trade size histograms of every symbol
+        self.leaders = Leaderboard()  # Top symbols by volume and net flow
+        self._panel: Tuple[str, ...] = ()  # Panel lines as last refreshed
+        self.layout = compute_layout(*get_terminal_size())
+        self.history = HistoryStore(DEFAULT_HISTORY_MB * 1024 * 1024)
+        self.view_end: Optional[int] = None  # Newest history seq shown; None follows live trades
+        self._view_start = 0  # Oldest history seq on screen
+        self._row_cache: Dict[int, RenderedRow] = {}  # Rendered rows on screen, by history seq
+        self._unrendered: Dict[int, BaseTrade] = {}  # Newest live trades, rendered only if still on screen
         self.styles = setup_styles()
         self.logger = logger
-        self.blink_state = {}  # Track blink state for each trade
-        self.last_blink_time = time.time()
-        self.blink_interval = 0.5  # Blink every 0.5 seconds
+        self.blink_tick = 0  # Advanced by the animation timer, see blink()
         self.last_price = {}  # Track last price for each symbol
+        self.ticker: Optional[TickerTable] = None  # Price source for the header when set
+        self._ticker_rows: List[Tuple[str, float, float]] = []  # ticker.rows() as of _ticker_updates
+        self._ticker_updates = -1
+        self.sparklines: Optional[SparklineStore] = SparklineStore()  # Recent price range per symbol
+        self._prices: Tuple[Tuple[str, float, Optional[float], str], ...] = ()  # Header as last refreshed
         self.min_category = None  # Store current category filter
         self.min_size = 0  # Store current size filter
-        self.initialize_display()
+        self.adaptive = False  # Categories follow per-symbol percentiles (--adaptive)
+        self.focus: Optional[str] = None  # Symbol the feed is narrowed to
+        self.paused = False  # Table frozen while trades keep being recorded
+        self.status = ("", None)  # Current status message and details
+        self.error: Optional[str] = None  # Last error message
+        self.renderer = RenderThread(self.styles)
 
     @property
-    def max_visible_rows(self):
-        """Calculate maximum visible rows based on terminal height"""
-        # Account for:
-        # - header (2 lines)
-        # - column headers (2 lines)
-        # - status lines (2 lines)
-        # - legend (2 lines)
-        # - attribution (1 line)
-        # - bottom padding (2 lines)
-        return max(1, self.terminal_height - 11)
-
-    def _get_terminal_size(self):
-        """Get terminal size and calculate display dimensions"""
-        try:
-            size = os.get_terminal_size()
-            new_width = size.columns
-            new_height = size.lines
-            
-            # Only update if size actually changed
-            if new_width != getattr(self, 'terminal_width', 0) or new_height != getattr(self, 'terminal_height', 0):
-                self.terminal_width = new_width
-                self.terminal_height = new_height
-                
-                # Update table column widths based on terminal width
-                self._adjust_column_widths()
-                
-                # Update trade buffer size if needed
-                if hasattr(self, 'trades'):
-                    new_deque = deque(self.trades, maxlen=self.max_visible_rows)
-                    new_deque.extend(self.trades)
-                    self.trades = new_deque
-                    
-                return True  # Size changed
-            return False  # Size unchanged
-        except OSError:
-            # Fallback sizes
-            self.terminal_width = 120
-            self.terminal_height = 30
-            return False
-
-    def _adjust_column_widths(self):
-        """Adjust column widths based on terminal width"""
-        # Calculate total current width
-        total_width = sum(config.width for config in TABLE_CONFIG.values()) + len(TABLE_CONFIG) - 1  # -1 for spaces
-        
-        # If terminal is too narrow, reduce some column widths
-        if total_width > self.terminal_width:
-            # Columns that can be shortened
-            flexible_columns = [Column.INFO, Column.CATEGORY, Column.TYPE]
-            
-            # Calculate how much we need to reduce
-            to_reduce = total_width - self.terminal_width + 5  # +5 for safety margin
-            
-            for col in flexible_columns:
-                if to_reduce <= 0:
-                    break
-                current_width = TABLE_CONFIG[col].width
-                # Don't reduce below minimum widths
-                min_width = 8 if col == Column.INFO else 6
-                reduction = min(to_reduce, current_width - min_width)
-                if reduction > 0:
-                    TABLE_CONFIG[col] = ColumnConfig(
-                        TABLE_CONFIG[col].name,
-                        current_width - reduction,
-                        TABLE_CONFIG[col].align,
-                        TABLE_CONFIG[col].format_func
-                    )
-                    to_reduce -= reduction
-
-    def _clear_screen(self):
-        """Clear the screen and reset cursor"""
-        clear_screen()
-
-    def _format_cell(self, value: Any, config: Dict[str, Any]) -> str:
-        """Format a cell value according to its configuration"""
-        format_func = config.get("format_func")
-        if format_func:
-            if format_func == "format_value":
-                value = format_value(value)
-            elif format_func == "format_price":
-                value = format_price(value)
-            elif format_func == "format_quantity":
-                value = format_quantity(value)
-            else:
-                value = str(value)
-        else:
-            value = str(value)
-
-        if config.get("align") == "right":
-            return value.rjust(config["width"])
-        return value.ljust(config["width"])
-
-    def _print_header(self):
-        """Print the header with box drawing characters"""
-        move_cursor(1, 1)
-        title = "Coins Monitor"
-        header = f"{self.styles['header']}╔{'═' * (self.terminal_width - 2)}╗{self.styles['normal']}"
-        move_cursor(1, 1)
-        stream.write(header)
-        
-        # Center the title
-        title_pos = max(1, (self.terminal_width - len(title)) // 2)
-        move_cursor(1, title_pos)
-        stream.write(f"{self.styles['header']}{title}{self.styles['normal']}")
-
-        # Add last prices line
-        move_cursor(2, 1)
-        prices_text = self._format_last_prices()
-        stream.write(f"{self.styles['dim']}{prices_text}{self.styles['normal']}")
-        
-        # Print column headers
-        move_cursor(3, 1)
-        header_row = ""
-        remaining_width = self.terminal_width - 2
-        
-        for col in Column:
-            config = TABLE_CONFIG[col]
-            header_config = {
-                "width": config.width,
-                "align": config.align,
-                "format_func": None
-            }
-            cell = self._format_cell(config.name, header_config)
-            # Match the same spacing as trade rows
-            if col in [Column.VALUE, Column.INFO, Column.CATEGORY]:
-                if len(header_row) + len(cell) + 2 <= remaining_width:
-                    header_row += cell + "  "  # Two spaces
-            elif col == Column.TYPE:
-                if len(header_row) + len(cell) + 3 <= remaining_width:
-                    header_row += cell + "   "  # Three spaces after TYPE
-            elif col == Column.SIZE:
-                if len(header_row) + len(cell) <= remaining_width:
-                    header_row += cell  # No extra space after SIZE
-            else:
-                if len(header_row) + len(cell) + 1 <= remaining_width:
-                    header_row += cell + " "  # One space for other columns
-
-        stream.write(f"{self.styles['header']}{header_row}{self.styles['normal']}")
-        
-        # Print separator line
-        move_cursor(4, 1)
-        stream.write(f"{self.styles['border']}{'─' * (self.terminal_width - 2)}{self.styles['normal']}")
-
-    def _format_last_prices(self) -> str:
-        """Format last prices for display"""
-        prices = []
-        for symbol, price in self.last_price.items():
-            prices.append(f"{symbol}: {format_price(price)}")
-        if not prices:
-            return "Waiting for price data..."
-        return " | ".join(prices)
-
-    def _should_blink(self, trade: BaseTrade) -> Tuple[bool, str]:
-        """Determine if a trade should blink and get its style"""
-        trade_data = trade.to_row()
-        is_buy = trade_data[Column.SIDE] == "BUY"
-        category = trade.category
-        
-        # Base colors
-        base_fg = Fore.GREEN if is_buy else Fore.RED
-        base_bg = Back.BLACK
-        
-        # Get trade ID for tracking blink state
-        trade_id = id(trade)
-        current_time = time.time()
-        
-        # Initialize blink state if not exists
-        if trade_id not in self.blink_state:
-            self.blink_state[trade_id] = True
-        
-        # Update blink states every interval
-        if current_time - self.last_blink_time >= self.blink_interval:
-            self.last_blink_time = current_time
-            # Update all blink states
-            for tid in self.blink_state:
-                self.blink_state[tid] = not self.blink_state[tid]
-        
-        # Determine style based on trade size
-        if category.min_size >= 10_000_000:  # Aquaman
-            # Always blink, alternating between inverted and normal
-            if self.blink_state[trade_id]:
-                return True, f"{Back.GREEN if is_buy else Back.RED}{Fore.BLACK}{Style.BRIGHT}"
-            else:
-                return True, f"{base_fg}{base_bg}{Style.BRIGHT}"
-        elif category.min_size >= 1_000_000:  # Whale
-            # Blink between inverted and normal
-            if self.blink_state[trade_id]:
-                return True, f"{Back.GREEN if is_buy else Back.RED}{Fore.BLACK}{Style.BRIGHT}"
-            else:
-                return True, f"{base_fg}{base_bg}{Style.BRIGHT}"
-        elif category.min_size >= 250_000:  # Shark/Orca
-            # Blink between bright and normal
-            if self.blink_state[trade_id]:
-                return True, f"{base_fg}{base_bg}{Style.BRIGHT}"
-            else:
-                return True, f"{base_fg}{base_bg}"
-        else:  # Smaller trades
-            # No blinking
-            return False, f"{base_fg}{base_bg}"
+    def terminal_width(self) -> int:
+        return self.layout.width
+
+    @property
+    def terminal_height(self) -> int:
+        return self.layout.height
+
+    @property
+    def max_visible_rows(self) -> int:
+        """Maximum visible rows based on terminal height"""
+        return self.layout.max_visible_rows
+
+    def set_history_budget(self, megabytes: float):
+        """Replace the history store with one sized to a memory budget"""
+        with self.lock:
+            self.history = HistoryStore(int(megabytes * 1024 * 1024))
+            self.view_end = None
+            self._row_cache = {}
+            self._unrendered = {}
+            self.logger.info(f"History holds up to {self.history.capacity} trades ({megabytes} MB)")
+
+    def _view_rows(self) -> List[RenderedRow]:
+        """Rows in the current view, oldest first; lock must be held.
+
+        Walks back from the end of the view until the screen is full,
+        rendering rows that are not cached yet. The cache is rebuilt to
+        hold only what is on screen.
+        """
+        history = self.history
+        if history.last_seq < 0:
+            return []
+        end = history.last_seq if self.view_end is None else self.view_end
+        end = max(history.first_seq, min(end, history.last_seq))
+
+        rows = []
+        cache = {}
+        lines = 0
+        seq = end
+        while seq >= history.first_seq and lines < self.max_visible_rows:
+            row = self._row_cache.get(seq)
+            if row is None:
+                trade = self._unrendered.get(seq) or history.get(seq)
+                row = RenderedRow(trade, self.layout.columns, self.blink_tick)
+            cache[seq] = row
+            rows.append(row)
+            lines += row.repeat
+            seq -= 1
+        self._row_cache = cache
+        self._unrendered.clear()
+        self._view_start = seq + 1
+        rows.reverse()
+        return rows
+
+    def _snapshot(self) -> Snapshot:
+        """Capture the current state; must be called with the lock held"""
+        tick = self.blink_tick
+        rows = self._view_rows()
+        lines = []
+        for row in rows:
+            # Large trades are repeated on screen, but stored once
+            lines.extend([row.line(tick)] * row.repeat)
+        newer = 0 if self.view_end is None else max(0, self.history.last_seq - self.view_end)
+        return Snapshot(
+            layout=self.layout,
+            rows=tuple(lines[-self.max_visible_rows:]),
+            visible_rows=len(rows),
+            total_rows=len(self.history),
+            newer_rows=newer,
+            paused=self.paused,
+            prices=self._prices,
+            panel=self._panel,
+            settings=self._format_settings_info(),
+            status=self.status[0],
+            status_details=self.status[1],
+            error=self.error,
+        )
+
+    def _publish(self):
+        """Publish the current state to the render thread; lock must be held"""
+        self.renderer.publish(self._snapshot())
+
+    def set_ticker(self, ticker: Optional[TickerTable]):
+        """Take header prices and 24h changes from a ticker table instead of trades"""
+        with self.lock:
+            self.ticker = ticker
+            self._ticker_updates = -1
 
-    def _print_trade_row(self, row: int, trade: BaseTrade):
-        """Print a single trade row"""
+    def set_sparkline_window(self, minutes: float):
+        """Change the sparkline window (0 hides sparklines)"""
+        with self.lock:
+            self.sparklines = SparklineStore(minutes) if minutes > 0 else None
+
+    def refresh_prices(self):
+        """Rebuild the price line; driven by a fixed-rate timer, never per trade"""
         try:
-            move_cursor(row, 1)
-            trade_data = trade.to_row()
-            
-            # Get blink state and style
-            should_blink, style_str = self._should_blink(trade)
-            
-            row_text = ""
-            for col in Column:
-                config = TABLE_CONFIG[col]
-                value = trade_data[col]
-                cell_config = {
-                    "width": config.width,
-                    "align": config.align,
-                    "format_func": config.format_func
-                }
-                cell = self._format_cell(value, cell_config)
-                # Adjust spacing for different columns
-                if col in [Column.VALUE, Column.INFO, Column.CATEGORY]:
-                    row_text += cell + "  "  # Two spaces
-                elif col == Column.TYPE:
-                    row_text += cell + "   "  # Three spaces after TYPE
-                elif col == Column.SIZE:
-                    row_text += cell  # No extra space after SIZE
+            with self.lock:
+                if self.ticker is not None:
+                    # Ticker batches arrive about once a second; only re-sort the table after one
+                    if self.ticker.updates != self._ticker_updates:
+                        self._ticker_rows = self.ticker.rows()
+                        self._ticker_updates = self.ticker.updates
+                    rows = self._ticker_rows
                 else:
-                    row_text += cell + " "  # One space for other columns
-            
-            # Ensure we're writing to the correct position
-            clear_line(row)
-            move_cursor(row, 1)
-            stream.write(f"{style_str}{row_text}{self.styles['normal']}")
-            stream.flush()
+                    rows = ((symbol, price, None) for symbol, price in self.last_price.items())
+                sparklines = self.sparklines
+                prices = tuple((symbol, price, change, sparklines.sparkline(symbol) if sparklines else "")
+                               for symbol, price, change in rows)
+                if prices != self._prices:
+                    self._prices = prices
+                    if not self.paused:
+                        self._publish()
+        except Exception as e:
+            self.logger.error(f"Error refreshing prices: {e}")
+
+    def _relayout(self, width: int, height: int):
+        """Swap in a new layout; lock must be held"""
+        old_layout = self.layout
+        self.layout = compute_layout(width, height, PROFILE_PANEL_WIDTH if self.panel else 0)
+        # Re-render cached rows only if column widths changed
+        if self.layout.columns != old_layout.columns:
+            for row in self._row_cache.values():
+                row.render(self.layout.columns)
+        self._panel = self._render_panel()
+        # A new layout object makes the render thread repaint the whole screen
+        self._publish()
+
+    def handle_resize(self):
+        """Recompute the layout after a terminal resize and redraw everything"""
+        width, height = get_terminal_size()
+        try:
+            with self.lock:
+                if (width, height) == (self.layout.width, self.layout.height):
+                    return
+                self._relayout(width, height)
         except Exception as e:
-            self.logger.error(f"Error in _print_trade_row: {e}")
-            raise
+            self.logger.error(f"Error handling resize: {e}")
+
+    def show_panel(self, panel: Optional[str]):
+        """Show one of PANELS beside the table, or hide the panel (None)"""
+        with self.lock:
+            self.panel = panel
+            self._relayout(self.layout.width, self.layout.height)
+
+    def cycle_panel(self):
+        """Show the next side panel, then none"""
+        index = PANELS.index(self.panel) + 1 if self.panel else 0
+        self.show_panel(PANELS[index] if index < len(PANELS) else None)
+
+    def _render_panel(self) -> Tuple[str, ...]:
+        """Side panel lines for the current layout; lock must be held"""
+        width = self.layout.panel_width - 1  # Less the separator
+        if width <= 0:
+            return ()
+        if self.panel == "sizes":
+            return tuple(render_sizes(self.sizes, self.focus, self.max_visible_rows, width))
+        if self.panel == "leaders":
+            return tuple(render_leaders(self.leaders, self.max_visible_rows, width))
+        if self.profile is None:
+            return (" Press f to focus a pair".ljust(width),)
+        return tuple(render_profile(self.profile, self.max_visible_rows, width))
+
+    def refresh_panel(self):
+        """Redraw the side panel; driven by the same low-rate timer as the prices"""
+        try:
+            with self.lock:
+                panel = self._render_panel()
+                if panel != self._panel:
+                    self._panel = panel
+                    if not self.paused:
+                        self._publish()
+        except Exception as e:
+            self.logger.error(f"Error refreshing panel: {e}")
 
     def add_trade(self, trade: BaseTrade):
         """Add a trade to the display and update last price"""
         try:
             with self.lock:
-                self.logger.debug(f"Adding trade: {trade}")
-                # Add the trade multiple times based on category
-                repeat_times = trade.category.repeat_times
-                for _ in range(repeat_times):
-                    self.trades.append(trade)
-                # Update last price for the symbol
-                self.last_price[trade.symbol] = trade.price
-                self.logger.debug(f"Current trades count: {len(self.trades)}")
+                seq = self.history.append(trade)
+                if self.view_end is None:
+                    # Rendered on the next publish, and only if it is still on screen by then
+                    unrendered = self._unrendered
+                    unrendered[seq] = trade
+                    unrendered.pop(seq - self.max_visible_rows, None)
+                # Update last price for the symbol (a summary's price is an average)
+                if not isinstance(trade, TradeSummary):
+                    self.last_price[trade.symbol] = trade.price
+                if debug_sampler():
+                    self.logger.debug("Added trade: %s (history size: %d)", trade, len(self.history))
         except Exception as e:
             self.logger.error(f"Error adding trade: {e}", exc_info=True)
 
     def update_display(self):
-        """Update the entire display"""
-        if not hasattr(self, 'trades'):
-            self.logger.debug("Display not initialized")
-            return
-
+        """Publish the current state for repainting"""
         try:
-            with self.lock:
-                # Check if terminal size has changed
-                try:
-                    current_size = os.get_terminal_size()
-                    if (current_size.columns != self.terminal_width or 
-                        current_size.lines != self.terminal_height):
-                        self._get_terminal_size()
-                        self._clear_screen()
-                        self._print_header()
-                except OSError:
-                    pass  # Ignore terminal size errors
-                
-                hide_cursor()
-                
-                # Print trades
-                start_row = 5
-                visible_rows = min(len(self.trades), self.max_visible_rows)
-                
-                for i in range(visible_rows):
-                    try:
-                        clear_line(start_row + i)
-                        self._print_trade_row(start_row + i, list(self.trades)[i])
-                    except Exception as e:
-                        self.logger.error(f"Error printing trade row {i}: {e}")
-                
-                # Clear any remaining lines
-                for i in range(visible_rows, self.max_visible_rows):
-                    clear_line(start_row + i)
-                
-                # Update status lines
-                self._print_status_line()
-                
-                # Print footer only once
-                self._print_footer()
-                
-                stream.flush()
+            with self.lock, tracer.span("display.publish", "display"):
+                if not self.paused:
+                    self._publish()
         except Exception as e:
             self.logger.error(f"Error updating display: {e}")
-        finally:
-            show_cursor()
 
-    def _print_status_line(self):
-        """Print a status line showing trade count"""
-        total_trades = len(self.trades)
-        visible_trades = min(total_trades, self.max_visible_rows)
-        status = f"Showing {visible_trades} of {total_trades} trades"
-        move_cursor(self.terminal_height - 4, 1)  # Moved up to make room for attribution
-        stream.write(f"{self.styles['dim']}{status}{self.styles['normal']}")
+    def blink(self):
+        """Advance the blink animation, repainting only if a visible row blinks"""
+        try:
+            with self.lock, tracer.span("display.blink", "display"):
+                self.blink_tick += 1
+                if not self.paused and any(row.blinks for row in self._row_cache.values()):
+                    self._publish()
+        except Exception as e:
+            self.logger.error(f"Error updating blink animation: {e}")
+
+    def _scroll_to(self, view_end: Optional[int]):
+        """Move the view so it ends at a history seq (None follows live trades)"""
+        with self.lock:
+            if view_end is not None and view_end >= self.history.last_seq:
+                view_end = None
+            elif view_end is not None:
+                view_end = max(view_end, self.history.first_seq)
+            self.view_end = view_end
+            self._publish()
+
+    def page_up(self):
+        """Scroll back by one screen of trades"""
+        self._scroll_to(max(self._view_start - 1, self.history.first_seq))
+
+    def page_down(self):
+        """Scroll forward by one screen of trades"""
+        if self.view_end is not None:
+            self._scroll_to(self.view_end + len(self._row_cache))
+
+    def scroll_to_oldest(self):
+        """Show the oldest trades still held in history"""
+        self._scroll_to(self.history.first_seq + len(self._row_cache) - 1)
+
+    def follow_live(self):
+        """Return to following new trades"""
+        self._scroll_to(None)
+
+    def jump_to_last_whale(self):
+        """Scroll to the newest Whale-or-larger trade before the current view"""
+        before = None if self.view_end is None else self.view_end
+        seq = self.history.find_last(WHALE_INDEX, before)
+        if seq is None:
+            self.print_status("No whale trades in history")
+            return
+        self._scroll_to(seq)
+
+    def toggle_pause(self) -> bool:
+        """Freeze or resume the table; trades are still recorded while paused"""
+        with self.lock:
+            self.paused = not self.paused
+            if self.paused:
+                if self.view_end is None:
+                    self.view_end = self.history.last_seq
+            else:
+                self.view_end = None
+            self._publish()
+            return self.paused
 
     def print_error(self, error: str):
-        """Print error message at the bottom of the screen"""
+        """Show an error message at the bottom of the screen"""
         try:
             with self.lock:
                 self.logger.error(error)
-                clear_line(self.terminal_height - 2)  # Moved up to make room for attribution
-                move_cursor(self.terminal_height - 2, 1)
-                stream.write(f"{self.styles['sell']}Error: {error}{self.styles['normal']}")
-                stream.flush()
+                self.error = error
+                self._publish()
         except Exception as e:
             self.logger.error(f"Error printing error message: {e}", exc_info=True)
 
     def print_status(self, status: str, details: Optional[str] = None):
-        """Print status message at the bottom of the screen"""
+        """Show a status message at the bottom of the screen"""
         try:
             with self.lock:
                 self.logger.info(f"Status: {status} {details if details else ''}")
-                clear_line(self.terminal_height - 3)  # Moved up to make room for attribution
-                move_cursor(self.terminal_height - 3, 1)
-                if details:
-                    stream.write(f"{self.styles['header']}{status}{self.styles['normal']}: {self.styles['dim']}{details}{self.styles['normal']}")
-                else:
-                    stream.write(f"{self.styles['header']}{status}{self.styles['normal']}")
-                stream.flush()
+                self.status = (status, details)
+                self._publish()
         except Exception as e:
             self.logger.error(f"Error printing status: {e}", exc_info=True)
 
     def initialize_display(self):
-        """Initialize the display for first time setup"""
+        """Start the render thread and paint the first frame.
+
+        Nothing is drawn before this is called, so commands that do not
+        monitor (e.g. control) leave the terminal alone.
+        """
+        if self.renderer.ident is None:
+            self.renderer.start()
         with self.lock:
-            self._clear_screen()
-            self._print_header()
-            stream.flush()
-
-    def _print_footer(self):
-        """Print footer with legend and attribution"""
-        # Calculate rows from bottom (including padding)
-        bottom_row = self.terminal_height - 3  # Changed from -2 to -3 for extra padding
-        
-        # Draw separator line
-        move_cursor(bottom_row - 4, 1)
-        stream.write(f"{self.styles['border']}{'─' * (self.terminal_width - 2)}{self.styles['normal']}")
-        
-        # Print legend in Romanian - Updated USD symbol
-        legend_row1 = "Simboluri: ★★10M+ USD(x5) | ◈◈1M+ USD(x4) | ◆◆500K+ USD(x3) | ▲▲250K+ USD(x2) | ■■100K+ USD(x2) | ►►50K+ USD | ▪▪10K+ USD | ··<10K USD"
-        legend_row2 = "Sunete: Frecvență mai înaltă & durată mai lungă = tranzacție/lichidare mai mare"
-        
-        # Add settings info using the formatter
-        settings = self._format_settings_info()
-        
-        # Center all rows
-        legend1_pos = max(1, (self.terminal_width - len(legend_row1)) // 2)
-        legend2_pos = max(1, (self.terminal_width - len(legend_row2)) // 2)
-        settings_pos = max(1, (self.terminal_width - len(settings)) // 2)
-        
-        # Print legends and settings
-        move_cursor(bottom_row - 3, legend1_pos)
-        stream.write(f"{self.styles['dim']}{legend_row1}{self.styles['normal']}")
-        
-        move_cursor(bottom_row - 2, legend2_pos)
-        stream.write(f"{self.styles['dim']}{legend_row2}{self.styles['normal']}")
-        
-        move_cursor(bottom_row - 1, settings_pos)
-        stream.write(f"{self.styles['header']}{settings}{self.styles['normal']}")
-        
-        # Draw bottom border and attribution
-        move_cursor(bottom_row, 1)
-        stream.write(f"{self.styles['border']}{'─' * (self.terminal_width - 2)}{self.styles['normal']}")
-        
-        # Always show attribution with heart
-        attribution = "Made with ❤️  by eapcj.ro"
-        attr_pos = max(1, (self.terminal_width - len(attribution)) // 2)
-        move_cursor(bottom_row, attr_pos)
-        stream.write(f"{self.styles['dim']}{attribution}{self.styles['normal']}")
-        
-        # Clear bottom padding lines (now 3 lines instead of 2)
-        clear_line(bottom_row + 1)
-        clear_line(bottom_row + 2)
-        clear_line(bottom_row + 3)
-
-    def update_settings(self, min_category: Optional[str] = None, min_size: float = 0):
+            self._publish()
+
+    def close(self, timeout: float = 1.0):
+        """Paint any pending frame and stop the render thread"""
+        if self.renderer.is_alive():
+            self.renderer.stop(timeout)
+
+    def update_settings(self, min_category: Optional[str] = None, min_size: float = 0,
+                        adaptive: Optional[bool] = None):
         """Update display settings"""
         with self.lock:
             self.min_category = min_category
             self.min_size = min_size
+            if adaptive is not None:
+                self.adaptive = adaptive
             self.logger.debug(f"Updated settings - Category: {min_category}, Size: {min_size}")
+            self._publish()
+
+    def set_focus(self, symbol: Optional[str]):
+        """Show which symbol the feed is narrowed to (None for all)"""
+        with self.lock:
+            self.focus = symbol
+            self.profile = VolumeProfile(symbol) if symbol else None
+            self._panel = self._render_panel()
+            self._publish()
 
     def _format_settings_info(self) -> str:
         """Format current settings info for display"""
-        if self.min_category and self.min_category in MARKET_CATEGORIES:
+        if self.min_category and self.min_category in MARKET_CATEGORIES and self.adaptive:
+            top = f"{100 - ADAPTIVE_PERCENTILES[self.min_category]:g}".replace(".", ",")
+            info = f"Filtru Activ: Categoria {self.min_category.upper()} (top {top}% pe pereche)"
+        elif self.min_category and self.min_category in MARKET_CATEGORIES:
             category = MARKET_CATEGORIES[self.min_category]
-            return f"Filtru Activ: Categoria {self.min_category.upper()} (min. {category.min_size:,.0f} USD)"
+            info = f"Filtru Activ: Categoria {self.min_category.upper()} (min. {category.min_size:,.0f} USD)"
         elif self.min_size > 0:
-            return f"Filtru Activ: Valoare Minimă {self.min_size:,.0f} USD"
-        return "Filtru: Toate Tranzacțiile"
-  
\ No newline at end of file
+            info = f"Filtru Activ: Valoare Minimă {self.min_size:,.0f} USD"
+        else:
+            info = "Filtru: Toate Tranzacțiile"
+        if self.adaptive:
+            info += " | Categorii adaptive"
+        if self.focus:
+            info += f" | Doar {self.focus}"
+        return info
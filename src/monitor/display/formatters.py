@@ -1,23 +1,71 @@
 import logging
+from functools import lru_cache
+from typing import Optional
+
+from ..config import PRICE_PRECISION, QUANTITY_PRECISION
 
 logger = logging.getLogger(__name__)
 
-def format_value(value: float) -> str:
+# Precomputed format specs; "_" grouping never collides with the decimal
+# point, so no placeholder pass is needed to swap the separators. Two C-level
+# replaces beat a single-pass str.translate or grouping loop on strings this
+# short (benchmarks/bench_formatters.py)
+_GROUPED_SPECS = tuple(f"_.{precision}f" for precision in range(13))
+
+def _group(value: float, precision: int) -> str:
+    """Format a number with European thousands/decimal separators"""
+    if precision == 0:
+        return format(value, ",.0f").replace(",", ".")
+    return format(value, _GROUPED_SPECS[precision]).replace(".", ",").replace("_", ".")
+
+def _price_precision(price: float, symbol: Optional[str]) -> int:
+    """Decimal places for a price: per-symbol if known, else by magnitude"""
+    precision = PRICE_PRECISION.get(symbol)
+    if precision is not None:
+        return precision
+    if price >= 1000:
+        return 2
+    if price >= 1:
+        return 4
+    return 8
+
+@lru_cache(maxsize=4096)
+def _format_price(price: float, precision: int) -> str:
+    """Memoized price formatting - the same prices repeat many times in a burst"""
+    return "€" + _group(price, precision)
+
+@lru_cache(maxsize=4096)
+def _format_quantity(quantity: float, precision: int) -> str:
+    """Memoized quantity formatting - lot sizes repeat constantly"""
+    return _group(quantity, precision)
+
+def format_value(value: float, symbol: Optional[str] = None) -> str:
     """Format trade value using European format"""
     try:
-        return f"€{int(value):,}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return "€" + _group(value, 0)
     except (TypeError, ValueError) as e:
         logger.error(f"Error formatting value {value}: {e}")
         return "€0"
 
-def format_price(price: float) -> str:
-    """Format price with appropriate precision using European format"""
+def format_price(price: float, symbol: Optional[str] = None) -> str:
+    """Format price with per-symbol precision using European format"""
     try:
-        return f"€{int(price):,}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return _format_price(price, _price_precision(price, symbol))
     except (TypeError, ValueError) as e:
         logger.error(f"Error formatting price {price}: {e}")
         return "€0"
 
-def format_quantity(quantity: float) -> str:
-    """Format quantity with appropriate precision"""
-    return f"{int(quantity):,}".replace(",", "X").replace(".", ",").replace("X", ".")
\ No newline at end of file
+def format_quantity(quantity: float, symbol: Optional[str] = None) -> str:
+    """Format quantity with per-symbol precision"""
+    try:
+        return _format_quantity(quantity, QUANTITY_PRECISION.get(symbol, 4))
+    except (TypeError, ValueError) as e:
+        logger.error(f"Error formatting quantity {quantity}: {e}")
+        return "0"
+
+def format_compact(value: float) -> str:
+    """Short USD amount for labels, e.g. "€56,2K" or "€1M" """
+    for limit, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if value >= limit * 0.9995:  # Anything that rounds to 1000 moves up a unit
+            return "€" + f"{value / limit:.3g}".replace(".", ",") + suffix
+    return "€" + f"{value:.3g}".replace(".", ",")
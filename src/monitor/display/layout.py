@@ -0,0 +1,85 @@
+import os
+from dataclasses import dataclass
+from typing import Tuple
+
+from ..models import Column, ColumnConfig, TABLE_CONFIG
+from .rows import CompiledColumn, column_separator, compile_columns
+
+# Fallback size when the terminal cannot be queried (e.g. output is piped)
+DEFAULT_TERMINAL_SIZE = (120, 30)
+
+# Columns that may be narrowed on small terminals, with their minimum widths
+FLEXIBLE_COLUMNS = ((Column.INFO, 8), (Column.CATEGORY, 6), (Column.TYPE, 6))
+
+# Lines not available to trade rows:
+# title and prices (2), column headers and separator (2),
+# separator and legend (3), counts/settings, status and error (3),
+# attribution (1)
+CHROME_LINES = 11
+
+@dataclass(frozen=True)
+class Layout:
+    """Screen layout computed once per terminal resize.
+
+    Layouts are immutable; a resize builds a new one and swaps it in, so
+    the renderer never sees a half-updated set of column widths.
+    """
+    width: int
+    height: int
+    table: Tuple[Tuple[Column, ColumnConfig], ...]
+    columns: Tuple[CompiledColumn, ...]
+    panel_width: int = 0  # Side panel to the right of the trade rows (0 = none)
+
+    @property
+    def max_visible_rows(self) -> int:
+        """Number of trade rows that fit on screen"""
+        return max(1, self.height - CHROME_LINES)
+
+    @property
+    def table_width(self) -> int:
+        """Width of a rendered trade row, where the side panel starts"""
+        return sum(width + len(separator) for _, _, width, _, separator in self.columns)
+
+def get_terminal_size() -> Tuple[int, int]:
+    """Return the terminal (columns, lines), falling back to a default size"""
+    try:
+        size = os.get_terminal_size()
+        return size.columns, size.lines
+    except OSError:
+        return DEFAULT_TERMINAL_SIZE
+
+def compute_layout(width: int, height: int, panel_width: int = 0) -> Layout:
+    """Fit the base TABLE_CONFIG column widths to the terminal width.
+
+    Widths are always derived from TABLE_CONFIG, which is never modified,
+    so columns grow back when the terminal is enlarged again. A side
+    panel takes panel_width columns from the table, and is dropped if
+    the table would not fit next to it.
+    """
+    if panel_width:
+        layout = compute_layout(width - panel_width, height)
+        if layout.table_width + panel_width <= width:
+            return Layout(width, height, layout.table, layout.columns, panel_width)
+        return compute_layout(width, height)
+
+    table = dict(TABLE_CONFIG)
+    total_width = sum(config.width + len(column_separator(col)) for col, config in table.items())
+
+    # If terminal is too narrow, reduce some column widths
+    if total_width > width:
+        to_reduce = total_width - width + 5  # +5 for safety margin
+        for col, min_width in FLEXIBLE_COLUMNS:
+            if to_reduce <= 0:
+                break
+            config = table[col]
+            reduction = min(to_reduce, config.width - min_width)
+            if reduction > 0:
+                table[col] = ColumnConfig(config.name, config.width - reduction, config.align, config.format_func)
+                to_reduce -= reduction
+
+    return Layout(
+        width=width,
+        height=height,
+        table=tuple((col, table[col]) for col in Column),
+        columns=compile_columns(table),
+    )
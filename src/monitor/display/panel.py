@@ -0,0 +1,155 @@
+import math
+from typing import List, Optional
+
+import numpy as np
+from colorama import Fore, Style
+
+from ..config import CATEGORY_ORDER, LEADERBOARD_TOP
+from ..profile import VolumeProfile
+from ..sizes import SizeHistograms
+from ..leaderboard import Leaderboard
+from .formatters import format_price, format_compact
+
+# Width of the price label in front of each bar
+LABEL_WIDTH = 12
+
+def render_profile(profile: VolumeProfile, height: int, width: int) -> List[str]:
+    """Side panel lines for a volume profile, highest price first.
+
+    The first line is a title; the rest merge the profile's price levels
+    into one band per line around the middle, each drawn as a buy (green)
+    and sell (red) bar scaled to the busiest band.
+    """
+    title = f" {profile.symbol} volume {profile.window / 60:g}m"[:width].ljust(width)
+    lines = [f"{Style.BRIGHT}{title}{Style.RESET_ALL}"]
+    bands = height - 1
+    if profile.bin_size is None or bands <= 0:
+        return lines + [" " * width] * max(0, bands)
+
+    per_band = max(1, math.ceil(profile.bins / bands))
+    first = max(0, profile.bins // 2 - bands * per_band // 2)
+    volume = np.zeros((bands * per_band, 2))
+    chunk = profile.totals[first:first + len(volume)]
+    volume[:len(chunk)] = chunk
+    volume = volume.reshape(bands, per_band, 2).sum(axis=1)
+    peak = volume.sum(axis=1).max()
+
+    bar_width = max(1, width - LABEL_WIDTH - 2)
+    current = None
+    if profile.last_price is not None:
+        current = math.floor((profile.last_price - profile.low) / profile.bin_size - first) // per_band
+
+    for band in reversed(range(bands)):
+        price = profile.low + (first + (band + 0.5) * per_band) * profile.bin_size
+        label = format_price(price, profile.symbol)[:LABEL_WIDTH].rjust(LABEL_WIDTH)
+        marker = "◄" if band == current else " "
+        buy, sell = volume[band]
+        buy_len = int(round(buy / peak * bar_width)) if peak > 0 else 0
+        sell_len = min(bar_width - buy_len, int(round(sell / peak * bar_width))) if peak > 0 else 0
+        pad = " " * (bar_width - buy_len - sell_len)
+        lines.append(f"{label}{marker} {Fore.GREEN}{'█' * buy_len}{Fore.RED}{'█' * sell_len}"
+                     f"{Style.RESET_ALL}{pad}")
+    return lines
+
+def _percent(count: float, total: float) -> str:
+    return f"{100 * count / total:.1f}%".replace(".", ",") if total else "0%"
+
+def _bands(sizes: SizeHistograms, histogram: np.ndarray, rows: int) -> List[tuple]:
+    """(category symbol, lower edge, count) per line, largest sizes first.
+
+    Shows the range of bins that have trades, merging neighbouring bins
+    (never across a category threshold) or falling back to one line per
+    category when they do not fit in rows.
+    """
+    used = np.flatnonzero(histogram)
+    if not used.size:
+        return []
+    first, last = int(used[0]), int(used[-1])
+    step = sizes.bins_per_step
+    for per_band in (n for n in (1, 2, 4, 8) if step % n == 0):
+        start, end = first - first % per_band, last - last % per_band + per_band
+        if (end - start) // per_band <= rows:
+            bands = [(b, histogram[b:b + per_band].sum()) for b in range(start, end, per_band)]
+            break
+    else:
+        categories = sizes.category_counts(histogram)
+        bands = [(int(np.flatnonzero(sizes.categories == c)[0]), categories[c])
+                 for c in range(len(categories)) if categories[c]][-rows:]
+    result = []
+    for b, count in reversed(bands):
+        category = int(sizes.categories[b])
+        starts_category = b == 0 or sizes.categories[b - 1] != category
+        symbol = CATEGORY_ORDER[category].symbol if starts_category else "  "
+        result.append((symbol, float(sizes.edges[b]), int(count)))
+    return result
+
+def render_sizes(sizes: SizeHistograms, symbol: Optional[str], height: int, width: int) -> List[str]:
+    """Side panel lines for the trade size histogram of a symbol (None for all).
+
+    One line per size bin, largest first, with the category symbol where
+    a category starts, a bar scaled to the busiest bin and its share of
+    trades.
+    """
+    title = f" {symbol or 'All'} sizes {sizes.window / 60:g}m"[:width].ljust(width)
+    lines = [f"{Style.BRIGHT}{title}{Style.RESET_ALL}"]
+    histogram = sizes.histogram(symbol)
+    total = histogram.sum()
+    bands = _bands(sizes, histogram, height - 1)
+    peak = max((count for _, _, count in bands), default=0)
+    bar_width = max(1, width - 17)
+    for category_symbol, edge, count in bands:
+        bar = int(round(count / peak * bar_width)) if peak else 0
+        lines.append(f"{category_symbol} {format_compact(edge):>6} {Fore.CYAN}{'█' * bar}{Style.RESET_ALL}"
+                     f"{' ' * (bar_width - bar)} {_percent(count, total):>6}")
+    return lines + [" " * width] * max(0, height - len(lines))
+
+def format_size_stats(sizes: SizeHistograms, symbol: Optional[str] = None) -> str:
+    """Text report of trade sizes for the stats command.
+
+    One line per symbol with the median, p99 and p99.9 trade size and
+    the share of trades at or above each category; for a single symbol
+    the full histogram follows.
+    """
+    symbols = [symbol] if symbol else sizes.symbols()
+    if not symbols:
+        return "No trades yet"
+    lines = [f"Trade sizes over the last {sizes.window / 60:g} minutes"]
+    for name in symbols:
+        histogram = sizes.histogram(name)
+        total = int(histogram.sum())
+        quantiles = "  ".join(
+            f"{label} {format_compact(value) if value is not None else '-'}"
+            for label, value in (("p50", sizes.quantile(histogram, 0.5)), ("p99", sizes.quantile(histogram, 0.99)),
+                                 ("p99.9", sizes.quantile(histogram, 0.999))))
+        at_or_above = np.cumsum(sizes.category_counts(histogram)[::-1])[::-1]
+        shares = "  ".join(f"{category.name}+ {_percent(at_or_above[i], total)}"
+                           for i, category in enumerate(CATEGORY_ORDER) if i)
+        count = f"{total:,}".replace(",", ".")
+        lines.append(f"{name:<8} {count:>9} trades  {quantiles} | {shares}")
+        if symbol:
+            # No blank lines: the control socket ends a reply with one
+            for category_symbol, edge, count in _bands(sizes, histogram, sizes.bins):
+                lines.append(f"  {category_symbol} {format_compact(edge):>7}+ {count:>9} {_percent(count, total):>6}")
+    return "\n".join(lines)
+
+def render_leaders(board: Leaderboard, height: int, width: int) -> List[str]:
+    """Side panel lines for the leaderboard: top symbols by volume, then by net flow"""
+    board.advance()
+    window = f"{board.window / 60:g}m"
+    k = max(1, min(LEADERBOARD_TOP, (height - 3) // 2))
+    lines = [f"{Style.BRIGHT}{f' Top {board.volume_label} {window}'[:width].ljust(width)}{Style.RESET_ALL}"]
+    volume = board.top_volume(k)
+    for rank, (symbol, value) in enumerate(volume, 1):
+        lines.append(f" {rank}. {symbol:<10} {format_compact(value):>9}"[:width].ljust(width))
+    lines += [" " * width] * (k - len(volume))
+    lines.append(" " * width)
+    lines.append(f"{Style.BRIGHT}{f' Top net flow {window}'[:width].ljust(width)}{Style.RESET_ALL}")
+    for rank, (symbol, net) in enumerate(board.top_imbalance(k), 1):
+        color = Fore.GREEN if net >= 0 else Fore.RED
+        label = f" {rank}. {symbol:<10} "
+        amount = f"{'+' if net >= 0 else '-'}{format_compact(abs(net))}"
+        text = f"{label}{amount:>9}"[:width].ljust(width)
+        # Colour codes go in after cutting to width, around the amount only
+        cut = min(len(label), width)
+        lines.append(f"{text[:cut]}{color}{text[cut:]}{Style.RESET_ALL}")
+    return lines + [" " * width] * max(0, height - len(lines))
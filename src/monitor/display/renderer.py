@@ -0,0 +1,216 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .formatters import format_price
+from .layout import Layout
+from .rows import column_separator
+from .terminal import stream, cursor_to, CLEAR_LINE, clear_screen, hide_cursor, show_cursor
+from ..trace import tracer
+
+logger = logging.getLogger(__name__)
+
+TITLE = "Coins Monitor"
+ATTRIBUTION = "Made with ❤️  by eapcj.ro"
+# Legend in Romanian
+LEGEND_ROW1 = "Simboluri: ★★10M+ USD(x5) | ◈◈1M+ USD(x4) | ◆◆500K+ USD(x3) | ▲▲250K+ USD(x2) | ■■100K+ USD(x2) | ►►50K+ USD | ▪▪10K+ USD | ··<10K USD"
+LEGEND_ROW2 = "Sunete: Frecvență mai înaltă & durată mai lungă = tranzacție/lichidare mai mare"
+
+# First screen line used by trade rows (1-based)
+FIRST_ROW_LINE = 5
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Immutable copy of everything on screen, published by the event loop"""
+    layout: Layout
+    rows: Tuple[str, ...]  # Styled lines of the visible rows, top first
+    visible_rows: int  # Trades on screen (a trade may span several lines)
+    total_rows: int  # Trades held in history
+    newer_rows: int  # Trades newer than the view when scrolled back
+    paused: bool  # Table frozen by the user
+    prices: Tuple[Tuple[str, float, Optional[float], str], ...]  # Symbol, price, 24h change % if known, sparkline
+    settings: str
+    status: str = ""
+    status_details: Optional[str] = None
+    error: Optional[str] = None
+    panel: Tuple[str, ...] = ()  # Side panel lines, drawn right of the trade rows
+
+def _centered(text: str, width: int) -> int:
+    """Column offset (0-based) that centers text"""
+    return max(0, (width - len(text)) // 2)
+
+def _format_ticker(symbol: str, price: float, change: Optional[float], sparkline: str = "") -> str:
+    """One entry of the price line, e.g. "BTC: €60.000,0 +1,2% ▂▃▅▇" """
+    text = f"{symbol}: {format_price(price, symbol)}"
+    if change is not None:
+        text += f" {change:+.1f}%".replace(".", ",")
+    if sparkline:
+        text += f" {sparkline}"
+    return text
+
+def compose_frame(snapshot: Snapshot, styles: Dict[str, str]) -> List[str]:
+    """Build the full screen from a snapshot, one styled string per line"""
+    layout = snapshot.layout
+    width = layout.width
+    normal = styles['normal']
+    border = f"{styles['border']}{'─' * (width - 2)}{normal}"
+    lines = [""] * layout.height
+
+    # Title bar with the title centered over the box border
+    bar = f"╔{'═' * (width - 2)}╗"
+    title_pos = _centered(TITLE, width)
+    bar = bar[:title_pos] + TITLE + bar[title_pos + len(TITLE):]
+    lines[0] = f"{styles['header']}{bar}{normal}"
+
+    # Last prices line
+    if snapshot.prices:
+        prices_text = " | ".join(_format_ticker(*entry) for entry in snapshot.prices)
+    else:
+        prices_text = "Waiting for price data..."
+    # Cut to the screen width: with many pairs the line would wrap into the table
+    lines[1] = f"{styles['dim']}{prices_text[:width]}{normal}"
+
+    # Column headers, matching the spacing of trade rows
+    header_row = ""
+    remaining_width = width - 2
+    for col, config in layout.table:
+        name = config.name
+        cell = name.rjust(config.width) if config.align == "right" else name.ljust(config.width)
+        separator = column_separator(col)
+        if len(header_row) + len(cell) + len(separator) <= remaining_width:
+            header_row += cell + separator
+    lines[2] = f"{styles['header']}{header_row}{normal}"
+    lines[3] = border
+
+    # Trade rows
+    first = FIRST_ROW_LINE - 1
+    for i, row in enumerate(snapshot.rows[:layout.max_visible_rows]):
+        lines[first + i] = row
+
+    # Side panel, starting where the trade rows end
+    if layout.panel_width:
+        blank = " " * layout.table_width
+        for i in range(layout.max_visible_rows):
+            row = lines[first + i] or blank
+            panel = snapshot.panel[i] if i < len(snapshot.panel) else ""
+            lines[first + i] = f"{row}{normal}{styles['border']}│{normal}{panel}"
+
+    # Footer: separator, legend, counts and settings, status, error, attribution
+    bottom = layout.height - 1
+    lines[bottom - 6] = border
+    lines[bottom - 5] = f"{' ' * _centered(LEGEND_ROW1, width)}{styles['dim']}{LEGEND_ROW1}{normal}"
+    lines[bottom - 4] = f"{' ' * _centered(LEGEND_ROW2, width)}{styles['dim']}{LEGEND_ROW2}{normal}"
+
+    count = f"Showing {snapshot.visible_rows} of {snapshot.total_rows} trades"
+    if snapshot.paused:
+        count += f" (PAUSED, {snapshot.newer_rows} newer)"
+    elif snapshot.newer_rows:
+        count += f" ({snapshot.newer_rows} newer, End to follow)"
+    gap = max(1, _centered(snapshot.settings, width) - len(count))
+    lines[bottom - 3] = (f"{styles['dim']}{count}{normal}{' ' * gap}"
+                         f"{styles['header']}{snapshot.settings}{normal}")
+
+    if snapshot.status:
+        if snapshot.status_details:
+            lines[bottom - 2] = (f"{styles['header']}{snapshot.status}{normal}: "
+                                 f"{styles['dim']}{snapshot.status_details}{normal}")
+        else:
+            lines[bottom - 2] = f"{styles['header']}{snapshot.status}{normal}"
+    if snapshot.error:
+        lines[bottom - 1] = f"{styles['sell']}Error: {snapshot.error}{normal}"
+
+    attribution = f"─{ATTRIBUTION}─"
+    attr_pos = _centered(attribution, width - 2)
+    rule = '─' * (width - 2)
+    lines[bottom] = f"{styles['border']}{rule[:attr_pos]}{styles['dim']}{ATTRIBUTION}{styles['border']}{rule[attr_pos + len(ATTRIBUTION):]}{normal}"
+    return lines
+
+class RenderThread(threading.Thread):
+    """Paints published snapshots to the terminal off the event loop.
+
+    Snapshots are double-buffered: publish() only swaps in the newest
+    pending snapshot and never touches stdout, so a slow terminal drops
+    intermediate frames instead of stalling the websocket. Each frame is
+    diffed against the previous one and only changed lines are written.
+    """
+
+    def __init__(self, styles: Dict[str, str]):
+        super().__init__(name="render", daemon=True)
+        self.styles = styles
+        self._cond = threading.Condition()
+        self._pending: Optional[Snapshot] = None
+        self._published = 0  # Number of snapshots published
+        self._painted = 0  # Number of published snapshots already painted
+        self._running = True
+        self._front: List[str] = []  # Lines currently on screen
+        self._front_layout: Optional[Layout] = None
+
+    def publish(self, snapshot: Snapshot):
+        """Hand a new snapshot to the render thread (never blocks on I/O)"""
+        with self._cond:
+            self._pending = snapshot
+            self._published += 1
+            self._cond.notify()
+
+    def redraw(self):
+        """Force a full repaint on the next frame"""
+        with self._cond:
+            self._front_layout = None
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until everything published so far has been painted"""
+        with self._cond:
+            target = self._published
+            return self._cond.wait_for(lambda: self._painted >= target or not self._running, timeout)
+
+    def stop(self, timeout: float = 1.0):
+        """Paint the last snapshot and stop the thread"""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.join(timeout)
+        try:
+            show_cursor()
+        except Exception:
+            pass
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+                if not self._running:
+                    return
+                snapshot, self._pending = self._pending, None
+                published = self._published
+                full_redraw = self._front_layout is not snapshot.layout
+                self._front_layout = snapshot.layout
+            try:
+                with tracer.span("display.paint", "display"):
+                    self._paint(snapshot, full_redraw)
+            except Exception as e:
+                logger.error(f"Error painting frame: {e}")
+            with self._cond:
+                self._painted = published
+                self._cond.notify_all()
+
+    def _paint(self, snapshot: Snapshot, full_redraw: bool):
+        """Write the lines that differ from what is on screen"""
+        back = compose_frame(snapshot, self.styles)
+        if full_redraw:
+            clear_screen()
+            hide_cursor()
+            self._front = [""] * len(back)
+
+        out = []
+        front = self._front
+        for i, line in enumerate(back):
+            if line != front[i]:
+                out.append(cursor_to(i + 1, 1))
+                out.append(CLEAR_LINE)
+                out.append(line)
+        if out:
+            stream.write("".join(out))
+            stream.flush()
+        self._front = back
@@ -0,0 +1,96 @@
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+from colorama import Fore, Back, Style
+
+from ..models import BaseTrade, Column, ColumnConfig, TradeSummary
+from .formatters import format_value, format_price, format_quantity
+
+# Formatting functions referenced by ColumnConfig.format_func, called as f(value, symbol)
+FORMATTERS: Dict[str, Callable[[Any, Optional[str]], str]] = {
+    "format_value": format_value,
+    "format_price": format_price,
+    "format_quantity": format_quantity,
+}
+
+# Compiled column layout: (column, formatter, width, right aligned, trailing separator)
+CompiledColumn = Tuple[Column, Optional[Callable[[Any, Optional[str]], str]], int, bool, str]
+
+def column_separator(col: Column) -> str:
+    """Spacing written after a column, shared by the header and trade rows"""
+    if col in (Column.VALUE, Column.INFO, Column.CATEGORY):
+        return "  "  # Two spaces
+    if col == Column.TYPE:
+        return "   "  # Three spaces after TYPE
+    if col == Column.SIZE:
+        return ""  # No extra space after SIZE
+    return " "  # One space for other columns
+
+def compile_columns(table: Mapping[Column, ColumnConfig]) -> Tuple[CompiledColumn, ...]:
+    """Resolve column configs into the tuple used for row rendering"""
+    columns = []
+    for col in Column:
+        config = table[col]
+        formatter = FORMATTERS.get(config.format_func) if config.format_func else None
+        columns.append((col, formatter, config.width, config.align == "right", column_separator(col)))
+    return tuple(columns)
+
+def row_styles(trade: BaseTrade) -> Tuple[bool, str, str]:
+    """Return whether a trade blinks and its styles for both blink phases"""
+    is_buy = trade.side == "BUY"
+    min_size = trade.category.min_size
+
+    # Base colors
+    base_fg = Fore.GREEN if is_buy else Fore.RED
+    base_bg = Back.BLACK
+    normal = f"{base_fg}{base_bg}"
+    bright = f"{base_fg}{base_bg}{Style.BRIGHT}"
+
+    if isinstance(trade, TradeSummary):
+        # Aggregated small-trade flow stays in the background
+        dim = f"{base_fg}{base_bg}{Style.DIM}"
+        return False, dim, dim
+
+    if min_size >= 1_000_000:  # Aquaman/Whale
+        # Blink between inverted and normal
+        inverted = f"{Back.GREEN if is_buy else Back.RED}{Fore.BLACK}{Style.BRIGHT}"
+        return True, inverted, bright
+    if min_size >= 250_000:  # Shark/Orca
+        # Blink between bright and normal
+        return True, bright, normal
+    # Smaller trades - no blinking
+    return False, normal, normal
+
+class RenderedRow:
+    """A trade row rendered once, with styled text cached for both blink phases.
+
+    Rows are re-rendered only when column widths change, so a repaint is
+    just concatenation of the cached strings.
+    """
+    __slots__ = ("trade", "text", "blinks", "variants", "blink_origin", "repeat")
+
+    def __init__(self, trade: BaseTrade, columns: Sequence[CompiledColumn], blink_origin: int = 0):
+        self.trade = trade
+        self.blink_origin = blink_origin  # Animation tick the row appeared on
+        self.render(columns)
+
+    def render(self, columns: Sequence[CompiledColumn]):
+        """(Re)build the row text and its styled variants"""
+        trade_data = self.trade.to_row()
+        symbol = self.trade.symbol
+        parts = []
+        for col, formatter, width, right, separator in columns:
+            value = trade_data[col]
+            cell = formatter(value, symbol) if formatter else str(value)
+            parts.append(cell.rjust(width) if right else cell.ljust(width))
+            parts.append(separator)
+        self.text = "".join(parts)
+
+        self.repeat = self.trade.category.repeat_times  # Lines the row occupies on screen
+        self.blinks, style_on, style_off = row_styles(self.trade)
+        self.variants = (
+            f"{style_on}{self.text}{Style.RESET_ALL}",
+            f"{style_off}{self.text}{Style.RESET_ALL}",
+        )
+
+    def line(self, blink_tick: int) -> str:
+        """Styled row text for the given animation tick; new rows start highlighted"""
+        return self.variants[(blink_tick - self.blink_origin) & 1]
@@ -16,6 +16,13 @@ def clear_line(row: int):
     stream.write("\033[2K")  # Clear entire line
     stream.flush()
 
+# Escape sequence clearing the line under the cursor
+CLEAR_LINE = "\033[2K"
+
+def cursor_to(row: int, col: int) -> str:
+    """Escape sequence moving the cursor, for building buffered frames"""
+    return f"\033[{row};{col}H"
+
 def move_cursor(row: int, col: int):
     """Move cursor to specific position"""
     stream.write(f"\033[{row};{col}H")
@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .models import BaseTrade, Trade, Liquidation, TradeSummary
+
+logger = logging.getLogger(__name__)
+
+# Record kinds stored in the kind column
+KIND_TRADE = 0
+KIND_LIQUIDATION = 1
+KIND_SUMMARY = 2
+
+# One record across all columns
+RECORD_DTYPE = np.dtype([
+    ("ts", "f8"),        # Unix timestamp in seconds
+    ("price", "f8"),
+    ("qty", "f8"),
+    ("trade_id", "i8"),  # Trade count for summaries
+    ("symbol", "u2"),    # Index into HistoryStore.symbols
+    ("side", "u1"),      # 1 = BUY, 0 = SELL
+    ("kind", "u1"),
+    ("category", "u1"),  # Index into CATEGORY_ORDER
+])
+
+class HistoryStore:
+    """Scrollback of recent trades held as preallocated columnar arrays.
+
+    Capacity is derived from a memory budget; once full, the oldest
+    records are overwritten. Records are addressed by a monotonically
+    increasing sequence number, so views can keep a stable position
+    while new trades arrive.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.capacity = max(1, int(budget_bytes) // self.record_bytes())
+        self.ts = np.zeros(self.capacity, dtype=RECORD_DTYPE["ts"])
+        self.price = np.zeros(self.capacity, dtype=RECORD_DTYPE["price"])
+        self.qty = np.zeros(self.capacity, dtype=RECORD_DTYPE["qty"])
+        self.trade_id = np.zeros(self.capacity, dtype=RECORD_DTYPE["trade_id"])
+        self.symbol = np.zeros(self.capacity, dtype=RECORD_DTYPE["symbol"])
+        self.side = np.zeros(self.capacity, dtype=RECORD_DTYPE["side"])
+        self.kind = np.zeros(self.capacity, dtype=RECORD_DTYPE["kind"])
+        self.category = np.zeros(self.capacity, dtype=RECORD_DTYPE["category"])
+        self.symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self.next_seq = 0  # Sequence number of the next record
+
+    @staticmethod
+    def record_bytes() -> int:
+        """Bytes used by one record across all columns"""
+        return RECORD_DTYPE.itemsize
+
+    def __len__(self) -> int:
+        return min(self.next_seq, self.capacity)
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest record still held"""
+        return max(0, self.next_seq - self.capacity)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest record (-1 when empty)"""
+        return self.next_seq - 1
+
+    def _symbol_id(self, symbol: str) -> int:
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.symbols.append(symbol)
+            self._symbol_ids[symbol] = symbol_id
+        return symbol_id
+
+    def append(self, trade: BaseTrade) -> int:
+        """Store a trade and return its sequence number"""
+        seq = self.next_seq
+        i = seq % self.capacity
+        self.ts[i] = trade.timestamp.timestamp()
+        self.price[i] = trade.price
+        self.qty[i] = trade.quantity
+        self.symbol[i] = self._symbol_id(trade.symbol)
+        self.side[i] = trade.side == "BUY"
+        if isinstance(trade, Liquidation):
+            self.kind[i] = KIND_LIQUIDATION
+            self.trade_id[i] = 0
+            self.category[i] = trade.category_rank
+        elif isinstance(trade, TradeSummary):
+            self.kind[i] = KIND_SUMMARY
+            self.trade_id[i] = trade.trade_count
+            self.category[i] = 0  # Never matched by category searches
+        else:
+            self.kind[i] = KIND_TRADE
+            self.trade_id[i] = int(getattr(trade, "trade_id", 0) or 0)
+            self.category[i] = trade.category_rank
+        self.next_seq = seq + 1
+        return seq
+
+    def get(self, seq: int) -> BaseTrade:
+        """Rebuild the trade stored under a sequence number"""
+        if not self.first_seq <= seq < self.next_seq:
+            raise IndexError(f"Sequence {seq} is no longer in history")
+        i = seq % self.capacity
+        fields = dict(
+            symbol=self.symbols[self.symbol[i]],
+            price=float(self.price[i]),
+            quantity=float(self.qty[i]),
+            timestamp=datetime.fromtimestamp(float(self.ts[i])),
+            side="BUY" if self.side[i] else "SELL",
+        )
+        if self.kind[i] == KIND_SUMMARY:
+            return TradeSummary(trade_count=int(self.trade_id[i]), **fields)
+        if self.kind[i] == KIND_LIQUIDATION:
+            trade = Liquidation(**fields)
+        else:
+            trade = Trade(trade_id=str(int(self.trade_id[i])), **fields)
+        trade._category_rank = int(self.category[i])  # As shown live, which with --adaptive isn't the USD tier
+        return trade
+
+    def find_last(self, min_category: int, before: Optional[int] = None) -> Optional[int]:
+        """Sequence number of the newest record at or above a category index"""
+        end = self.next_seq if before is None else min(before, self.next_seq)
+        start = self.first_seq
+        if end <= start:
+            return None
+        # Scan the ring in at most two contiguous slices, newest first
+        end_i = (end - 1) % self.capacity + 1
+        start_i = start % self.capacity
+        if start_i < end_i:
+            slices = [(start_i, end_i)]
+        else:
+            slices = [(0, end_i), (start_i, self.capacity)]
+        for lo, hi in slices:
+            hits = np.flatnonzero(self.category[lo:hi] >= min_category)
+            if hits.size:
+                i = lo + int(hits[-1])
+                # Map the ring index back to a sequence number
+                return end - 1 - ((end_i - 1 - i) % self.capacity)
+        return None
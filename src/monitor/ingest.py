@@ -0,0 +1,245 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+import websockets
+
+from .batch import FRAME_QUEUE_SIZE, read_frames, next_batch
+from .config import INGEST_RING_RECORDS, INGEST_READ_MAX
+
+logger = logging.getLogger(__name__)
+
+# One decoded trade or liquidation as workers hand it to the main process
+RECORD_DTYPE = np.dtype([
+    ("time", "i8"),        # Exchange time in milliseconds
+    ("trade_id", "i8"),    # 0 for liquidations
+    ("price", "f8"),
+    ("qty", "f8"),
+    ("avg_price", "f8"),   # Liquidations only: average fill price (ap)
+    ("filled", "f8"),      # Liquidations only: filled quantity (z)
+    ("symbol", "S20"),     # Exchange symbol, e.g. b"BTCUSDT"
+    ("buy", "?"),          # As MarketFeed reports the side
+])
+
+class RecordRing:
+    """Single-producer, single-consumer ring of RECORD_DTYPE records in shared memory.
+
+    The header holds the write count (head), owned by the producer, and
+    the read count (tail), owned by the consumer, on separate cache
+    lines; neither side ever writes the other's counter, so no lock is
+    needed. A push that does not fit is truncated and the rest counted
+    as dropped: the producer never waits for the display.
+    """
+
+    HEADER_BYTES = 128
+    HEAD, DROPPED, TAIL = 0, 1, 8  # uint64 slots of the header
+
+    def __init__(self, capacity: int = INGEST_RING_RECORDS, name: Optional[str] = None):
+        size = self.HEADER_BYTES + capacity * RECORD_DTYPE.itemsize
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.name = self.shm.name
+        self._header = np.ndarray(self.HEADER_BYTES // 8, dtype=np.uint64, buffer=self.shm.buf)
+        self._records = np.ndarray(capacity, dtype=RECORD_DTYPE, buffer=self.shm.buf, offset=self.HEADER_BYTES)
+        if name is None:
+            self._header[:] = 0
+
+    @property
+    def dropped(self) -> int:
+        return int(self._header[self.DROPPED])
+
+    def push(self, records: np.ndarray) -> bool:
+        """Append records (producer side); returns True if the consumer had read everything before them"""
+        head = int(self._header[self.HEAD])
+        tail = int(self._header[self.TAIL])
+        count = min(len(records), self.capacity - (head - tail))
+        if count < len(records):
+            self._header[self.DROPPED] += len(records) - count
+        start = head % self.capacity
+        first = min(count, self.capacity - start)
+        self._records[start:start + first] = records[:first]
+        self._records[:count - first] = records[first:count]
+        self._header[self.HEAD] = head + count
+        # Read after publishing: a consumer that was caught up may be about to sleep
+        return int(self._header[self.TAIL]) == head
+
+    def pop(self, limit: int = INGEST_READ_MAX) -> np.ndarray:
+        """Take up to limit records (consumer side), oldest first"""
+        tail = int(self._header[self.TAIL])
+        count = min(int(self._header[self.HEAD]) - tail, limit)
+        if count <= 0:
+            return self._records[:0].copy()
+        start = tail % self.capacity
+        first = min(count, self.capacity - start)
+        records = np.concatenate((self._records[start:start + first], self._records[:count - first]))
+        self._header[self.TAIL] = tail + count
+        return records
+
+    def close(self, unlink: bool = False):
+        # The views must go before the mapping can be closed
+        del self._header, self._records
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def decode(frames: List[str], mode: str, pipe) -> np.ndarray:
+    """Trade or liquidation records of a batch of frames; request replies are reported"""
+    rows = []
+    for frame in frames:
+        try:
+            data = json.loads(frame)
+            if mode == "trades":
+                if data.get('e') == 'trade':
+                    rows.append((data['T'], data['t'], float(data['p']), float(data['q']), 0.0, 0.0,
+                                 data['s'], not data['m']))  # Maker side is reversed
+                    continue
+            elif data.get('e') == 'forceOrder':
+                order = data['o']
+                rows.append((order['T'], 0, float(order['p']), float(order['q']), float(order.get('ap', 0)),
+                             float(order.get('z', 0)), order['s'], order['S'] == "SELL"))  # Sides reversed
+                continue
+            if data.get('error'):
+                pipe.send(("error", f"Request {data.get('id')} failed: {data['error']}"))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            pipe.send(("error", f"Invalid message received: {e}"))
+    return np.array(rows, dtype=RECORD_DTYPE)
+
+async def _watch_parent():
+    """Exit when the main process is gone, even if it could not stop the workers"""
+    parent = multiprocessing.parent_process()
+    while parent is None or parent.is_alive():
+        await asyncio.sleep(1.0)
+    os._exit(0)
+
+async def _ingest(shard: int, streams: List[str], endpoint: str, mode: str, ring: RecordRing, pipe):
+    watchdog = asyncio.ensure_future(_watch_parent())
+    retry_delay = 1
+    while not watchdog.done():
+        try:
+            async with websockets.connect(endpoint) as ws:
+                await ws.send(json.dumps({"method": "SUBSCRIBE", "params": streams, "id": 1}))
+                pipe.send(("status", f"Worker {shard} subscribed to {', '.join(streams)}"))
+                retry_delay = 1
+                frames = asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)
+                reader = asyncio.ensure_future(read_frames(ws, frames))
+                try:
+                    while True:
+                        batch = await next_batch(frames)
+                        error = batch.pop() if isinstance(batch[-1], Exception) else None
+                        records = decode(batch, mode, pipe)
+                        if len(records) and ring.push(records):
+                            pipe.send(None)  # Wake the main process
+                        if error is not None:
+                            raise error
+                finally:
+                    reader.cancel()
+        except Exception as e:
+            pipe.send(("error", f"Worker {shard} connection error: {e}"))
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 30)
+
+def run_worker(shard: int, streams: List[str], endpoint: str, mode: str, ring_name: str, capacity: int, pipe):
+    """Worker process: receive and decode one shard of the streams into its ring"""
+    ring = RecordRing(capacity, ring_name)
+    try:
+        asyncio.run(_ingest(shard, streams, endpoint, mode, ring, pipe))
+    except KeyboardInterrupt:
+        pass
+    os._exit(0)  # The parent owns the ring; skip interpreter teardown
+
+class IngestPool:
+    """Worker processes that each receive and decode one shard of the streams.
+
+    Streams are dealt round-robin to the workers; each owns its websocket
+    connection and a RecordRing, and sends None on its pipe when it
+    writes to a ring the main process had drained, so the event loop
+    sleeps on the pipes instead of polling. Status and error messages
+    come back on the same pipe. Processes are spawned, not forked, so
+    they start without the display and sound threads.
+    """
+
+    def __init__(self, streams: List[str], workers: int, endpoint: str, mode: str,
+                 capacity: int = INGEST_RING_RECORDS):
+        workers = max(1, min(workers, len(streams)))
+        self.shards = [streams[i::workers] for i in range(workers)]
+        self.endpoint = endpoint
+        self.mode = mode
+        self.capacity = capacity
+        self.rings: List[RecordRing] = []
+        self.processes: List[multiprocessing.Process] = []
+        self._pipes = []
+        self._messages: List[Tuple[str, str]] = []
+        self._ready: Optional[asyncio.Event] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        context = multiprocessing.get_context("spawn")
+        self._ready = asyncio.Event()
+        for shard, streams in enumerate(self.shards, 1):
+            ring = RecordRing(self.capacity)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=run_worker, name=f"ingest-{shard}", daemon=True,
+                                      args=(shard, streams, self.endpoint, self.mode, ring.name, self.capacity,
+                                            sender))
+            process.start()
+            sender.close()
+            loop.add_reader(receiver.fileno(), self._on_wakeup, receiver)
+            self.rings.append(ring)
+            self.processes.append(process)
+            self._pipes.append(receiver)
+
+    def _on_wakeup(self, receiver):
+        try:
+            while receiver.poll():
+                message = receiver.recv()
+                if message is not None:
+                    self._messages.append(message)
+        except (EOFError, OSError):
+            asyncio.get_event_loop().remove_reader(receiver.fileno())  # The worker has exited
+        self._ready.set()
+
+    async def wait(self, timeout: float):
+        """Sleep until a worker writes to a drained ring, or at most timeout seconds"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass  # Check the rings anyway, in case a wakeup crossed the consumer going to sleep
+        self._ready.clear()
+
+    def read(self) -> np.ndarray:
+        """Records waiting in every ring, in exchange time order"""
+        parts = [ring.pop() for ring in self.rings]
+        records = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        if len(parts) > 1 and len(records) > 1:
+            records = records[np.argsort(records["time"], kind="stable")]
+        return records
+
+    def messages(self) -> List[Tuple[str, str]]:
+        """Status and error messages the workers sent since the last call"""
+        messages, self._messages = self._messages, []
+        return messages
+
+    @property
+    def dropped(self) -> int:
+        return sum(ring.dropped for ring in self.rings)
+
+    def describe(self) -> str:
+        """Streams of each worker, for the pairs command"""
+        return "; ".join(f"worker {shard}: {' '.join(streams)}" for shard, streams in enumerate(self.shards, 1))
+
+    def stop(self):
+        """Stop the workers and free the rings"""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(1.0)
+        for ring in self.rings:
+            try:
+                ring.close(unlink=True)
+            except (OSError, BufferError) as e:
+                logger.error(f"Error releasing ring {ring.name}: {e}")
+        self.processes, self.rings = [], []
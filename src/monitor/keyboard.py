@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import sys
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Escape sequences sent by common terminals for navigation keys
+ESCAPE_SEQUENCES = {
+    "\x1b[5~": "PAGE_UP",
+    "\x1b[6~": "PAGE_DOWN",
+    "\x1b[H": "HOME",
+    "\x1b[1~": "HOME",
+    "\x1bOH": "HOME",
+    "\x1b[F": "END",
+    "\x1b[4~": "END",
+    "\x1bOF": "END",
+    "\x1b[A": "UP",
+    "\x1b[B": "DOWN",
+    "\x1b[C": "RIGHT",
+    "\x1b[D": "LEFT",
+}
+
+def parse_keys(data: str) -> List[str]:
+    """Split raw terminal input into key names and single characters"""
+    keys = []
+    i = 0
+    while i < len(data):
+        if data[i] == "\x1b":
+            for sequence, name in ESCAPE_SEQUENCES.items():
+                if data.startswith(sequence, i):
+                    keys.append(name)
+                    i += len(sequence)
+                    break
+            else:
+                keys.append("ESC")
+                i += 1
+        else:
+            keys.append(data[i])
+            i += 1
+    return keys
+
+class KeyboardReader:
+    """Reads keypresses from stdin on the event loop without blocking it.
+
+    The terminal is switched to cbreak mode (no line buffering or echo,
+    signals such as Ctrl+C still work) and stdin is watched with
+    loop.add_reader, so a key is handled as soon as it arrives and the
+    feed is never waiting on input.
+    """
+
+    def __init__(self):
+        self.bindings: Dict[str, Callable[[], None]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fd: Optional[int] = None
+        self._saved_attrs = None
+
+    def bind(self, key: str, handler: Callable[[], None]):
+        """Call handler when key (a character or an ESCAPE_SEQUENCES name) is pressed"""
+        self.bindings[key] = handler
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Start reading keys; returns False if stdin is not an interactive terminal"""
+        try:
+            import termios
+            import tty
+        except ImportError:
+            logger.info("Keyboard controls are not supported on this platform")
+            return False
+        if not sys.stdin.isatty():
+            return False
+        try:
+            self._fd = sys.stdin.fileno()
+            self._saved_attrs = termios.tcgetattr(self._fd)
+            tty.setcbreak(self._fd)
+            loop.add_reader(self._fd, self._on_input)
+            self._loop = loop
+            return True
+        except (OSError, NotImplementedError, termios.error) as e:
+            logger.warning(f"Keyboard controls unavailable: {e}")
+            self.stop()
+            return False
+
+    def stop(self):
+        """Stop reading and restore the terminal mode"""
+        if self._loop is not None and self._fd is not None:
+            try:
+                self._loop.remove_reader(self._fd)
+            except Exception:
+                pass
+            self._loop = None
+        if self._saved_attrs is not None and self._fd is not None:
+            import termios
+            try:
+                termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved_attrs)
+            except termios.error as e:
+                logger.error(f"Error restoring terminal mode: {e}")
+            self._saved_attrs = None
+
+    def _on_input(self):
+        try:
+            data = os.read(self._fd, 1024).decode(errors="ignore")
+        except OSError as e:
+            logger.error(f"Error reading keyboard input: {e}")
+            return
+        for key in parse_keys(data):
+            handler = self.bindings.get(key)
+            if handler is None:
+                continue
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"Error handling key {key!r}: {e}")
+
+# Global keyboard reader instance
+keyboard = KeyboardReader()
@@ -0,0 +1,180 @@
+import heapq
+import time
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import LEADERBOARD_WINDOW, LEADERBOARD_SLOTS
+
+class IndexedHeap:
+    """Max-heap of keys ordered by value, with the position of every key indexed.
+
+    The index makes changing or removing any key O(log n), and the
+    largest k are read in O(k log k) by walking the heap best-first,
+    without popping anything.
+    """
+
+    def __init__(self):
+        self._keys: List[Hashable] = []
+        self._values: List[float] = []
+        self._pos: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _swap(self, i: int, j: int):
+        keys, values = self._keys, self._values
+        keys[i], keys[j] = keys[j], keys[i]
+        values[i], values[j] = values[j], values[i]
+        self._pos[keys[i]] = i
+        self._pos[keys[j]] = j
+
+    def _sift_up(self, i: int):
+        values = self._values
+        while i:
+            parent = (i - 1) // 2
+            if values[parent] >= values[i]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int):
+        values = self._values
+        n = len(values)
+        while True:
+            largest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and values[child] > values[largest]:
+                    largest = child
+            if largest == i:
+                return
+            self._swap(i, largest)
+            i = largest
+
+    def update(self, key: Hashable, value: float):
+        """Insert a key or change its value"""
+        i = self._pos.get(key)
+        if i is None:
+            self._keys.append(key)
+            self._values.append(value)
+            self._pos[key] = len(self._keys) - 1
+            self._sift_up(len(self._keys) - 1)
+            return
+        old = self._values[i]
+        self._values[i] = value
+        if value > old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, key: Hashable):
+        """Drop a key if present"""
+        i = self._pos.pop(key, None)
+        if i is None:
+            return
+        last = len(self._keys) - 1
+        if i != last:
+            self._keys[i] = self._keys[last]
+            self._values[i] = self._values[last]
+            self._pos[self._keys[i]] = i
+        self._keys.pop()
+        self._values.pop()
+        if i < len(self._keys):
+            self._sift_up(i)
+            self._sift_down(i)
+
+    def top(self, k: int) -> List[Tuple[Hashable, float]]:
+        """The k largest (key, value) pairs, largest first"""
+        result = []
+        candidates = [(-self._values[0], 0)] if self._keys else []
+        while candidates and len(result) < k:
+            _, i = heapq.heappop(candidates)
+            result.append((self._keys[i], self._values[i]))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._keys):
+                    heapq.heappush(candidates, (-self._values[child], child))
+        return result
+
+class Leaderboard:
+    """Rolling USD volume and net buy/sell flow per symbol, ranked.
+
+    Each sub-window keeps a dict of per-symbol sums and trade counts;
+    when it expires they are subtracted from the totals, and a symbol
+    whose count reaches zero leaves the board. Every total that changes is
+    pushed to two indexed heaps (by volume and by absolute net flow), so
+    a batch costs O(symbols in it x log symbols) however many pairs are
+    tracked.
+    """
+
+    def __init__(self, volume_label: str = "notional", window: float = LEADERBOARD_WINDOW,
+                 slots: int = LEADERBOARD_SLOTS):
+        self.volume_label = volume_label  # What the volume ranking measures, for the panel title
+        self.window = window
+        self.slot_seconds = window / slots
+        self._slots: List[Dict[str, List[float]]] = [{} for _ in range(slots)]  # Symbol -> [volume, net, trades]
+        self.slot = 0
+        self.slot_start: Optional[float] = None
+        self.totals: Dict[str, List[float]] = {}  # Symbol -> [volume, net flow, trades]
+        self.by_volume = IndexedHeap()
+        self.by_imbalance = IndexedHeap()
+
+    def _add(self, symbol: str, volume: float, net: float, trades: int):
+        total = self.totals.get(symbol)
+        if total is None:
+            total = self.totals[symbol] = [0.0, 0.0, 0]
+        total[0] += volume
+        total[1] += net
+        total[2] += trades
+        if total[2] <= 0:
+            # No trades left in the window; the sums may only hold rounding residue
+            del self.totals[symbol]
+            self.by_volume.remove(symbol)
+            self.by_imbalance.remove(symbol)
+        else:
+            self.by_volume.update(symbol, total[0])
+            self.by_imbalance.update(symbol, abs(total[1]))
+
+    def advance(self, now: Optional[float] = None):
+        """Expire sub-windows that have ended"""
+        now = time.time() if now is None else now
+        if self.slot_start is None:
+            self.slot_start = now
+            return
+        elapsed = int((now - self.slot_start) // self.slot_seconds)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, len(self._slots))):
+            self.slot = (self.slot + 1) % len(self._slots)
+            expired = self._slots[self.slot]
+            for symbol, (volume, net, trades) in expired.items():
+                self._add(symbol, -volume, -net, -trades)
+            expired.clear()
+        self.slot_start += elapsed * self.slot_seconds
+
+    def add_batch(self, names: Sequence[str], index: np.ndarray, values: np.ndarray, buys: np.ndarray,
+                  now: Optional[float] = None):
+        """Count a batch of trades (names and index as from batch.group_symbols)"""
+        if not len(values):
+            return
+        self.advance(now)
+        volume = np.bincount(index, weights=values, minlength=len(names))
+        net = np.bincount(index, weights=np.where(buys, values, -values), minlength=len(names))
+        trades = np.bincount(index, minlength=len(names))
+        slot = self._slots[self.slot]
+        for name, symbol_volume, symbol_net, symbol_trades in zip(names, volume.tolist(), net.tolist(),
+                                                                  trades.tolist()):
+            sums = slot.get(name)
+            if sums is None:
+                sums = slot[name] = [0.0, 0.0, 0]
+            sums[0] += symbol_volume
+            sums[1] += symbol_net
+            sums[2] += symbol_trades
+            self._add(name, symbol_volume, symbol_net, symbol_trades)
+
+    def top_volume(self, k: int) -> List[Tuple[str, float]]:
+        """Symbols with the most volume in the window"""
+        return self.by_volume.top(k)
+
+    def top_imbalance(self, k: int) -> List[Tuple[str, float]]:
+        """Symbols with the largest net flow either way, with its sign (positive = buying)"""
+        return [(symbol, self.totals[symbol][1]) for symbol, _ in self.by_imbalance.top(k)]
@@ -0,0 +1,77 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class DebugSampler:
+    """Cheap gate for debug logging on per-message code paths.
+
+    Calling the sampler returns True only when debug logging is on and the
+    message falls on the sampling interval, so callers can skip building
+    log arguments entirely:
+
+        if debug_sampler():
+            logger.debug("Processed trade: %s", trade)
+    """
+
+    def __init__(self):
+        self.every = 0  # 0 disables hot-path debug logging
+        self._count = 0
+
+    def configure(self, enabled: bool, every: int = 1):
+        """Enable hot-path debug logging, keeping one message in every `every`"""
+        self.every = max(1, every) if enabled else 0
+        self._count = 0
+
+    def __call__(self) -> bool:
+        if not self.every:
+            return False
+        self._count += 1
+        if self._count >= self.every:
+            self._count = 0
+            return True
+        return False
+
+# Global sampler shared by the hot path
+debug_sampler = DebugSampler()
+
+_listener: Optional[QueueListener] = None
+
+def setup_logging(debug: bool = False, log_file: Optional[str] = None, debug_sample: int = 1):
+    """Configure logging for a monitor command.
+
+    Records are handed to a QueueHandler; a QueueListener thread does the
+    actual file I/O so the event loop never blocks on the log file.
+    """
+    global _listener
+    stop_logging()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(logging.DEBUG if debug else logging.WARNING)
+
+    if log_file:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        log_queue = queue.SimpleQueue()
+        root.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        root.addHandler(logging.NullHandler())
+
+    debug_sampler.configure(debug, debug_sample)
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
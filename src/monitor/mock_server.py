@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Optional, Set
+
+import websockets
+
+from .config import (
+    TRADE_STREAM, LIQUIDATION_STREAM, ALL_LIQUIDATIONS_STREAM, MINI_TICKER_STREAM, ALL_MINI_TICKER_STREAM
+)
+
+logger = logging.getLogger(__name__)
+
+# Symbols the mock exchange lists, with their starting prices
+MOCK_PRICES = {
+    "BTCUSDT": 60000.0,
+    "ETHUSDT": 3000.0,
+    "BNBUSDT": 550.0,
+    "SOLUSDT": 150.0,
+    "DOGEUSDT": 0.12,
+    "XRPUSDT": 0.5,
+    "AVAXUSDT": 30.0,
+    "ADAUSDT": 0.45,
+    "LINKUSDT": 15.0,
+    "DOTUSDT": 6.5,
+    "LTCUSDT": 80.0,
+    "TRXUSDT": 0.12,
+    "NEARUSDT": 5.0,
+    "APTUSDT": 9.0,
+    "ARBUSDT": 0.9,
+    "OPUSDT": 2.0,
+    "SUIUSDT": 1.5,
+    "PEPEUSDT": 0.00001,
+    "WIFUSDT": 2.5,
+    "INJUSDT": 25.0,
+}
+
+class MockMarket:
+    """Random-walk prices and Binance-shaped events for the mock server"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.prices: Dict[str, float] = dict(MOCK_PRICES)
+        self.quote_volume: Dict[str, float] = {symbol: 0.0 for symbol in MOCK_PRICES}
+        self.trade_id = 0
+
+    def _tick(self, symbol: str) -> float:
+        price = self.prices[symbol] * (1 + self.random.gauss(0, 0.0005))
+        self.prices[symbol] = price
+        return price
+
+    def _quantity(self, price: float) -> float:
+        # USD values spread log-uniformly from $10 to ~$20M, so every category shows up
+        return 10 ** self.random.uniform(1, 7.3) / price
+
+    def trade(self, symbol: str) -> dict:
+        price = self._tick(symbol)
+        quantity = self._quantity(price)
+        self.quote_volume[symbol] += price * quantity
+        self.trade_id += 1
+        now = int(time.time() * 1000)
+        return {
+            "e": "trade", "E": now, "T": now, "s": symbol, "t": self.trade_id,
+            "p": f"{price:.8g}", "q": f"{quantity:.6g}",
+            "m": self.random.random() < 0.5,
+        }
+
+    def mini_ticker(self, symbol: str) -> dict:
+        # Starting prices stand in for the price 24h ago
+        return {
+            "e": "24hrMiniTicker", "E": int(time.time() * 1000), "s": symbol,
+            "c": f"{self.prices[symbol]:.8g}", "o": f"{MOCK_PRICES[symbol]:.8g}",
+            "q": f"{self.quote_volume[symbol]:.2f}",
+        }
+
+    def liquidation(self, symbol: str) -> dict:
+        price = self._tick(symbol)
+        quantity = f"{self._quantity(price):.6g}"
+        now = int(time.time() * 1000)
+        return {
+            "e": "forceOrder", "E": now,
+            "o": {
+                "s": symbol, "S": self.random.choice(("BUY", "SELL")), "o": "LIMIT", "f": "IOC",
+                "q": quantity, "p": f"{price:.8g}", "ap": f"{price:.8g}", "X": "FILLED",
+                "l": quantity, "z": quantity, "T": now,
+            },
+        }
+
+    def ticker(self, stream: str):
+        """Once-a-second payload of a miniTicker stream"""
+        if stream == ALL_MINI_TICKER_STREAM:
+            return [self.mini_ticker(symbol) for symbol in self.prices]
+        return self.mini_ticker(stream.partition("@")[0].upper())
+
+    @staticmethod
+    def is_ticker(stream: str) -> bool:
+        return stream == ALL_MINI_TICKER_STREAM or stream.endswith(MINI_TICKER_STREAM)
+
+    def event(self, stream: str) -> Optional[dict]:
+        """Next event for a stream name, or None for streams the mock does not serve"""
+        if stream == ALL_LIQUIDATIONS_STREAM:
+            return self.liquidation(self.random.choice(list(self.prices)))
+        symbol, _, kind = stream.partition("@")
+        symbol = symbol.upper()
+        if f"@{kind}" == TRADE_STREAM:
+            return self.trade(symbol)
+        if f"@{kind}" == LIQUIDATION_STREAM:
+            return self.liquidation(symbol)
+        return None
+
+    def valid_stream(self, stream: str) -> bool:
+        if stream.startswith("!"):
+            return stream in (ALL_LIQUIDATIONS_STREAM, ALL_MINI_TICKER_STREAM)
+        symbol, _, kind = stream.partition("@")
+        return symbol.upper() in self.prices and f"@{kind}" in (TRADE_STREAM, LIQUIDATION_STREAM, MINI_TICKER_STREAM)
+
+async def _handle_requests(ws, market: MockMarket, streams: Set[str]):
+    """Answer SUBSCRIBE/UNSUBSCRIBE requests like the exchange does"""
+    async for raw in ws:
+        try:
+            request = json.loads(raw)
+            method, params, request_id = request["method"], request.get("params", []), request.get("id")
+        except (ValueError, KeyError, TypeError):
+            await ws.send(json.dumps({"error": {"code": 3, "msg": "Invalid JSON"}, "id": None}))
+            continue
+        invalid = [stream for stream in params if not market.valid_stream(stream)]
+        if method not in ("SUBSCRIBE", "UNSUBSCRIBE") or invalid:
+            await ws.send(json.dumps({"error": {"code": 2, "msg": f"Invalid request: {invalid or method}"},
+                                      "id": request_id}))
+            continue
+        if method == "SUBSCRIBE":
+            streams.update(params)
+        else:
+            streams.difference_update(params)
+        logger.info(f"{method} {params} (id {request_id})")
+        await ws.send(json.dumps({"result": None, "id": request_id}))
+
+async def _send_tickers(ws, market: MockMarket, streams: Set[str]):
+    """Push every subscribed miniTicker stream once a second"""
+    while True:
+        await asyncio.sleep(1.0)
+        for stream in sorted(streams):
+            if market.is_ticker(stream):
+                await ws.send(json.dumps(market.ticker(stream)))
+
+async def serve_client(ws, market: MockMarket, rate: float):
+    """Stream random events for the client's subscriptions at about rate per second"""
+    streams: Set[str] = set()
+    requests = asyncio.ensure_future(_handle_requests(ws, market, streams))
+    tickers = asyncio.ensure_future(_send_tickers(ws, market, streams))
+    try:
+        while not requests.done():
+            await asyncio.sleep(market.random.expovariate(rate))
+            events = [stream for stream in sorted(streams) if not market.is_ticker(stream)]
+            if events:
+                event = market.event(market.random.choice(events))
+                if event is not None:
+                    await ws.send(json.dumps(event))
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        requests.cancel()
+        tickers.cancel()
+
+async def run_mock_server(host: str, port: int, rate: float, seed: Optional[int] = None):
+    """Serve the mock exchange until cancelled"""
+    market = MockMarket(seed)
+
+    async def handler(ws, path=None):
+        await serve_client(ws, market, rate)
+
+    async with websockets.serve(handler, host, port):
+        logger.info(f"Mock exchange listening on ws://{host}:{port}")
+        await asyncio.Future()  # Run forever
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
-from .config import MARKET_CATEGORIES
+from .config import CATEGORY_ORDER, category_index
 
 class Column(Enum):
     TYPE = "TYPE"
@@ -39,6 +39,8 @@ TABLE_CONFIG = {
 class DisplayConfig:
     max_rows: int = 20  # Number of rows to display (excluding headers)
     update_interval: float = 0.1  # Seconds between screen updates
+    blink_rate: float = 2.0  # Blink animation ticks per second (0 disables)
+    header_rate: float = 1.0  # Price line refreshes per second
     header_style: Dict[str, Any] = None
     border_style: Dict[str, Any] = None
 
@@ -55,18 +57,23 @@ class BaseTrade:
     quantity: float
     timestamp: datetime
     side: str
+
+    # Index into CATEGORY_ORDER when already computed in bulk (not a dataclass field)
+    _category_rank = None
     
     @property
     def usd_value(self) -> float:
         return self.price * self.quantity
+
+    @property
+    def category_rank(self) -> int:
+        """Index of the trade's category in CATEGORY_ORDER"""
+        rank = self._category_rank
+        return category_index(self.usd_value) if rank is None else rank
     
     @property
     def category(self):
-        value = self.usd_value
-        for cat in sorted(MARKET_CATEGORIES.values(), key=lambda x: x.min_size, reverse=True):
-            if value >= cat.min_size:
-                return cat
-        return MARKET_CATEGORIES["plankton"]
+        return CATEGORY_ORDER[self.category_rank]
 
     def to_row(self) -> Dict[Column, Any]:
         """Convert trade to a row dictionary"""
@@ -100,4 +107,27 @@ class Liquidation(BaseTrade):
     position_size: Optional[float] = None
 
     def get_type(self) -> str:
-        return "LIQUIDATED"
\ No newline at end of file
+        return "LIQUIDATED"
+
+@dataclass
+class TradeSummary(BaseTrade):
+    """Aggregated flow of small trades for one symbol and side.
+
+    The price is the volume-weighted average and the quantity the total,
+    so usd_value is the summed notional.
+    """
+    trade_count: int = 0
+
+    @property
+    def category_rank(self) -> int:
+        # Summaries are never highlighted, whatever their total value
+        return 0
+
+    def to_row(self) -> Dict[Column, Any]:
+        row = super().to_row()
+        row[Column.INFO] = f"{self.trade_count:,} trades".replace(",", ".")
+        row[Column.CATEGORY] = "Summary"
+        return row
+
+    def get_type(self) -> str:
+        return "SUMMARY"
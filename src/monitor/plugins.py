@@ -0,0 +1,343 @@
+import asyncio
+import csv
+import importlib
+import importlib.util
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .config import PLUGIN_QUEUE_SIZE, PLUGIN_CLOSE_TIMEOUT, DEFAULT_PLUGIN_CSV
+
+logger = logging.getLogger(__name__)
+
+# What a plugin's full queue does with the next batch
+DROP_NEWEST = "drop_newest"  # Turn the new batch away; the plugin sees an unbroken stretch of older events
+DROP_OLDEST = "drop_oldest"  # Discard the oldest queued batch to make room; the plugin stays close to live
+OVERFLOW_POLICIES = (DROP_NEWEST, DROP_OLDEST)
+
+# Seconds between warnings about a plugin that keeps dropping
+DROP_WARNING_INTERVAL = 10.0
+
+class Event(NamedTuple):
+    """One normalized trade or liquidation, with the fields of a stored row"""
+    time: float    # Exchange time, Unix seconds
+    symbol: str    # e.g. BTC
+    kind: str      # trade or liquidation
+    side: str      # BUY or SELL, as displayed
+    price: float
+    quantity: float
+    value: float   # USD
+    category: int  # Index into CATEGORY_ORDER
+    trade_id: Optional[int]
+
+class EventBatch:
+    """Every event of one processed batch as columns, in arrival order.
+
+    Plugins can work on the arrays directly or call events() for one
+    Event per row. Batches are shared between plugins: treat the arrays
+    as read-only.
+    """
+
+    def __init__(self, kind: str, names: List[str], index: np.ndarray, times: np.ndarray, prices: np.ndarray,
+                 quantities: np.ndarray, values: np.ndarray, categories: np.ndarray, buys: np.ndarray,
+                 trade_ids: Sequence[Optional[int]]):
+        self.kind = kind
+        self.names = names  # Distinct symbols; index maps each event to one
+        self.index = index
+        self.times = times  # Exchange time in milliseconds
+        self.prices = prices
+        self.quantities = quantities
+        self.values = values
+        self.categories = categories
+        self.buys = buys
+        self.trade_ids = trade_ids
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def select(self, rows: np.ndarray) -> "EventBatch":
+        """The events at the given positions"""
+        return EventBatch(self.kind, self.names, self.index[rows], self.times[rows], self.prices[rows],
+                          self.quantities[rows], self.values[rows], self.categories[rows], self.buys[rows],
+                          [self.trade_ids[i] for i in rows.tolist()])
+
+    def events(self) -> List[Event]:
+        # tolist() gives Python numbers, so events print and serialise like any other values
+        return list(map(Event._make, zip(
+            (self.times / 1000).tolist(), [self.names[j] for j in self.index.tolist()], [self.kind] * len(self),
+            ["BUY" if buy else "SELL" for buy in self.buys.tolist()], self.prices.tolist(),
+            self.quantities.tolist(), self.values.tolist(), self.categories.tolist(), self.trade_ids)))
+
+class Plugin:
+    """Base class for plugins; override handle and set the attributes that differ.
+
+    handle(batch) gets an EventBatch. Written as a plain method it runs in
+    the plugin's own thread, so it may block on files or the network; as
+    a coroutine it runs on the event loop and must only await, never
+    block. close() is called once at exit, after the last batch.
+    """
+
+    name: Optional[str] = None  # Shown in the plugins command; defaults to the class name
+    kinds = ("trade", "liquidation")
+    min_category = 0  # Smallest CATEGORY_ORDER index delivered
+    queue_size = PLUGIN_QUEUE_SIZE  # Batches waiting at most
+    overflow = DROP_NEWEST
+
+    def handle(self, batch: EventBatch):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PluginRunner:
+    """One plugin's queue, task and counters.
+
+    The feed only filters a batch for the plugin and puts it on the
+    plugin's bounded queue; when the queue is full the overflow policy
+    decides which batch is lost and the events are counted as dropped.
+    A task takes batches off the queue one at a time and hands them to
+    the plugin, on the loop or in a dedicated thread, timing each call.
+    """
+
+    def __init__(self, plugin, name: str):
+        self.plugin = plugin
+        self.name = name
+        self.kinds = frozenset(getattr(plugin, "kinds", Plugin.kinds))
+        self.min_category = getattr(plugin, "min_category", Plugin.min_category)
+        self.queue_size = max(1, getattr(plugin, "queue_size", Plugin.queue_size))
+        self.overflow = getattr(plugin, "overflow", Plugin.overflow)
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}, not {self.overflow!r}")
+        self.threaded = not asyncio.iscoroutinefunction(plugin.handle)
+        self.queue: Optional[asyncio.Queue] = None  # Made by start(), on the loop that runs the feed
+        self.task: Optional[asyncio.Task] = None
+        self.handled = 0
+        self.batches = 0
+        self.dropped = 0  # Events lost to a full queue
+        self.errors = 0  # Batches the plugin raised on
+        self.busy = 0.0  # Seconds spent in handle
+        self.slowest = 0.0  # Longest single batch, in seconds
+        self._warned = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()  # Held while the plugin handles a batch, so close() waits for it
+        self._closed = False
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.threaded:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix=f"plugin-{self.name}")
+        self.task = asyncio.ensure_future(self.run())
+
+    def offer(self, batch: EventBatch):
+        """Queue the batch's events this plugin wants; never blocks"""
+        if batch.kind not in self.kinds or self.queue is None:
+            return
+        if self.min_category:
+            rows = np.flatnonzero(batch.categories >= self.min_category)
+            if not rows.size:
+                return
+            if rows.size < len(batch):
+                batch = batch.select(rows)
+        try:
+            self.queue.put_nowait(batch)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.overflow == DROP_OLDEST:
+            self.dropped += len(self.queue.get_nowait())
+            self.queue.put_nowait(batch)
+        else:
+            self.dropped += len(batch)
+        now = time.monotonic()
+        if now - self._warned >= DROP_WARNING_INTERVAL:
+            self._warned = now
+            logger.warning(f"Plugin {self.name} is behind, {self.dropped} events dropped so far")
+
+    async def run(self):
+        """Hand queued batches to the plugin one at a time until cancelled"""
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = await self.queue.get()
+            if self._executor is not None:
+                await loop.run_in_executor(self._executor, self._handle_locked, batch)
+                continue
+            started = time.perf_counter()
+            try:
+                await self.plugin.handle(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed(e)
+            self._count(batch, time.perf_counter() - started)
+
+    def _handle_locked(self, batch: EventBatch):
+        with self._lock:
+            if not self._closed:
+                self._handle(batch)
+
+    def _handle(self, batch: EventBatch):
+        started = time.perf_counter()
+        try:
+            self.plugin.handle(batch)
+        except Exception as e:
+            self._failed(e)
+        self._count(batch, time.perf_counter() - started)
+
+    def _count(self, batch: EventBatch, elapsed: float):
+        self.handled += len(batch)
+        self.batches += 1
+        self.busy += elapsed
+        self.slowest = max(self.slowest, elapsed)
+
+    def _failed(self, error: Exception):
+        self.errors += 1
+        if self.errors == 1 or self.errors % 1000 == 0:
+            logger.error(f"Plugin {self.name} failed on a batch ({self.errors} so far): {error}", exc_info=error)
+
+    def close(self, timeout: float = PLUGIN_CLOSE_TIMEOUT):
+        """Stop the task, let a threaded plugin handle what is queued within timeout, then close the plugin"""
+        if self.task is not None:
+            self.task.cancel()
+        left = []
+        while self.queue is not None and not self.queue.empty():
+            left.append(self.queue.get_nowait())
+        if self._executor is None:
+            # A coroutine cannot be run here: the loop may already be stopping
+            self.dropped += sum(len(batch) for batch in left)
+            self._close_plugin()
+            return
+        deadline = time.monotonic() + timeout
+        if not self._lock.acquire(timeout=timeout):
+            self.dropped += sum(len(batch) for batch in left)
+            logger.error(f"Plugin {self.name} did not finish its batch within {timeout}s, not closing it")
+            return
+        try:
+            self._closed = True
+            for i, batch in enumerate(left):
+                if time.monotonic() >= deadline:
+                    self.dropped += sum(len(batch) for batch in left[i:])
+                    break
+                self._handle(batch)
+            self._close_plugin()
+        finally:
+            self._lock.release()
+        self._executor.shutdown(wait=False)
+
+    def _close_plugin(self):
+        close = getattr(self.plugin, "close", None)  # Plugins need not subclass Plugin
+        if not callable(close):
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"Error closing plugin {self.name}: {e}")
+
+    def describe(self) -> str:
+        per_event = self.busy / self.handled * 1e6 if self.handled else 0.0
+        queued = self.queue.qsize() if self.queue is not None else 0
+        return (f"{self.name}: {self.handled} events in {self.batches} batches, {per_event:.1f} us/event, "
+                f"slowest batch {self.slowest * 1000:.1f} ms, {self.dropped} dropped ({self.overflow}), "
+                f"{self.errors} errors, {queued}/{self.queue_size} batches queued")
+
+class PluginHost:
+    """Plugins subscribed to the normalized events of every processed batch.
+
+    Each plugin gets every trade or liquidation, shown or filtered, on
+    its own bounded queue and task (see PluginRunner), so a slow or
+    failing plugin loses its own batches without holding up the display,
+    the websocket or the other plugins.
+    """
+
+    def __init__(self):
+        self.runners: List[PluginRunner] = []
+
+    def add(self, plugin):
+        """Register a plugin; its name is made unique if needed"""
+        base = getattr(plugin, "name", None) or type(plugin).__name__
+        taken = {runner.name for runner in self.runners}
+        name, number = base, 1
+        while name in taken:
+            number += 1
+            name = f"{base}-{number}"
+        self.runners.append(PluginRunner(plugin, name))
+
+    def start(self):
+        """Start each plugin's task on the running loop"""
+        for runner in self.runners:
+            runner.start()
+
+    def publish(self, batch: EventBatch):
+        for runner in self.runners:
+            runner.offer(batch)
+
+    def describe(self) -> str:
+        """Events handled, time per event, drops and errors of each plugin"""
+        if not self.runners:
+            return "no plugins"
+        return "\n".join(runner.describe() for runner in self.runners)
+
+    def close(self):
+        for runner in self.runners:
+            runner.close()
+            logger.info(f"Plugin {runner.describe()}")
+
+class CsvPlugin(Plugin):
+    """Appends every event to a CSV file (--plugin csv[=PATH])"""
+
+    name = "csv"
+
+    def __init__(self, path: str = DEFAULT_PLUGIN_CSV):
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if new:
+            self._writer.writerow(Event._fields)
+
+    def handle(self, batch: EventBatch):
+        self._writer.writerows(batch.events())
+
+    def close(self):
+        self._file.close()
+
+BUILTIN_PLUGINS = {"csv": CsvPlugin}
+
+def _import_module(name: str):
+    if not name.endswith(".py"):
+        return importlib.import_module(name)
+    path = os.path.expanduser(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"no plugin file {path}")
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_plugin(spec: str):
+    """Create the plugin of a --plugin spec: a built-in name or module:attribute, optionally =argument.
+
+    The module is an import path or a .py file, and the attribute a
+    Plugin class or any callable returning a plugin; it is called with
+    the argument, if one is given, as its only parameter.
+    """
+    target, _, argument = spec.partition("=")
+    if ":" in target:
+        module, _, attribute = target.rpartition(":")
+        factory = getattr(_import_module(module), attribute)
+    else:
+        factory = BUILTIN_PLUGINS.get(target)
+        if factory is None:
+            raise ValueError(f"unknown plugin {target!r}; built in: {', '.join(BUILTIN_PLUGINS)}, "
+                             f"or give module:attribute")
+    plugin = factory(argument) if argument else factory()
+    if not callable(getattr(plugin, "handle", None)):
+        raise ValueError(f"{target} has no handle method")
+    return plugin
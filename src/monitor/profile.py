@@ -0,0 +1,107 @@
+import math
+import time
+from typing import Optional
+
+import numpy as np
+
+from .config import PROFILE_BINS, PROFILE_BIN_FRACTION, PROFILE_WINDOW, PROFILE_SLOTS
+
+# Price levels the current price may get this close to either edge before re-centering
+RECENTER_MARGIN = PROFILE_BINS // 8
+
+BUY, SELL = 0, 1
+
+class VolumeProfile:
+    """Buy and sell USD volume per price level over a rolling window.
+
+    Volume is kept in a (slots, bins, 2) array: one histogram per
+    sub-window, plus a running total. Adding a trade touches one cell of
+    the current slot and of the total; when a slot expires its histogram
+    is subtracted from the total and reused. When the price drifts near
+    either edge, the levels are shifted with np.roll to center it again,
+    dropping the levels that fall off.
+    """
+
+    def __init__(self, symbol: str, bins: int = PROFILE_BINS, window: float = PROFILE_WINDOW,
+                 slots: int = PROFILE_SLOTS):
+        self.symbol = symbol
+        self.bins = bins
+        self.window = window
+        self.slot_seconds = window / slots
+        self.slots = np.zeros((slots, bins, 2))
+        self.totals = np.zeros((bins, 2))
+        self.slot = 0
+        self.slot_start: Optional[float] = None
+        self.bin_size: Optional[float] = None  # Set from the first price seen
+        self.low = 0.0  # Lower edge of level 0
+        self.last_price: Optional[float] = None
+
+    def _advance(self, now: float):
+        """Expire sub-windows that have ended"""
+        if self.slot_start is None:
+            self.slot_start = now
+            return
+        elapsed = int((now - self.slot_start) // self.slot_seconds)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, len(self.slots))):
+            self.slot = (self.slot + 1) % len(self.slots)
+            self.totals -= self.slots[self.slot]
+            self.slots[self.slot] = 0
+        self.slot_start += elapsed * self.slot_seconds
+
+    def _recenter(self, price: float):
+        """Shift the levels so price sits in the middle"""
+        if self.bin_size is None:
+            self.bin_size = price * PROFILE_BIN_FRACTION
+            self.low = price - self.bins // 2 * self.bin_size
+            return
+        shift = math.floor((price - self.low) / self.bin_size) - self.bins // 2
+        if shift == 0:
+            return
+        if abs(shift) >= self.bins:
+            self.slots[:] = 0
+            self.totals[:] = 0
+        else:
+            self.slots = np.roll(self.slots, -shift, axis=1)
+            self.totals = np.roll(self.totals, -shift, axis=0)
+            # Levels that wrapped around hold volume from the other end
+            dropped = slice(self.bins - shift, None) if shift > 0 else slice(None, -shift)
+            self.slots[:, dropped] = 0
+            self.totals[dropped] = 0
+        self.low += shift * self.bin_size
+
+    def _level(self, price: float) -> int:
+        level = math.floor((price - self.low) / self.bin_size)
+        if not RECENTER_MARGIN <= level < self.bins - RECENTER_MARGIN:
+            self._recenter(price)
+            level = math.floor((price - self.low) / self.bin_size)
+        return level
+
+    def add(self, price: float, value: float, is_buy: bool, now: Optional[float] = None):
+        """Count one trade"""
+        self._advance(time.time() if now is None else now)
+        if self.bin_size is None:
+            self._recenter(price)
+        level = self._level(price)
+        side = BUY if is_buy else SELL
+        self.slots[self.slot, level, side] += value
+        self.totals[level, side] += value
+        self.last_price = price
+
+    def add_batch(self, prices: np.ndarray, values: np.ndarray, buys: np.ndarray, now: Optional[float] = None):
+        """Count a batch of trades with array operations"""
+        if not len(prices):
+            return
+        self._advance(time.time() if now is None else now)
+        last = float(prices[-1])
+        if self.bin_size is None:
+            self._recenter(last)
+        self._level(last)  # Re-center on the newest price if needed
+        levels = np.floor((prices - self.low) / self.bin_size).astype(np.intp)
+        keep = (levels >= 0) & (levels < self.bins)
+        levels = levels[keep]
+        sides = np.where(buys[keep], BUY, SELL)
+        np.add.at(self.slots[self.slot], (levels, sides), values[keep])
+        np.add.at(self.totals, (levels, sides), values[keep])
+        self.last_price = last
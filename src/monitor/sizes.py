@@ -0,0 +1,106 @@
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .config import (
+    CATEGORY_THRESHOLDS, SIZES_BINS_PER_STEP, SIZES_WINDOW, SIZES_SLOTS, SIZES_MAX_SYMBOLS, category_index
+)
+from .symbol_rows import SymbolRows
+
+def size_edges(per_step: int = SIZES_BINS_PER_STEP) -> np.ndarray:
+    """Bin edges in USD: each gap between category thresholds split into log-spaced bins.
+
+    Below the smallest threshold and above the largest the steps are
+    decades, from $1 to ten times the largest threshold, so every
+    category boundary is also a bin boundary.
+    """
+    thresholds = [t for t in CATEGORY_THRESHOLDS if t > 0]
+    points = [10.0 ** e for e in range(int(np.log10(thresholds[0])))] + thresholds + [thresholds[-1] * 10]
+    steps = [np.geomspace(a, b, per_step + 1)[:-1] for a, b in zip(points, points[1:])]
+    return np.concatenate(steps + [[points[-1]]])
+
+class SizeHistograms:
+    """Trade counts per symbol and USD size bin over a rolling window.
+
+    Counts are kept in a (slots, symbols, bins) array, one layer per
+    sub-window, plus a running total. A batch is binned with one
+    searchsorted and counted with np.add.at; when a sub-window expires
+    its layer is subtracted from the total and reused. Sizes below the
+    first edge count in the first bin and above the last in the last.
+    """
+
+    def __init__(self, window: float = SIZES_WINDOW, slots: int = SIZES_SLOTS,
+                 max_symbols: int = SIZES_MAX_SYMBOLS):
+        self.bins_per_step = SIZES_BINS_PER_STEP
+        self.edges = size_edges(self.bins_per_step)
+        self.bins = len(self.edges) - 1
+        self.categories = np.array([category_index(edge) for edge in self.edges[:-1]])  # Category of each bin
+        self.window = window
+        self.slot_seconds = window / slots
+        self.counts = np.zeros((slots, max_symbols, self.bins), dtype=np.int32)
+        self.totals = np.zeros((max_symbols, self.bins), dtype=np.int64)
+        self.slot = 0
+        self.slot_start: Optional[float] = None
+        self.rows = SymbolRows(max_symbols)
+
+    def _advance(self, now: float):
+        """Expire sub-windows that have ended"""
+        if self.slot_start is None:
+            self.slot_start = now
+            return
+        elapsed = int((now - self.slot_start) // self.slot_seconds)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, len(self.counts))):
+            self.slot = (self.slot + 1) % len(self.counts)
+            self.totals -= self.counts[self.slot]
+            self.counts[self.slot] = 0
+        self.slot_start += elapsed * self.slot_seconds
+
+    def _row(self, symbol: str) -> int:
+        row, new = self.rows.assign(symbol)
+        if new:
+            self.counts[:, row] = 0
+            self.totals[row] = 0
+        return row
+
+    def add_batch(self, names: Sequence[str], index: np.ndarray, values: np.ndarray, now: Optional[float] = None):
+        """Count a batch of trades by symbol and USD value (names and index as from batch.group_symbols)"""
+        if not len(values):
+            return
+        self._advance(time.time() if now is None else now)
+        rows = np.array([self._row(name) for name in names], dtype=np.intp)[index]
+        bins = np.clip(np.searchsorted(self.edges, values, side="right") - 1, 0, self.bins - 1)
+        np.add.at(self.counts[self.slot], (rows, bins), 1)
+        np.add.at(self.totals, (rows, bins), 1)
+
+    def symbols(self) -> List[str]:
+        """Tracked symbols, most trades first"""
+        counts = {symbol: int(self.totals[row].sum()) for symbol, row in self.rows}
+        return sorted(counts, key=counts.get, reverse=True)
+
+    def histogram(self, symbol: Optional[str] = None) -> np.ndarray:
+        """Counts per bin over the window for one symbol, or all of them"""
+        if symbol is None:
+            return self.totals.sum(axis=0)
+        row = self.rows.get(symbol)
+        return np.zeros(self.bins, dtype=np.int64) if row is None else self.totals[row].copy()
+
+    def category_counts(self, histogram: np.ndarray) -> np.ndarray:
+        """Counts per category (indexes into CATEGORY_ORDER); exact, as bins never straddle a threshold"""
+        return np.bincount(self.categories, weights=histogram, minlength=len(CATEGORY_THRESHOLDS)).astype(np.int64)
+
+    def quantile(self, histogram: np.ndarray, q: float) -> Optional[float]:
+        """USD size at quantile q, interpolated log-linearly inside its bin"""
+        total = histogram.sum()
+        if total <= 0:
+            return None
+        cumulative = np.cumsum(histogram)
+        target = q * total
+        b = int(np.searchsorted(cumulative, target))
+        b = min(b, self.bins - 1)
+        before = cumulative[b - 1] if b else 0
+        fraction = (target - before) / histogram[b] if histogram[b] else 0.0
+        low, high = self.edges[b], self.edges[b + 1]
+        return float(low * (high / low) ** fraction)
@@ -9,6 +9,8 @@ import simpleaudio as sa
 from concurrent.futures import ThreadPoolExecutor
 import time
 
+from .trace import tracer
+
 logger = logging.getLogger(__name__)
 
 class SoundRequest(NamedTuple):
@@ -39,7 +41,7 @@ class SoundPlayer:
                 # Get the next sound request (blocks until one is available)
                 _, sound_request = self._sound_queue.get(timeout=1.0)
                 if self.sound_supported:
-                    with self._audio_lock:
+                    with self._audio_lock, tracer.span("sound.play", "sound", {"frequency": sound_request.frequency}):
                         wave_obj = self._generate_sine_wave(
                             sound_request.frequency,
                             sound_request.duration,
@@ -0,0 +1,102 @@
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .config import SPARKLINE_BUCKETS, SPARKLINE_MAX_SYMBOLS, SPARKLINE_MINUTES
+from .symbol_rows import SymbolRows
+
+# Block characters from lowest to highest
+TICKS = "▁▂▃▄▅▆▇█"
+
+class SparklineStore:
+    """Low and high price per time bucket for recently traded symbols.
+
+    Each symbol owns one row of preallocated (max_symbols, buckets)
+    arrays used as a ring: bucket number b lives in column b % buckets,
+    and columns are cleared as time moves past them. Recording a price
+    is O(1). Rows are handed out by SymbolRows, so memory stays fixed
+    however many pairs are subscribed.
+    """
+
+    def __init__(self, minutes: float = SPARKLINE_MINUTES, buckets: int = SPARKLINE_BUCKETS,
+                 max_symbols: int = SPARKLINE_MAX_SYMBOLS):
+        self.buckets = buckets
+        self.bucket_seconds = minutes * 60 / buckets
+        self.lows = np.full((max_symbols, buckets), np.nan)
+        self.highs = np.full((max_symbols, buckets), np.nan)
+        self.newest = np.full(max_symbols, -1, dtype=np.int64)  # Last bucket number written per row
+        self.rows = SymbolRows(max_symbols)
+
+    def _row(self, symbol: str) -> int:
+        """Row of a symbol, taking over the stalest row if it has none"""
+        row, new = self.rows.assign(symbol)
+        if new:
+            self.lows[row] = np.nan
+            self.highs[row] = np.nan
+            self.newest[row] = -1
+        return row
+
+    def add(self, symbol: str, low: float, high: float, now: Optional[float] = None):
+        """Record the price range a symbol traded in just now"""
+        bucket = int((time.time() if now is None else now) // self.bucket_seconds)
+        row = self._row(symbol)
+        newest = int(self.newest[row])
+        if bucket > newest:
+            # Clear the columns time has moved past since the last write
+            if newest < 0 or bucket - newest >= self.buckets:
+                self.lows[row] = np.nan
+                self.highs[row] = np.nan
+            else:
+                stale = np.arange(newest + 1, bucket + 1) % self.buckets
+                self.lows[row, stale] = np.nan
+                self.highs[row, stale] = np.nan
+            self.newest[row] = bucket
+        elif bucket <= newest - self.buckets:
+            return  # Older than the window
+        i = bucket % self.buckets
+        # NaN compares false, so an empty bucket always takes the new value
+        if not self.lows[row, i] <= low:
+            self.lows[row, i] = low
+        if not self.highs[row, i] >= high:
+            self.highs[row, i] = high
+
+    def add_batch(self, names: Sequence[str], index: np.ndarray, prices: np.ndarray, now: Optional[float] = None):
+        """Record a batch of trades, one update per symbol in it.
+
+        names are the distinct symbols of the batch and index maps each
+        trade to one of them (see batch.group_symbols).
+        """
+        if not len(prices):
+            return
+        lows = np.full(len(names), np.inf)
+        highs = np.full(len(names), -np.inf)
+        np.minimum.at(lows, index, prices)
+        np.maximum.at(highs, index, prices)
+        now = time.time() if now is None else now
+        for name, low, high in zip(names, lows.tolist(), highs.tolist()):
+            self.add(name, low, high, now)
+
+    def sparkline(self, symbol: str, now: Optional[float] = None) -> str:
+        """Sparkline of a symbol's window, oldest bucket first ("" if unknown)"""
+        row = self.rows.get(symbol)
+        if row is None:
+            return ""
+        current = int((time.time() if now is None else now) // self.bucket_seconds)
+        numbers = np.arange(current - self.buckets + 1, current + 1)
+        mids = (self.lows[row, numbers % self.buckets] + self.highs[row, numbers % self.buckets]) / 2
+        mids[numbers > self.newest[row]] = np.nan  # Columns not yet written in this window
+        if np.isnan(mids).all():
+            return ""
+        # A bucket without trades keeps the previous price
+        carry = np.maximum.accumulate(np.where(np.isnan(mids), -1, np.arange(len(mids))))
+        low, high = np.nanmin(mids), np.nanmax(mids)
+        chars: List[str] = []
+        for source in carry:
+            if source < 0:
+                chars.append(" ")
+            elif high > low:
+                chars.append(TICKS[int((mids[source] - low) / (high - low) * (len(TICKS) - 1) + 0.5)])
+            else:
+                chars.append(TICKS[len(TICKS) // 2])
+        return "".join(chars)
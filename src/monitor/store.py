@@ -0,0 +1,130 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from .config import STORE_BATCH_SIZE, STORE_FLUSH_INTERVAL, STORE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    time REAL NOT NULL,        -- Unix time in seconds
+    symbol TEXT NOT NULL,      -- e.g. BTC
+    kind TEXT NOT NULL,        -- trade or liquidation
+    side TEXT NOT NULL,        -- BUY or SELL
+    price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    value REAL NOT NULL,       -- USD
+    category INTEGER NOT NULL, -- Index into CATEGORY_ORDER
+    trade_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS trades_symbol_time ON trades (symbol, time);
+CREATE INDEX IF NOT EXISTS trades_category_time ON trades (category, time);
+"""
+
+INSERT = "INSERT INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+# time, symbol, kind, side, price, quantity, value, category, trade_id
+Row = Tuple[float, str, str, str, float, float, float, int, Optional[int]]
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open (creating if needed) a trade database"""
+    path = os.path.expanduser(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")  # Readers (query) never block the writer
+    connection.executescript(SCHEMA)
+    return connection
+
+class TradeStore(threading.Thread):
+    """Writes trades at or above a category to SQLite from a background thread.
+
+    The event loop only puts rows on a bounded queue and never waits: if
+    the writer falls that far behind, rows are dropped and counted. The
+    writer takes whatever is queued and inserts it in one transaction,
+    at most STORE_BATCH_SIZE rows at a time and never holding a row
+    longer than STORE_FLUSH_INTERVAL.
+    """
+
+    def __init__(self, path: str, min_category: int):
+        super().__init__(name="store", daemon=True)
+        self.path = path
+        self.min_category = min_category  # Smallest CATEGORY_ORDER index stored
+        self.dropped = 0
+        self.written = 0
+        self._queue: "queue.Queue[Optional[Row]]" = queue.Queue(maxsize=STORE_QUEUE_SIZE)
+
+    def add_rows(self, rows: Iterable[Row]):
+        """Queue rows for writing; never blocks"""
+        for row in rows:
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self.dropped += 1
+                if self.dropped % 10_000 == 1:
+                    logger.warning(f"Trade store is behind, {self.dropped} rows dropped so far")
+
+    def stop(self, timeout: float = 2.0):
+        """Write what is queued and stop the thread"""
+        if not self.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.error("Trade store queue full at exit, unwritten rows are lost")
+            return
+        self.join(timeout)
+
+    def run(self):
+        try:
+            connection = connect(self.path)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Cannot open trade store {self.path}: {e}")
+            return
+        running = True
+        while running:
+            batch: List[Row] = [self._queue.get()]
+            deadline = time.monotonic() + STORE_FLUSH_INTERVAL
+            while len(batch) < STORE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [row for row in batch if row is not None]
+            try:
+                with connection:  # One transaction per batch
+                    connection.executemany(INSERT, batch)
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing {len(batch)} trades to the store: {e}")
+        connection.close()
+
+def query_trades(path: str, symbol: Optional[str] = None, since: Optional[float] = None,
+                 min_category: int = 0, limit: int = 100) -> List[sqlite3.Row]:
+    """Newest stored trades matching the filters, newest first"""
+    conditions, params = [], []
+    if symbol:
+        conditions.append("symbol = ?")
+        params.append(symbol)
+    if since is not None:
+        conditions.append("time >= ?")
+        params.append(since)
+    if min_category:
+        conditions.append("category >= ?")
+        params.append(min_category)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    connection = sqlite3.connect(f"file:{os.path.expanduser(path)}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        return connection.execute(f"SELECT * FROM trades {where} ORDER BY time DESC LIMIT ?",
+                                  params + [limit]).fetchall()
+    finally:
+        connection.close()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .display import display
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the exchange to acknowledge a request
+ACK_TIMEOUT = 5.0
+
+def normalize_pair(pair: str) -> str:
+    """Accept "btc", "BTC" or "btcusdt" and return "btcusdt" """
+    pair = pair.strip().lower()
+    return pair if pair.endswith("usdt") else f"{pair}usdt"
+
+def exchange_symbol(pair: str) -> str:
+    """Symbol as it appears in event payloads ("btc" -> "BTCUSDT")"""
+    return normalize_pair(pair).upper()
+
+class SubscriptionManager:
+    """Keeps the set of subscribed streams and tracks requests until acked.
+
+    Requests carry increasing ids; the exchange answers each with a
+    {"result": null, "id": N} or {"error": {...}, "id": N} frame that is
+    matched back to the request here. The stream set survives reconnects
+    and is sent again in one SUBSCRIBE whenever a new socket is attached.
+
+    Each pair gets one stream per suffix ("@trade", "@miniTicker").
+    With a market_stream (one stream carrying every pair, such as
+    !forceOrder@arr) that stream replaces the per-pair streams, and pairs
+    become a client-side symbol_filter instead; pairs=None shows all.
+    extra_streams are always subscribed, whatever the pairs.
+    """
+
+    def __init__(self, pairs: Optional[Iterable[str]], stream_suffixes: Sequence[str],
+                 market_stream: Optional[str] = None, extra_streams: Sequence[str] = ()):
+        self.stream_suffixes = tuple(stream_suffixes)
+        self.market_stream = market_stream
+        # Exchange symbols to keep from market_stream; None keeps every symbol
+        self.symbol_filter: Optional[FrozenSet[str]] = None
+        # Called with the new symbol_filter, e.g. to pass it on to a feed daemon
+        self.on_filter_change: Optional[Callable[[Optional[FrozenSet[str]]], None]] = None
+        if market_stream:
+            self.streams: List[str] = [market_stream]
+            if pairs is not None:
+                self.symbol_filter = frozenset(exchange_symbol(pair) for pair in pairs)
+        else:
+            self.streams = [stream for pair in pairs or () for stream in self.stream_names(pair)]
+        self.streams.extend(stream for stream in extra_streams if stream not in self.streams)
+        self._ws = None
+        self._next_id = 1
+        # Request id -> (method, streams, future resolved by the ack)
+        self._pending: Dict[int, Tuple[str, List[str], asyncio.Future]] = {}
+
+    def stream_names(self, pair: str) -> List[str]:
+        pair = normalize_pair(pair)
+        return [f"{pair}{suffix}" for suffix in self.stream_suffixes]
+
+    async def attach(self, ws) -> Optional[asyncio.Future]:
+        """Use a new connection and subscribe it to the current stream set"""
+        self._fail_pending("connection replaced")
+        self._ws = ws
+        if not self.streams:
+            return None
+        return await self._request("SUBSCRIBE", list(self.streams))
+
+    def detach(self):
+        """Forget the connection; the stream set is kept for the next one"""
+        self._ws = None
+        self._fail_pending("connection lost")
+
+    async def subscribe(self, pairs: Iterable[str]) -> str:
+        """Add pairs to the stream set and subscribe to them if connected"""
+        if self.market_stream:
+            return self._update_filter(pairs, add=True)
+        streams = list(dict.fromkeys(s for pair in pairs for s in self.stream_names(pair) if s not in self.streams))
+        if not streams:
+            return "already subscribed"
+        self.streams.extend(streams)
+        return await self._apply("SUBSCRIBE", streams)
+
+    async def unsubscribe(self, pairs: Iterable[str]) -> str:
+        """Remove pairs from the stream set and unsubscribe if connected"""
+        if self.market_stream:
+            return self._update_filter(pairs, add=False)
+        streams = list(dict.fromkeys(s for pair in pairs for s in self.stream_names(pair) if s in self.streams))
+        if not streams:
+            return "not subscribed"
+        self.streams = [s for s in self.streams if s not in streams]
+        return await self._apply("UNSUBSCRIBE", streams)
+
+    def describe(self) -> str:
+        """Current streams, and the symbol filter when one applies"""
+        text = " ".join(self.streams) or "no streams"
+        if self.market_stream:
+            symbols = "all pairs" if self.symbol_filter is None else " ".join(sorted(self.symbol_filter)) or "none"
+            text += f" (showing {symbols})"
+        return text
+
+    def _update_filter(self, pairs: Iterable[str], add: bool) -> str:
+        """Change which symbols of the market stream are shown; no request is sent"""
+        if self.symbol_filter is None:
+            if add:
+                return "all pairs are already shown"
+            return "error: showing all pairs; start with --pairs to filter"
+        symbols = {exchange_symbol(pair) for pair in pairs}
+        # Replace rather than mutate so the reader sees either the old or the new set
+        self.symbol_filter = self.symbol_filter | symbols if add else self.symbol_filter - symbols
+        if self.on_filter_change is not None:
+            self.on_filter_change(self.symbol_filter)
+        display.print_status("Showing pairs", " ".join(sorted(self.symbol_filter)) or "none")
+        return f"ok: showing {' '.join(sorted(self.symbol_filter)) or 'none'}"
+
+    def handle_response(self, msg: dict) -> bool:
+        """Match a result/error frame to its request; returns False if it is not one"""
+        if not isinstance(msg, dict) or "id" not in msg or ("result" not in msg and "error" not in msg):
+            return False
+        entry = self._pending.pop(msg["id"], None)
+        if entry is None:
+            logger.debug("Response for unknown request id: %s", msg)
+            return True
+        method, streams, future = entry
+        error = msg.get("error")
+        if error:
+            self._revert(method, streams)
+            display.print_error(f"{method} {', '.join(streams)} failed: {error}")
+            if not future.done():
+                future.set_exception(RuntimeError(str(error)))
+        else:
+            logger.info(f"{method} acknowledged (id {msg['id']}): {', '.join(streams)}")
+            if not future.done():
+                future.set_result(msg.get("result"))
+        return True
+
+    async def _apply(self, method: str, streams: List[str]) -> str:
+        if self._ws is None:
+            return f"{method.lower()} queued until reconnect: {', '.join(streams)}"
+        future = await self._request(method, streams)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), ACK_TIMEOUT)
+        except asyncio.TimeoutError:
+            return f"{method.lower()} sent, no ack within {ACK_TIMEOUT:.0f}s: {', '.join(streams)}"
+        except Exception as e:
+            return f"error: {e}"
+        display.print_status(f"{method.capitalize()}d", ", ".join(streams))
+        return f"ok: {', '.join(streams)}"
+
+    async def _request(self, method: str, streams: List[str]) -> asyncio.Future:
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_event_loop().create_future()
+        # Nobody awaits the reconnect SUBSCRIBE; keep its failure out of the asyncio log
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending[request_id] = (method, streams, future)
+        message = {"method": method, "params": streams, "id": request_id}
+        logger.debug(f"Sending request: {json.dumps(message)}")
+        await self._ws.send(json.dumps(message))
+        return future
+
+    def _revert(self, method: str, streams: List[str]):
+        """Undo a rejected change to the stream set"""
+        if method == "SUBSCRIBE":
+            self.streams = [s for s in self.streams if s not in streams]
+        elif method == "UNSUBSCRIBE":
+            self.streams.extend(s for s in streams if s not in self.streams)
+
+    def _fail_pending(self, reason: str):
+        for _, _, future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(reason))
+        self._pending.clear()
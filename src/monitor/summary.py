@@ -0,0 +1,47 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from .models import BaseTrade, TradeSummary
+
+logger = logging.getLogger(__name__)
+
+class FlowAggregator:
+    """Accumulates trades below the display threshold per symbol and side.
+
+    Adding a trade only bumps three running totals; drain() turns them
+    into one TradeSummary per symbol and side and starts a new interval.
+    """
+
+    def __init__(self):
+        # (symbol, side) -> [trade count, total quantity, total USD value]
+        self._flows: Dict[Tuple[str, str], List[float]] = {}
+
+    def add(self, trade: BaseTrade):
+        """Count a trade towards its symbol and side totals"""
+        self.add_flow(trade.symbol, trade.side, trade.quantity, trade.usd_value)
+
+    def add_flow(self, symbol: str, side: str, quantity: float, value: float):
+        """Count one trade given by its fields, without building a trade object"""
+        key = (symbol, side)
+        flow = self._flows.get(key)
+        if flow is None:
+            flow = self._flows[key] = [0, 0.0, 0.0]
+        flow[0] += 1
+        flow[1] += quantity
+        flow[2] += value
+
+    def drain(self, timestamp: datetime) -> List[TradeSummary]:
+        """Summaries accumulated since the last drain, ordered by symbol and side"""
+        flows, self._flows = self._flows, {}
+        summaries = []
+        for (symbol, side), (count, quantity, value) in sorted(flows.items()):
+            summaries.append(TradeSummary(
+                symbol=symbol,
+                price=value / quantity if quantity else 0.0,  # Volume-weighted average price
+                quantity=quantity,
+                timestamp=timestamp,
+                side=side,
+                trade_count=int(count),
+            ))
+        return summaries
@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+class SymbolRows:
+    """Assigns symbols to a fixed number of array rows.
+
+    Per-symbol statistics are kept in preallocated arrays with one row
+    per symbol. When a new symbol arrives and every row is taken, the
+    least recently used symbol gives up its row, so memory stays fixed
+    however many pairs are subscribed.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.evicted = 0  # Symbols that have given up their row
+        self._rows: "OrderedDict[str, int]" = OrderedDict()  # Least recently used first
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return iter(list(self._rows.items()))
+
+    def get(self, symbol: str) -> Optional[int]:
+        """Row of a symbol, or None; does not count as a use"""
+        return self._rows.get(symbol)
+
+    def assign(self, symbol: str) -> Tuple[int, bool]:
+        """Row of a symbol and whether it was just (re)assigned and must be cleared"""
+        row = self._rows.get(symbol)
+        if row is not None:
+            self._rows.move_to_end(symbol)
+            return row, False
+        if len(self._rows) < self.capacity:
+            row = len(self._rows)
+        else:
+            _, row = self._rows.popitem(last=False)
+            self.evicted += 1
+        self._rows[symbol] = row
+        return row, True
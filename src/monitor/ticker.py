@@ -0,0 +1,49 @@
+import logging
+from typing import Dict, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Event type of miniTicker payloads, both per-pair and in !miniTicker@arr
+MINI_TICKER_EVENT = "24hrMiniTicker"
+
+class TickerTable:
+    """Latest price and 24h change per symbol, fed by miniTicker events.
+
+    Updates arrive about once a second, as one array for every market or
+    one event per pair, and are applied as a batch; trades never touch
+    this table. Readers take rows() at their own (low) rate.
+    """
+
+    def __init__(self, sort_by_volume: bool = False):
+        self.sort_by_volume = sort_by_volume  # Otherwise symbols keep first-seen order
+        # Symbol -> (last price, 24h change in percent, 24h quote volume)
+        self.tickers: Dict[str, Tuple[float, float, float]] = {}
+        self.updates = 0  # Batches applied, lets readers skip unchanged tables
+
+    @staticmethod
+    def is_ticker(msg: Union[dict, list]) -> bool:
+        """Whether a decoded message is a miniTicker event or array of them"""
+        if isinstance(msg, list):
+            return bool(msg) and isinstance(msg[0], dict) and msg[0].get("e") == MINI_TICKER_EVENT
+        return msg.get("e") == MINI_TICKER_EVENT
+
+    def update(self, msg: Union[dict, list]):
+        """Apply one miniTicker event or an array of them"""
+        events = msg if isinstance(msg, list) else (msg,)
+        tickers = self.tickers
+        for event in events:
+            try:
+                close = float(event["c"])
+                open_ = float(event["o"])
+                change = (close - open_) / open_ * 100 if open_ else 0.0
+                tickers[event["s"].replace("USDT", "")] = (close, change, float(event.get("q", 0)))
+            except (KeyError, ValueError, TypeError) as e:
+                logger.error(f"Invalid miniTicker event {event}: {e}")
+        self.updates += 1
+
+    def rows(self) -> List[Tuple[str, float, float]]:
+        """(symbol, price, 24h change %) for every symbol, in display order"""
+        items = self.tickers.items()
+        if self.sort_by_volume:
+            items = sorted(items, key=lambda item: item[1][2], reverse=True)
+        return [(symbol, price, change) for symbol, (price, change, _) in items]
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .config import TRACE_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Times write() retries copying the buffer while late events are still being appended
+TRACE_COPY_ATTEMPTS = 10
+
+class _NullSpan:
+    """Span used while tracing is disabled - does nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """Context manager recording one complete ("X") trace event"""
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.tracer.complete(self.name, self.cat, self.start, end - self.start, self.args)
+        return False
+
+class Tracer:
+    """Records Chrome trace-event spans into a bounded in-memory buffer.
+
+    The buffer is only written to disk by write(), normally at shutdown, so
+    recording never touches the filesystem on the hot path. The resulting
+    file can be opened in Perfetto or chrome://tracing.
+    """
+
+    def __init__(self, max_events: int = TRACE_BUFFER_SIZE):
+        self.enabled = False
+        self.path: Optional[str] = None
+        self._events = deque(maxlen=max_events)
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._dropped = 0
+
+    def start(self, path: str, max_events: Optional[int] = None):
+        """Enable tracing; events are written to path on write()"""
+        if max_events:
+            self._events = deque(maxlen=max_events)
+        self.path = path
+        self.enabled = True
+        logger.info(f"Tracing enabled, writing to {path} on exit")
+
+    def span(self, name: str, cat: str = "pipeline", args: Optional[Dict[str, Any]] = None):
+        """Return a context manager timing the enclosed block"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def complete(self, name: str, cat: str, start_ns: int, dur_ns: int,
+                 args: Optional[Dict[str, Any]] = None):
+        """Record a complete event from perf_counter_ns timestamps"""
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            with self._lock:
+                self._thread_names[tid] = threading.current_thread().name
+        if len(self._events) == self._events.maxlen:
+            self._dropped += 1
+        event = {
+            "name": name, "cat": cat, "ph": "X",
+            "ts": start_ns / 1000, "dur": dur_ns / 1000,
+            "pid": self._pid, "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def write(self):
+        """Write buffered events to the configured file"""
+        if not self.enabled or not self.path:
+            return
+        self.enabled = False
+        # Appends are not locked: a thread already inside complete() may still add one while the copy runs
+        for attempt in range(TRACE_COPY_ATTEMPTS):
+            try:
+                events = list(self._events)
+                break
+            except RuntimeError:  # deque mutated during iteration
+                time.sleep(0.001)
+        else:
+            logger.error("Trace buffer kept changing, trace not written")
+            return
+        with self._lock:
+            thread_names = dict(self._thread_names)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid,
+             "args": {"name": thread_name}}
+            for tid, thread_name in thread_names.items()
+        ]
+        metadata.append({"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+                         "args": {"name": "crypto-monitor"}})
+        try:
+            with open(self.path, "w") as f:
+                json.dump({
+                    "traceEvents": metadata + events,
+                    "displayTimeUnit": "ms",
+                    "otherData": {"dropped_events": self._dropped},
+                }, f)
+            logger.info(f"Wrote {len(events)} trace events to {self.path}")
+        except OSError as e:
+            logger.error(f"Error writing trace file {self.path}: {e}")
+
+# Global tracer instance, disabled until start() is called
+tracer = Tracer()